@@ -0,0 +1,110 @@
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+import ffmpeg
+
+from encoding import build_video_stream, build_audio_stream, compile_ffmpeg, write_filter_script, remove_filter_script
+
+# Builds export graphs for synthetic timelines of N cut clips and times graph construction,
+# command compilation and ffmpeg start-up, inline versus -filter_complex_script.
+#   python benchmark_filtergraph.py --clips 1000 5000 10000 --run
+
+BENCHMARK_SOURCE_SEC = 60
+BENCHMARK_CLIP_MS = 400
+BENCHMARK_SETTINGS = {'width': 320, 'height': 240, 'fps': 25}
+
+class _BenchClip:
+    def __init__(self, source_path, timeline_start_ms, clip_start_ms, duration_ms, track_type):
+        self.id = f"{track_type}{timeline_start_ms}"
+        self.source_path = source_path
+        self.timeline_start_ms = timeline_start_ms
+        self.clip_start_ms = clip_start_ms
+        self.duration_ms = duration_ms
+        self.track_index = 1
+        self.track_type = track_type
+        self.media_type = 'video'
+
+    @property
+    def timeline_end_ms(self):
+        return self.timeline_start_ms + self.duration_ms
+
+class _BenchTimeline:
+    num_video_tracks = 1
+    num_audio_tracks = 1
+
+    def __init__(self, clips):
+        self.clips = clips
+
+    def get_total_duration(self):
+        return max(c.timeline_end_ms for c in self.clips)
+
+def make_source(path):
+    ffmpeg.output(
+        ffmpeg.input(f"testsrc=s=320x240:r=25:d={BENCHMARK_SOURCE_SEC}", f='lavfi'),
+        ffmpeg.input(f"sine=d={BENCHMARK_SOURCE_SEC}", f='lavfi'),
+        path, vcodec='libx264', g=25, acodec='aac'
+    ).overwrite_output().run(quiet=True)
+
+def make_timeline(source_path, clip_count):
+    # Every cut jumps within the source so no two clips can share a decoder.
+    clips = []
+    source_span_ms = BENCHMARK_SOURCE_SEC * 1000 - BENCHMARK_CLIP_MS
+    for i in range(clip_count):
+        timeline_start_ms = i * BENCHMARK_CLIP_MS
+        clip_start_ms = (i * 7919) % source_span_ms
+        for track_type in ('video', 'audio'):
+            clips.append(_BenchClip(source_path, timeline_start_ms, clip_start_ms, BENCHMARK_CLIP_MS, track_type))
+    return _BenchTimeline(clips)
+
+def build_command(timeline):
+    w, h, fps = BENCHMARK_SETTINGS['width'], BENCHMARK_SETTINGS['height'], BENCHMARK_SETTINGS['fps']
+    video = build_video_stream(timeline.clips, w, h, fps, 0, timeline.get_total_duration())
+    audio = build_audio_stream(timeline)
+    return compile_ffmpeg(ffmpeg.output(video, audio, '-', f='null', **{'frames:v': 1}))
+
+def time_startup(cmd):
+    # Until the first frame is out, which covers argument parsing, opening inputs and graph setup.
+    started_at = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True, errors='ignore')
+    elapsed = time.perf_counter() - started_at
+    if result.returncode != 0:
+        return f"failed ({result.stderr.strip().splitlines()[-1] if result.stderr.strip() else result.returncode})"
+    return f"{elapsed:.2f}s"
+
+def run_benchmark(clip_counts, run_ffmpeg):
+    with tempfile.TemporaryDirectory() as work_dir:
+        source_path = os.path.join(work_dir, "source.mp4")
+        if run_ffmpeg:
+            make_source(source_path)
+
+        for clip_count in clip_counts:
+            timeline = make_timeline(source_path, clip_count)
+            started_at = time.perf_counter()
+            cmd = build_command(timeline)
+            build_sec = time.perf_counter() - started_at
+            graph_chars = len(cmd[cmd.index('-filter_complex') + 1])
+            inline_chars = sum(len(arg) + 1 for arg in cmd)
+
+            started_at = time.perf_counter()
+            script_cmd, script_path = write_filter_script(cmd, min_chars=0)
+            script_sec = time.perf_counter() - started_at
+            script_chars = sum(len(arg) + 1 for arg in script_cmd)
+
+            print(f"{clip_count} clips: build {build_sec:.2f}s, graph {graph_chars} chars, "
+                  f"command line {inline_chars} chars inline / {script_chars} with script (written in {script_sec * 1000:.0f}ms)")
+            if run_ffmpeg:
+                try:
+                    inline_result = time_startup(cmd)
+                except OSError as e:
+                    inline_result = f"failed ({e.strerror})"
+                print(f"    start-up inline: {inline_result}, script: {time_startup(script_cmd)}")
+            remove_filter_script(script_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark export filtergraph size and ffmpeg start-up.")
+    parser.add_argument("--clips", type=int, nargs='+', default=[1000, 5000, 10000])
+    parser.add_argument("--run", action="store_true", help="Also launch ffmpeg and time start-up to the first frame.")
+    args = parser.parse_args()
+    run_benchmark(args.clips, args.run)
@@ -0,0 +1,244 @@
+import os
+import json
+import time
+import platform
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from media_cache import CACHE_ROOT
+from encoding import TimelineSnapshot, build_export_command, plan_video_layers, _popen_ffmpeg, _read_ffmpeg_output
+
+ENCODER_TUNING_CACHE_PATH = os.path.join(CACHE_ROOT, "encoder_tuning.json")
+ENCODER_TUNING_VERSION = 2
+ENCODER_TUNING_SLICE_SEC = 5.0
+ENCODER_TUNING_DEFAULT_TARGET_SPEED = 2.0
+
+# Speed presets per encoder, fastest first, as (label, extra output options).
+ENCODER_SPEED_PRESETS = {
+    'libx264': [(p, {'preset': p}) for p in ['ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow']],
+    'libx265': [(p, {'preset': p}) for p in ['ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow']],
+    'libvpx-vp9': [
+        ('realtime', {'deadline': 'realtime', 'cpu-used': 8, 'row-mt': 1}),
+        ('good, cpu-used 5', {'deadline': 'good', 'cpu-used': 5, 'row-mt': 1}),
+        ('good, cpu-used 3', {'deadline': 'good', 'cpu-used': 3, 'row-mt': 1}),
+        ('good, cpu-used 1', {'deadline': 'good', 'cpu-used': 1, 'row-mt': 1}),
+    ],
+    'libaom-av1': [
+        ('cpu-used 8', {'cpu-used': 8, 'row-mt': 1}),
+        ('cpu-used 6', {'cpu-used': 6, 'row-mt': 1}),
+        ('cpu-used 4', {'cpu-used': 4, 'row-mt': 1}),
+    ],
+}
+
+def speed_presets_for(vcodec):
+    return ENCODER_SPEED_PRESETS.get(vcodec, [])
+
+def preset_options(vcodec, label):
+    return next((dict(options) for preset_label, options in speed_presets_for(vcodec) if preset_label == label), {})
+
+def machine_key():
+    # Calibration only transfers between identical machines, so results are stored under this.
+    return f"{platform.node()}|{platform.machine()}|{platform.processor()}|{os.cpu_count()}"
+
+def _profile_key(vcodec, project_settings, v_bitrate, workers):
+    return f"{vcodec}|{project_settings['width']}x{project_settings['height']}@{project_settings['fps']}|{v_bitrate or ''}|x{workers}"
+
+class EncoderTuningCache:
+    def __init__(self, path=ENCODER_TUNING_CACHE_PATH):
+        self.path = path
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != ENCODER_TUNING_VERSION or data.get('machine') != machine_key():
+            return {}
+        return data.get('profiles', {})
+
+    def get(self, vcodec, project_settings, v_bitrate, workers=1):
+        # {preset label: {'fps', 'speed', 'bytes'}} measured on this machine, or {}.
+        return self._load().get(_profile_key(vcodec, project_settings, v_bitrate, workers), {})
+
+    def put(self, vcodec, project_settings, v_bitrate, workers, measurements):
+        profiles = self._load()
+        profiles[_profile_key(vcodec, project_settings, v_bitrate, workers)] = measurements
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'version': ENCODER_TUNING_VERSION, 'machine': machine_key(), 'profiles': profiles}, f, indent=2)
+        except OSError as e:
+            print(f"Could not write encoder tuning cache: {e}")
+
+def choose_preset(vcodec, measurements, target_speed):
+    # Slowest preset (best compression per bit) that still encodes at target_speed x realtime;
+    # the fastest measured one if none does.
+    measured = [label for label, _ in speed_presets_for(vcodec) if label in measurements]
+    if not measured:
+        return None
+    fast_enough = [label for label in measured if measurements[label]['speed'] >= target_speed]
+    return fast_enough[-1] if fast_enough else measured[0]
+
+def representative_slice(timeline, fps, slice_sec=ENCODER_TUNING_SLICE_SEC):
+    # (start_ms, end_ms) of the slice_sec window around the stretch with the most stacked layers,
+    # so calibration sees the timeline's heaviest compositing rather than an easy opening shot.
+    total_ms = timeline.get_total_duration()
+    slice_ms = min(total_ms, int(slice_sec * 1000))
+    if total_ms <= slice_ms:
+        return 0, total_ms
+    end_frame = int(round(total_ms * fps / 1000.0))
+    stretches = plan_video_layers(timeline.clips, fps, 0, end_frame)
+    if not stretches:
+        center_ms = total_ms // 2
+    else:
+        a, b, _ = max(stretches, key=lambda s: (len(s[2]), s[1] - s[0]))
+        center_ms = int((a + b) * 500.0 / fps)
+    start_ms = max(0, min(total_ms - slice_ms, center_ms - slice_ms // 2))
+    return start_ms, start_ms + slice_ms
+
+class _EncoderTuningRunner(QObject):
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(bool, str, object)
+
+    def __init__(self, snapshot, project_settings, vcodec, v_bitrate, target_speed, workers=1, parent=None):
+        super().__init__(parent)
+        self.snapshot = snapshot
+        self.project_settings = project_settings
+        self.vcodec = vcodec
+        self.v_bitrate = v_bitrate
+        self.target_speed = target_speed
+        self.workers = max(1, workers)
+        self.processes = []
+        self._cancelled = False
+
+    def _read_encode_rate(self, process):
+        # Frames per second between the first and last frame reports, so ffmpeg start-up and
+        # input probing are not charged to the preset. Returns (return_code, stderr_tail, fps).
+        started_at = time.monotonic()
+        reports = []
+        def on_progress(info):
+            if info['frame']:
+                reports.append((time.monotonic(), info['frame']))
+        return_code, stderr_tail = _read_ffmpeg_output(process, on_progress)
+        if len(reports) >= 2 and reports[-1][0] > reports[0][0]:
+            fps = (reports[-1][1] - reports[0][1]) / (reports[-1][0] - reports[0][0])
+        else:
+            # Finished before a second report; fall back to the whole run.
+            frames = reports[-1][1] if reports else self.snapshot.get_total_duration() * self.project_settings['fps'] / 1000.0
+            fps = frames / max(1e-6, time.monotonic() - started_at)
+        return return_code, stderr_tail, fps
+
+    def _measure(self, label, options, work_dir):
+        # A parallel export runs one encoder per worker, so calibrate with that many at once and
+        # add up their rates.
+        cmds = []
+        for i in range(self.workers):
+            export_settings = {
+                'output_path': os.path.join(work_dir, f"calibration_{i}.mkv"), 'vcodec': self.vcodec,
+                'v_bitrate': self.v_bitrate, 'acodec': None, 'encoder_options': options,
+            }
+            cmds.append(build_export_command(self.snapshot, self.project_settings, export_settings))
+        self.processes = [_popen_ffmpeg(cmd) for cmd in cmds]
+        with ThreadPoolExecutor(max_workers=len(self.processes)) as pool:
+            results = list(pool.map(self._read_encode_rate, self.processes))
+        failed = next((stderr_tail for return_code, stderr_tail, _ in results if return_code != 0), None)
+        if failed is not None:
+            if not self._cancelled:
+                print(f"--- Encoder calibration '{self.vcodec} {label}' FAILED ---")
+                print("".join(failed))
+            return None
+        fps = sum(rate for _, _, rate in results)
+        return {
+            'fps': round(fps, 2),
+            'speed': round(fps / self.project_settings['fps'], 3),
+            'bytes': os.path.getsize(os.path.join(work_dir, "calibration_0.mkv")),
+        }
+
+    def run(self):
+        measurements = {}
+        try:
+            with tempfile.TemporaryDirectory(prefix="encoder_tuning_") as work_dir:
+                # Presets only get slower, so stop at the first one that misses the target.
+                for label, options in speed_presets_for(self.vcodec):
+                    if self._cancelled:
+                        break
+                    self.progress.emit(f"Calibrating {self.vcodec} {label}...")
+                    result = self._measure(label, options, work_dir)
+                    if result is None:
+                        break
+                    measurements[label] = result
+                    if result['speed'] < self.target_speed:
+                        break
+        except FileNotFoundError:
+            self.finished.emit(False, "Calibration failed: ffmpeg not found in your system's PATH.", {})
+            return
+        except Exception as e:
+            self.finished.emit(False, f"An exception occurred during calibration: {e}", {})
+            return
+
+        if self._cancelled:
+            self.finished.emit(False, "Calibration cancelled.", measurements)
+        elif not measurements:
+            self.finished.emit(False, "Calibration failed. Check console.", measurements)
+        else:
+            self.finished.emit(True, "Calibration finished.", measurements)
+
+    def cancel(self):
+        self._cancelled = True
+        for process in self.processes:
+            if process.poll() is None:
+                process.terminate()
+
+class EncoderTuner(QObject):
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(bool, str, object)
+
+    def __init__(self, cache=None, parent=None):
+        super().__init__(parent)
+        self.cache = cache or EncoderTuningCache()
+        self.thread = None
+        self.worker = None
+        self._request = None
+
+    def is_running(self):
+        return self.worker is not None
+
+    def start(self, timeline, project_settings, vcodec, v_bitrate, target_speed, workers=1):
+        if self.worker is not None or not speed_presets_for(vcodec):
+            return False
+        start_ms, end_ms = representative_slice(timeline, project_settings['fps'])
+        if end_ms <= start_ms:
+            return False
+        snapshot = TimelineSnapshot(timeline).cropped(start_ms, end_ms)
+        self._request = (vcodec, dict(project_settings), v_bitrate, workers)
+
+        self.thread = QThread()
+        self.worker = _EncoderTuningRunner(snapshot, dict(project_settings), vcodec, v_bitrate, target_speed, workers)
+        self.worker.moveToThread(self.thread)
+        self.worker.progress.connect(self.progress.emit)
+        self.worker.finished.connect(self._on_worker_finished)
+        self.thread.started.connect(self.worker.run)
+        self.thread.start()
+        return True
+
+    def _on_worker_finished(self, success, message, measurements):
+        if self.thread:
+            self.thread.quit()
+            self.thread.wait()
+            self.thread.deleteLater()
+        if self.worker:
+            self.worker.deleteLater()
+        self.thread = None
+        self.worker = None
+        if success:
+            self.cache.put(*self._request, measurements)
+        self.finished.emit(success, message, measurements)
+
+    def cancel(self, wait=False):
+        if self.worker:
+            self.worker.cancel()
+            if wait and self.thread:
+                self.thread.quit()
+                self.thread.wait(2000)
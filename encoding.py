@@ -1,58 +1,481 @@
 import ffmpeg
 import subprocess
-import re
-from PyQt6.QtCore import QObject, pyqtSignal, QThread
+import os
+import shutil
+import threading
+import copy
+import time
+import json
+import hashlib
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from ffmpeg.nodes import get_stream_spec_nodes, FilterNode, GlobalNode, InputNode, OutputNode
+# Private ffmpeg-python helpers used by compile_ffmpeg; requirements.txt pins the release they match.
+from ffmpeg._run import _get_input_args, _get_filter_arg, _get_output_args, _get_global_args
+from PyQt6.QtCore import QObject, pyqtSignal
+from smart_render import plan_smart_render, intermediate_format_for
+from media_cache import source_fingerprint
+from subtitles import merged_subtitle_path
+
+# Parallel export: every worker is one ffmpeg process with its own encoder threads.
+PARALLEL_THREADS_PER_WORKER = 4
+PARALLEL_SEGMENTS_PER_WORKER = 2
+PARALLEL_MIN_SEGMENT_SEC = 5.0
+PARALLEL_GOP_SEC = 2.0
+PARALLEL_AUDIO_PROGRESS_WEIGHT = 0.1
+PARALLEL_UNSUPPORTED_VCODECS = ['gif']
+SMART_RENDER_SEEK_EPSILON_SEC = 0.001
+# Roughly the most a resumable export can lose to a crash, whatever the worker count.
+RESUME_MAX_SEGMENT_SEC = 120.0
+RESUME_MANIFEST_NAME = "manifest.json"
+RESUME_MANIFEST_VERSION = 1
+
+FFMPEG_STDERR_TAIL_LINES = 200
+
+# Graphs longer than this are handed to ffmpeg as a script file. Windows caps the whole command
+# line at 32k characters and Linux caps a single argument at 128k; a timeline with a few hundred
+# clips passes both.
+FILTER_SCRIPT_MIN_CHARS = 8192
+
+def _topo_sort(downstream_nodes):
+    # The same depth-first walk as ffmpeg-python's topo_sort, which checks membership in lists and
+    # so takes minutes once a timeline has a couple of thousand clips. Iterative, so long overlay
+    # chains cannot hit the recursion limit either.
+    sorted_nodes = []
+    visited = set()
+    outgoing_edge_maps = {}
+    for root in reversed(downstream_nodes):
+        if root in visited:
+            continue
+        visited.add(root)
+        stack = [(root, iter(root.incoming_edges))]
+        while stack:
+            node, edges = stack[-1]
+            edge = next(edges, None)
+            if edge is None:
+                stack.pop()
+                sorted_nodes.append(node)
+                continue
+            upstream = edge.upstream_node
+            outgoing = outgoing_edge_maps.setdefault(upstream, {}).setdefault(edge.upstream_label, [])
+            outgoing.append((edge.downstream_node, edge.downstream_label, edge.upstream_selector))
+            if upstream not in visited:
+                visited.add(upstream)
+                stack.append((upstream, iter(upstream.incoming_edges)))
+    return sorted_nodes, outgoing_edge_maps
+
+def compile_ffmpeg(stream_spec, cmd='ffmpeg'):
+    # Drop-in for stream.compile() that scales linearly with the graph; argument formatting is
+    # still ffmpeg-python's own.
+    sorted_nodes, outgoing_edge_maps = _topo_sort(get_stream_spec_nodes(stream_spec))
+    input_nodes = [node for node in sorted_nodes if isinstance(node, InputNode)]
+    filter_nodes = [node for node in sorted_nodes if isinstance(node, FilterNode)]
+    stream_name_map = {(node, None): str(i) for i, node in enumerate(input_nodes)}
+    filter_arg = _get_filter_arg(filter_nodes, outgoing_edge_maps, stream_name_map)
+
+    args = [cmd]
+    for node in input_nodes:
+        args.extend(_get_input_args(node))
+    if filter_arg:
+        args += ['-filter_complex', filter_arg]
+    for node in sorted_nodes:
+        if isinstance(node, OutputNode):
+            args.extend(_get_output_args(node, stream_name_map))
+    for node in sorted_nodes:
+        if isinstance(node, GlobalNode):
+            args.extend(_get_global_args(node))
+    return args
+
+def write_filter_script(cmd, min_chars=FILTER_SCRIPT_MIN_CHARS):
+    # Moves a long -filter_complex into a -filter_complex_script file. Returns (cmd, script_path),
+    # where script_path is None if the graph was short enough to stay inline.
+    cmd = list(cmd)
+    if '-filter_complex' not in cmd:
+        return cmd, None
+    i = cmd.index('-filter_complex')
+    if len(cmd[i + 1]) < min_chars:
+        return cmd, None
+    fd, script_path = tempfile.mkstemp(prefix='filtergraph_', suffix='.txt')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(cmd[i + 1])
+    cmd[i:i + 2] = ['-filter_complex_script', script_path]
+    return cmd, script_path
+
+def remove_filter_script(script_path):
+    if script_path:
+        try: os.remove(script_path)
+        except OSError: pass
+
+def _popen_ffmpeg(cmd):
+    startupinfo = None
+    if hasattr(subprocess, 'STARTUPINFO'):
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+    # Key=value progress blocks on stdout; the \r-terminated stats line is switched off.
+    cmd, script_path = write_filter_script(cmd)
+    cmd = [cmd[0], '-nostats', '-progress', 'pipe:1'] + cmd[1:]
+    try:
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            encoding="utf-8",
+            errors='ignore',
+            startupinfo=startupinfo
+        )
+    except Exception:
+        remove_filter_script(script_path)
+        raise
+    # Removed by _read_ffmpeg_output once the process has exited.
+    process.filter_script_path = script_path
+    return process
+
+def _parse_float(value):
+    try:
+        return float(value.rstrip('x'))
+    except (AttributeError, ValueError):
+        return None
+
+def _parse_progress_block(block):
+    out_time_us = block.get('out_time_us') or block.get('out_time_ms')
+    return {
+        'frame': int(block['frame']) if block.get('frame', '').isdigit() else None,
+        'fps': _parse_float(block.get('fps')),
+        'speed': _parse_float(block.get('speed')),
+        'out_time_ms': int(out_time_us) // 1000 if out_time_us and out_time_us.lstrip('-').isdigit() else None,
+        'bitrate': block.get('bitrate') if block.get('bitrate') not in (None, 'N/A') else None,
+        'done': block.get('progress') == 'end',
+    }
+
+def _read_ffmpeg_output(process, on_progress=None):
+    # stderr is drained on its own thread into a bounded tail so a chatty encoder can neither
+    # block on a full pipe nor grow memory without limit.
+    stderr_tail = deque(maxlen=FFMPEG_STDERR_TAIL_LINES)
+    stderr_thread = threading.Thread(target=lambda: stderr_tail.extend(iter(process.stderr.readline, "")), daemon=True)
+    stderr_thread.start()
+
+    block = {}
+    for line in iter(process.stdout.readline, ""):
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            continue
+        block[key] = value.strip()
+        if key == 'progress':
+            if on_progress:
+                on_progress(_parse_progress_block(block))
+            block = {}
+    process.stdout.close()
+    return_code = process.wait()
+    stderr_thread.join()
+    process.stderr.close()
+    remove_filter_script(getattr(process, 'filter_script_path', None))
+    return return_code, list(stderr_tail)
+
+def _eta_sec(started_at, fraction):
+    if fraction <= 0:
+        return None
+    return max(0.0, (time.monotonic() - started_at) * (1.0 - fraction) / fraction)
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def get_default_parallel_workers():
+    return max(1, (os.cpu_count() or 1) // PARALLEL_THREADS_PER_WORKER)
+
+def _visual_clips(clips):
+    return sorted(
+        [c for c in clips if c.track_type == 'video' and c.media_type != 'subtitle'],
+        key=lambda c: c.track_index
+    )
+
+def _subtitle_clips(clips):
+    return sorted(
+        [c for c in clips if c.media_type == 'subtitle'],
+        key=lambda c: c.track_index
+    )
+
+def _source_ms(clip, timeline_ms):
+    return clip.clip_start_ms + timeline_ms - clip.timeline_start_ms
+
+def _source_continues(prev_clip, prev_end_ms, clip, start_ms, tolerance_ms):
+    # True when clip picks up exactly where prev_clip left off in the same source, e.g. after a split.
+    if prev_clip.source_path != clip.source_path or prev_clip.media_type != clip.media_type:
+        return False
+    if clip.media_type == 'image':
+        return True
+    return abs(_source_ms(prev_clip, prev_end_ms) - _source_ms(clip, start_ms)) <= tolerance_ms
+
+def _continues_layers(stretch, a, layers, fps):
+    prev_a, prev_b, prev_layers = stretch
+    if [c.id for c in prev_layers] == [c.id for c in layers]:
+        return True
+    return (
+        len(prev_layers) == 1 and len(layers) == 1 and prev_b == a
+        and _source_continues(prev_layers[0], a * 1000.0 / fps, layers[0], a * 1000.0 / fps, 500.0 / fps)
+    )
+
+def plan_video_layers(clips, fps, start_frame, end_frame):
+    # Splits [start_frame, end_frame) at visual edit points into (a, b, layers) stretches, where
+    # layers are the clips visible there in bottom-to-top order. Back-to-back pieces of one source
+    # are coalesced so they share a single seeked decoder.
+    visual = _visual_clips(clips)
+    to_frame = lambda ms: int(round(ms * fps / 1000.0))
+    edges = {start_frame, end_frame}
+    for clip in visual:
+        for ms in (clip.timeline_start_ms, clip.timeline_end_ms):
+            if start_frame < to_frame(ms) < end_frame:
+                edges.add(to_frame(ms))
+    edges = sorted(edges)
+
+    # Sweep in time order so finding the visible clips does not rescan the whole timeline per stretch.
+    by_start = sorted(range(len(visual)), key=lambda i: visual[i].timeline_start_ms)
+    next_start = 0
+    active = []
+    stretches = []
+    for a, b in zip(edges[:-1], edges[1:]):
+        mid_ms = (a + b) * 500.0 / fps
+        while next_start < len(by_start) and visual[by_start[next_start]].timeline_start_ms <= mid_ms:
+            active.append(by_start[next_start])
+            next_start += 1
+        active = [i for i in active if visual[i].timeline_end_ms > mid_ms]
+        layers = [visual[i] for i in sorted(active)]
+        if stretches and _continues_layers(stretches[-1], a, layers, fps):
+            stretches[-1] = (stretches[-1][0], b, stretches[-1][2])
+        else:
+            stretches.append((a, b, layers))
+    return stretches
+
+def _clip_layer(clip, w, h, fps, stretch_start_ms, stretch_dur_sec):
+    # Seek on the input so a clip late in a long source does not decode from zero.
+    offset_in_clip_ms = max(0, stretch_start_ms - clip.timeline_start_ms)
+    if clip.media_type == 'image':
+        clip_input = ffmpeg.input(clip.source_path, loop=1, framerate=fps, t=stretch_dur_sec)
+    else:
+        clip_seek_sec = (clip.clip_start_ms + offset_in_clip_ms) / 1000.0
+        clip_input = ffmpeg.input(clip.source_path, ss=clip_seek_sec, t=stretch_dur_sec)
+
+    return (
+        clip_input.video
+        .setpts('PTS-STARTPTS')
+        .filter('scale', w, h, force_original_aspect_ratio='decrease')
+        .filter('pad', w, h, '(ow-iw)/2', '(oh-ih)/2', 'black')
+        .filter('setsar', 1)
+    )
+
+def _split_repeated(streams, make_split):
+    # The same clip placed twice builds identical nodes, which ffmpeg-python merges into one
+    # with several consumers; route those through a split filter.
+    repeats = {}
+    for stream in streams:
+        repeats[stream] = repeats.get(stream, 0) + 1
+    splits = {stream: [make_split(stream), 0] for stream, count in repeats.items() if count > 1}
+    result = []
+    for stream in streams:
+        if stream in splits:
+            split_node, used = splits[stream]
+            result.append(split_node.stream(used))
+            splits[stream][1] += 1
+        else:
+            result.append(stream)
+    return result
+
+def build_video_stream(clips, w, h, fps, start_ms, end_ms):
+    # Stretches with one layer are trimmed inputs joined by concat; overlays are only built
+    # where layers really overlap, so the work scales with output length rather than clip count.
+    start_frame = int(round(start_ms * fps / 1000.0))
+    end_frame = max(start_frame + 1, int(round(end_ms * fps / 1000.0)))
+
+    pieces = []
+    for a, b, layers in plan_video_layers(clips, fps, start_frame, end_frame):
+        stretch_start_ms = a * 1000.0 / fps
+        stretch_dur_sec = (b - a) / fps
+        if not layers:
+            piece = ffmpeg.input(f'color=c=black:s={w}x{h}:r={fps}:d={stretch_dur_sec}', f='lavfi').filter('setsar', 1)
+        else:
+            # Every layer is padded to the full frame, so the bottom one doubles as the canvas.
+            piece = _clip_layer(layers[0], w, h, fps, stretch_start_ms, stretch_dur_sec)
+            for clip in layers[1:]:
+                piece = ffmpeg.overlay(piece, _clip_layer(clip, w, h, fps, stretch_start_ms, stretch_dur_sec), eof_action='pass')
+
+        # Clone-pad then cut so every stretch has its exact frame count and later stretches never drift.
+        piece = (
+            piece.filter('fps', fps=fps)
+            .filter('tpad', stop_mode='clone', stop=1)
+            .filter('trim', end_frame=b - a)
+            .setpts('PTS-STARTPTS')
+        )
+        pieces.append(piece)
+
+    pieces = _split_repeated(pieces, lambda piece: piece.split())
+    final_video = pieces[0] if len(pieces) == 1 else ffmpeg.concat(*pieces, v=1, a=0)
+
+    # Every subtitle clip is retimed into one track and burned in a single pass.
+    subtitle_path = merged_subtitle_path(_subtitle_clips(clips), start_ms, end_ms)
+    if subtitle_path:
+        final_video = final_video.filter('subtitles', filename=subtitle_path)
+
+    return final_video.filter('format', pix_fmts='yuv420p').filter('fps', fps=fps)
+
+def place_audio_segment(segment, gap_ms, duration_ms):
+    # The silence before a use comes from adelay and a short read is filled by apad, so gaps need
+    # no inputs of their own and each segment lasts exactly gap + duration.
+    gap_ms = max(0, int(round(gap_ms)))
+    if gap_ms > 0:
+        segment = segment.filter('adelay', delays=gap_ms, all=1)
+    return segment.filter('apad', whole_dur=f'{(gap_ms + duration_ms) / 1000.0:.6f}')
+
+def build_audio_stream(timeline):
+    track_audio_streams = []
+    for i in range(1, timeline.num_audio_tracks + 1):
+        track_clips = sorted([c for c in timeline.clips if c.track_type == 'audio' and c.track_index == i], key=lambda c: c.timeline_start_ms)
+        if not track_clips:
+            continue
+
+        # (first clip, timeline start, duration) per contiguous use of a source.
+        uses = []
+        for clip in track_clips:
+            if uses:
+                first_clip, use_start_ms, use_dur_ms = uses[-1]
+                use_end_ms = use_start_ms + use_dur_ms
+                if abs(clip.timeline_start_ms - use_end_ms) <= 1 and _source_continues(first_clip, use_end_ms, clip, clip.timeline_start_ms, 1):
+                    uses[-1] = (first_clip, use_start_ms, clip.timeline_end_ms - use_start_ms)
+                    continue
+            uses.append((clip, clip.timeline_start_ms, clip.duration_ms))
+
+        track_segments = []
+        last_end_ms = 0
+        for first_clip, use_start_ms, use_dur_ms in uses:
+            # One seeked decoder per use instead of a shared full decode split across every clip.
+            seek_sec = _source_ms(first_clip, use_start_ms) / 1000.0
+            a_seg = ffmpeg.input(first_clip.source_path, ss=seek_sec, t=use_dur_ms / 1000.0).audio.filter('asetpts', 'PTS-STARTPTS')
+            track_segments.append(place_audio_segment(a_seg, use_start_ms - last_end_ms, use_dur_ms))
+            last_end_ms = use_start_ms + use_dur_ms
+
+        if track_segments:
+            track_segments = _split_repeated(track_segments, lambda segment: segment.filter_multi_output('asplit'))
+            track_audio_streams.append(ffmpeg.concat(*track_segments, v=0, a=1))
+
+    if not track_audio_streams:
+        return None
+    return ffmpeg.filter(track_audio_streams, 'amix', inputs=len(track_audio_streams), duration='longest')
+
+def build_export_command(timeline, project_settings, export_settings):
+    total_dur_ms = timeline.get_total_duration()
+    w, h, fps = project_settings['width'], project_settings['height'], project_settings['fps']
+
+    output_args = {}
+    stream_args = []
+    final_audio = build_audio_stream(timeline) if export_settings.get('acodec') else None
+    has_audio = final_audio is not None
+
+    if export_settings.get('vcodec'):
+        stream_args.append(build_video_stream(timeline.clips, w, h, fps, 0, total_dur_ms))
+        output_args['vcodec'] = export_settings['vcodec']
+        output_args.update(export_settings.get('encoder_options') or {})
+        if export_settings.get('v_bitrate'): output_args['b:v'] = export_settings['v_bitrate']
+
+    if has_audio:
+        stream_args.append(final_audio)
+        output_args['acodec'] = export_settings['acodec']
+        if export_settings.get('a_bitrate'): output_args['b:a'] = export_settings['a_bitrate']
+
+    if not has_audio:
+        output_args['an'] = None
+
+    if not stream_args:
+        raise ValueError("No streams to output. Check export settings.")
+
+    return compile_ffmpeg(ffmpeg.output(*stream_args, export_settings['output_path'], **output_args).overwrite_output())
+
+def plan_export_segments(timeline, fps, workers, start_frame=0, end_frame=None, max_segment_sec=None):
+    # Frame-exact (start_frame, end_frame) ranges. Cuts land on a clip edge when one is
+    # close to the ideal boundary and on GOP multiples otherwise. max_segment_sec caps the
+    # length so checkpoints stay frequent on long timelines.
+    if end_frame is None:
+        end_frame = int(round(timeline.get_total_duration() * fps / 1000.0))
+    range_frames = end_frame - start_frame
+    gop_frames = max(1, int(round(fps * PARALLEL_GOP_SEC)))
+    min_frames = max(gop_frames, int(round(fps * PARALLEL_MIN_SEGMENT_SEC)))
+    target_frames = max(min_frames, range_frames // max(1, workers * PARALLEL_SEGMENTS_PER_WORKER))
+    if max_segment_sec:
+        target_frames = max(min_frames, min(target_frames, int(fps * max_segment_sec) - gop_frames))
+    target_frames = ((target_frames + gop_frames - 1) // gop_frames) * gop_frames
+    tolerance_frames = target_frames // 4
+
+    edit_frames = sorted({int(round(ms * fps / 1000.0)) for c in timeline.clips for ms in (c.timeline_start_ms, c.timeline_end_ms)})
+
+    boundaries = [start_frame]
+    while end_frame - boundaries[-1] > target_frames + min_frames // 2:
+        ideal = boundaries[-1] + target_frames
+        nearby_edits = [f for f in edit_frames if abs(f - ideal) <= tolerance_frames and f - boundaries[-1] >= min_frames and f < end_frame]
+        boundaries.append(min(nearby_edits, key=lambda f: abs(f - ideal)) if nearby_edits else ideal)
+    boundaries.append(end_frame)
+
+    return [(a, b) for a, b in zip(boundaries[:-1], boundaries[1:]) if b > a]
+
+def supports_parallel_export(export_settings):
+    vcodec = export_settings.get('vcodec')
+    return bool(vcodec) and vcodec not in PARALLEL_UNSUPPORTED_VCODECS
 
 class _ExportRunner(QObject):
     progress = pyqtSignal(int)
+    progress_info = pyqtSignal(object)
     finished = pyqtSignal(bool, str)
 
-    def __init__(self, ffmpeg_cmd, total_duration_ms, parent=None):
+    def __init__(self, timeline, project_settings, export_settings, render_cache=None, parent=None):
         super().__init__(parent)
-        self.ffmpeg_cmd = ffmpeg_cmd
-        self.total_duration_ms = total_duration_ms
+        self.timeline = timeline
+        self.project_settings = project_settings
+        self.export_settings = export_settings
+        self.render_cache = render_cache
+        self.ffmpeg_cmd = None
+        self.total_duration_ms = timeline.get_total_duration()
         self.process = None
+        self._cancelled = False
+
+    def _on_progress(self, info):
+        if info['out_time_ms'] is None or self.total_duration_ms <= 0:
+            return
+        fraction = min(1.0, max(0.0, info['out_time_ms'] / self.total_duration_ms))
+        remaining_sec = (self.total_duration_ms - info['out_time_ms']) / 1000.0
+        info['eta_sec'] = max(0.0, remaining_sec / info['speed']) if info['speed'] else _eta_sec(self._started_at, fraction)
+        info['percentage'] = min(100, int(fraction * 100))
+        self.progress.emit(info['percentage'])
+        self.progress_info.emit(info)
 
     def run(self):
         try:
-            startupinfo = None
-            if hasattr(subprocess, 'STARTUPINFO'):
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-
-            self.process = subprocess.Popen(
-                self.ffmpeg_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                encoding="utf-8",
-                errors='ignore',
-                startupinfo=startupinfo
-            )
-
-            full_output = []
-            time_pattern = re.compile(r"time=(\d{2}):(\d{2}):(\d{2})\.(\d{2})")
-
-            for line in iter(self.process.stdout.readline, ""):
-                full_output.append(line)
-                match = time_pattern.search(line)
-                if match:
-                    h, m, s, cs = [int(g) for g in match.groups()]
-                    processed_ms = (h * 3600 + m * 60 + s) * 1000 + cs * 10
-                    if self.total_duration_ms > 0:
-                        percentage = int((processed_ms / self.total_duration_ms) * 100)
-                        self.progress.emit(min(100, percentage))
-
-            self.process.stdout.close()
-            return_code = self.process.wait()
-
-            if return_code == 0:
+            self._started_at = time.monotonic()
+            # Built here rather than by the caller: render cache lookups and the merged subtitle
+            # file are too slow for the GUI thread on long timelines.
+            try:
+                timeline = _substitute_render_cache(self.timeline, self.project_settings, self.export_settings, self.render_cache)
+                self.ffmpeg_cmd = build_export_command(timeline, self.project_settings, self.export_settings)
+            except Exception as e:
+                self.finished.emit(False, f"Error building FFmpeg command: {e}")
+                return
+            if self._cancelled:
+                self.finished.emit(False, "Export cancelled.")
+                return
+            self.process = _popen_ffmpeg(self.ffmpeg_cmd)
+            return_code, stderr_tail = _read_ffmpeg_output(self.process, self._on_progress)
+
+            if self._cancelled:
+                self.finished.emit(False, "Export cancelled.")
+            elif return_code == 0:
                 self.progress.emit(100)
                 self.finished.emit(True, "Export completed successfully!")
             else:
                 print("--- FFmpeg Export FAILED ---")
                 print("Command: " + " ".join(self.ffmpeg_cmd))
-                print("".join(full_output))
+                print("".join(stderr_tail))
                 self.finished.emit(False, f"Export failed with code {return_code}. Check console.")
 
         except FileNotFoundError:
@@ -63,148 +486,334 @@ class _ExportRunner(QObject):
     def get_process(self):
         return self.process
 
-class Encoder(QObject):
+    def cancel(self):
+        self._cancelled = True
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+
+class TimelineSnapshot:
+    # Detached copy of the timeline so exports can be planned off the GUI thread while editing continues.
+    def __init__(self, timeline):
+        self.clips = copy.deepcopy(timeline.clips)
+        resolve = getattr(timeline, 'source_resolver', None)
+        if resolve:
+            for clip in self.clips:
+                clip.source_path = resolve(clip.source_path)
+        self.num_video_tracks = timeline.num_video_tracks
+        self.num_audio_tracks = timeline.num_audio_tracks
+
+    def get_total_duration(self):
+        if not self.clips: return 0
+        return max(c.timeline_end_ms for c in self.clips)
+
+    def cropped(self, start_ms, end_ms):
+        # Snapshot of [start_ms, end_ms) moved to zero, used to export selection regions on their own.
+        snapshot = copy.copy(self)
+        snapshot.clips = []
+        for clip in self.clips:
+            if clip.timeline_end_ms <= start_ms or clip.timeline_start_ms >= end_ms:
+                continue
+            new_clip = copy.deepcopy(clip)
+            new_start_ms = max(clip.timeline_start_ms, start_ms)
+            new_clip.clip_start_ms += new_start_ms - clip.timeline_start_ms
+            new_clip.duration_ms = min(clip.timeline_end_ms, end_ms) - new_start_ms
+            new_clip.timeline_start_ms = new_start_ms - start_ms
+            snapshot.clips.append(new_clip)
+        return snapshot
+
+def _substitute_render_cache(timeline, project_settings, export_settings, render_cache):
+    if render_cache is not None and export_settings.get('use_render_cache') and export_settings.get('vcodec'):
+        return render_cache.substitute_timeline(timeline, project_settings)
+    return timeline
+
+def create_export_runner(timeline, project_settings, export_settings, keyframe_index=None, render_cache=None):
+    # Only snapshots the timeline; commands are built in the runner's run() on its worker thread.
+    snapshot = timeline if isinstance(timeline, TimelineSnapshot) else TimelineSnapshot(timeline)
+    segmented = export_settings.get('parallel') or export_settings.get('smart_render') or export_settings.get('resumable')
+    if segmented and supports_parallel_export(export_settings):
+        return _SegmentedExportRunner(snapshot, project_settings, export_settings, keyframe_index, render_cache)
+    return _ExportRunner(snapshot, project_settings, export_settings, render_cache)
+
+class _SegmentedExportRunner(QObject):
     progress = pyqtSignal(int)
+    progress_info = pyqtSignal(object)
     finished = pyqtSignal(bool, str)
 
-    def __init__(self, parent=None):
+    def __init__(self, timeline, project_settings, export_settings, keyframe_index=None, render_cache=None, parent=None):
         super().__init__(parent)
-        self.worker_thread = None
-        self.worker = None
-        self._is_running = False
-
-    def start_export(self, timeline, project_settings, export_settings):
-        if self._is_running:
-            self.finished.emit(False, "An export is already in progress.")
+        self.timeline = timeline if isinstance(timeline, TimelineSnapshot) else TimelineSnapshot(timeline)
+        self.render_cache = render_cache
+        self.project_settings = project_settings
+        self.export_settings = export_settings
+        self.keyframe_index = keyframe_index
+        self.smart_render = bool(export_settings.get('smart_render')) and keyframe_index is not None
+        self.workers = max(1, export_settings.get('workers') or get_default_parallel_workers()) if export_settings.get('parallel') else 1
+        # Deterministic per output so an interrupted export can pick up its finished segments.
+        self.work_dir = export_settings['output_path'] + ".parts"
+        self.resumable = bool(export_settings.get('resumable'))
+        self.manifest = {'version': RESUME_MANIFEST_VERSION, 'jobs': {}}
+        self.resumed_jobs = 0
+        self.segment_format, self.segment_ext = intermediate_format_for(export_settings['vcodec']) if self.smart_render else ('matroska', 'mkv')
+        self.processes = set()
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._job_progress = {}
+        self._last_percentage = -1
+        self._started_at = time.monotonic()
+        self.jobs = []
+        self.job_outputs = {}
+        self.segment_paths = []
+        self.audio_path = None
+        self.copied_segments = 0
+        if not self.timeline.clips:
+            raise ValueError("Timeline is empty.")
+
+    def _plan_jobs(self):
+        # Runs on the worker thread: smart render may have to build keyframe indexes first.
+        fps = self.project_settings['fps']
+        total_frames = int(round(self.timeline.get_total_duration() * fps / 1000.0))
+        if self.smart_render:
+            pieces = plan_smart_render(
+                self.timeline.clips, fps, self.project_settings['width'], self.project_settings['height'],
+                self.export_settings['vcodec'], total_frames, self.keyframe_index
+            )
+        else:
+            pieces = [('encode', 0, total_frames)]
+
+        for piece in pieces:
+            if piece[0] == 'copy':
+                _, start_frame, end_frame, source_path, source_start_sec = piece
+                segment_path, cmd = self._copy_command(len(self.segment_paths), start_frame, end_frame, source_path, source_start_sec)
+                self._add_segment_job(segment_path, cmd, (end_frame - start_frame) * 1000.0 / fps)
+                self.copied_segments += 1
+                continue
+            max_segment_sec = RESUME_MAX_SEGMENT_SEC if self.resumable else None
+            for start_frame, end_frame in plan_export_segments(self.timeline, fps, self.workers, piece[1], piece[2], max_segment_sec):
+                segment_path, cmd = self._segment_command(len(self.segment_paths), start_frame, end_frame)
+                self._add_segment_job(segment_path, cmd, (end_frame - start_frame) * 1000.0 / fps)
+
+        self.audio_path, audio_cmd = self._audio_command()
+        if audio_cmd:
+            # Audio is cheap to render; doing it once avoids gaps and clicks at segment joins.
+            self.jobs.insert(0, ('audio', audio_cmd))
+            self.job_outputs['audio'] = (self.audio_path, self.timeline.get_total_duration())
+
+        total_ms = self.timeline.get_total_duration()
+        self._progress_total = max(1.0, total_ms * (1.0 + (PARALLEL_AUDIO_PROGRESS_WEIGHT if audio_cmd else 0.0)))
+
+    def _add_segment_job(self, segment_path, cmd, duration_ms):
+        key = f"segment_{len(self.segment_paths)}"
+        self.segment_paths.append(segment_path)
+        self.jobs.append((key, cmd))
+        self.job_outputs[key] = (segment_path, duration_ms)
+
+    def _job_hash(self, cmd):
+        # The command pins the timeline range, graph and encoder settings; input fingerprints catch
+        # source files that were replaced or re-saved since the segment was written.
+        digest = hashlib.sha1(json.dumps([str(arg) for arg in cmd]).encode('utf-8'))
+        for i, arg in enumerate(cmd[:-1]):
+            if arg == '-i' and os.path.isfile(cmd[i + 1]):
+                digest.update(source_fingerprint(cmd[i + 1]).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _load_manifest(self):
+        manifest_path = os.path.join(self.work_dir, RESUME_MANIFEST_NAME)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == RESUME_MANIFEST_VERSION:
+                self.manifest = manifest
+        except (OSError, ValueError):
+            pass
+
+    def _save_manifest(self):
+        manifest_path = os.path.join(self.work_dir, RESUME_MANIFEST_NAME)
+        with open(manifest_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    def _is_checkpointed(self, key, job_hash):
+        entry = self.manifest['jobs'].get(key)
+        path = self.job_outputs[key][0]
+        if not entry or entry.get('hash') != job_hash or not os.path.exists(path):
+            return False
+        return os.path.getsize(path) == entry.get('size') and _file_sha1(path) == entry.get('sha1')
+
+    def _record_checkpoint(self, key, job_hash):
+        path = self.job_outputs[key][0]
+        entry = {'hash': job_hash, 'size': os.path.getsize(path), 'sha1': _file_sha1(path)}
+        with self._lock:
+            self.manifest['jobs'][key] = entry
+            self._save_manifest()
+
+    def _pending_jobs(self):
+        # Finished outputs whose command and contents still match are reused instead of re-encoded.
+        if not self.resumable:
+            return [(key, cmd, None) for key, cmd in self.jobs]
+        self._load_manifest()
+        pending = []
+        for key, cmd in self.jobs:
+            job_hash = self._job_hash(cmd)
+            if self._is_checkpointed(key, job_hash):
+                self.resumed_jobs += 1
+                duration_ms = self.job_outputs[key][1]
+                self._job_progress[key] = {'frame': 0, 'fps': None, 'speed': None, 'out_time_ms': duration_ms, 'bitrate': None, 'done': True}
+            else:
+                self.manifest['jobs'].pop(key, None)
+                pending.append((key, cmd, job_hash))
+        self._save_manifest()
+        return pending
+
+    def _run_job(self, key, cmd, job_hash=None):
+        if self._cancelled:
+            return 1, []
+        process = _popen_ffmpeg(cmd)
+        with self._lock:
+            self.processes.add(process)
+        try:
+            return_code, output = _read_ffmpeg_output(process, lambda info: self._on_job_progress(key, info))
+        finally:
+            with self._lock:
+                self.processes.discard(process)
+        if return_code != 0 and not self._cancelled:
+            print(f"--- FFmpeg Export job '{key}' FAILED ---")
+            print("Command: " + " ".join(cmd))
+            print("".join(output))
+        if return_code == 0 and job_hash and not self._cancelled:
+            self._record_checkpoint(key, job_hash)
+        return return_code, output
+
+    def _on_job_progress(self, key, info):
+        if key == 'join' or info['out_time_ms'] is None:
             return
+        with self._lock:
+            self._job_progress[key] = info
+            weighted = sum(i['out_time_ms'] * (PARALLEL_AUDIO_PROGRESS_WEIGHT if k == 'audio' else 1.0) for k, i in self._job_progress.items())
+            fraction = min(1.0, weighted / self._progress_total)
+            running = [i for k, i in self._job_progress.items() if k != 'audio' and not i['done']]
+            summary = {
+                'frame': sum(i['frame'] or 0 for k, i in self._job_progress.items() if k != 'audio'),
+                'fps': sum(i['fps'] or 0.0 for i in running),
+                'speed': sum(i['speed'] or 0.0 for i in running),
+                'out_time_ms': int(weighted),
+                'bitrate': None,
+                'done': False,
+                'percentage': min(99, int(fraction * 100)),
+                'eta_sec': _eta_sec(self._started_at, fraction),
+            }
+            percentage_changed = summary['percentage'] != self._last_percentage
+            self._last_percentage = summary['percentage']
+        if percentage_changed:
+            self.progress.emit(summary['percentage'])
+        self.progress_info.emit(summary)
+
+    def _segment_command(self, index, start_frame, end_frame):
+        w, h, fps = self.project_settings['width'], self.project_settings['height'], self.project_settings['fps']
+        start_ms = start_frame * 1000.0 / fps
+        end_ms = end_frame * 1000.0 / fps
+        video = build_video_stream(self.timeline.clips, w, h, fps, start_ms, end_ms)
+
+        output_args = {
+            'vcodec': self.export_settings['vcodec'],
+            'frames:v': end_frame - start_frame,
+            'g': max(1, int(round(fps * PARALLEL_GOP_SEC))),
+            'threads': max(1, (os.cpu_count() or 1) // self.workers),
+            'an': None,
+            'f': self.segment_format,
+        }
+        if self.export_settings.get('v_bitrate'): output_args['b:v'] = self.export_settings['v_bitrate']
+        output_args.update(self.export_settings.get('encoder_options') or {})
+
+        segment_path = os.path.join(self.work_dir, f"segment_{index:05d}.{self.segment_ext}")
+        return segment_path, compile_ffmpeg(ffmpeg.output(video, segment_path, **output_args).overwrite_output())
+
+    def _copy_command(self, index, start_frame, end_frame, source_path, source_start_sec):
+        # Seeking just past the keyframe makes the demuxer start exactly on it; packets are counted in
+        # decode order, which covers whole closed GOPs because the range ends on the next keyframe.
+        segment_path = os.path.join(self.work_dir, f"segment_{index:05d}.{self.segment_ext}")
+        cmd = [
+            'ffmpeg', '-y', '-ss', f"{source_start_sec + SMART_RENDER_SEEK_EPSILON_SEC:.6f}", '-i', source_path,
+            '-map', '0:v:0', '-c', 'copy', '-frames:v', str(end_frame - start_frame),
+            '-avoid_negative_ts', 'make_zero', '-f', self.segment_format, segment_path
+        ]
+        return segment_path, cmd
+
+    def _audio_command(self):
+        audio = build_audio_stream(self.timeline) if self.export_settings.get('acodec') else None
+        if audio is None:
+            return None, None
+        output_args = {'acodec': self.export_settings['acodec'], 'vn': None, 'f': 'matroska'}
+        if self.export_settings.get('a_bitrate'): output_args['b:a'] = self.export_settings['a_bitrate']
+        audio_path = os.path.join(self.work_dir, "audio.mka")
+        return audio_path, compile_ffmpeg(ffmpeg.output(audio, audio_path, **output_args).overwrite_output())
+
+    def _join_command(self, list_path, audio_path):
+        cmd = ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', list_path]
+        if audio_path:
+            cmd += ['-i', audio_path, '-map', '0:v', '-map', '1:a']
+        else:
+            cmd += ['-map', '0:v', '-an']
+        return cmd + ['-c', 'copy', self.export_settings['output_path']]
 
-        self._is_running = True
-
+    def run(self):
+        completed = False
         try:
-            total_dur_ms = timeline.get_total_duration()
-            total_dur_sec = total_dur_ms / 1000.0
-            w, h, fps = project_settings['width'], project_settings['height'], project_settings['fps']
-            sample_rate, channel_layout = '44100', 'stereo'
-
-
-            all_video_clips = sorted(
-                [c for c in timeline.clips if c.track_type == 'video' and c.media_type != 'subtitle'],
-                key=lambda c: c.track_index
-            )
-
-            final_video = ffmpeg.input(f'color=c=black:s={w}x{h}:r={fps}:d={total_dur_sec}', f='lavfi')
-
-            for clip in all_video_clips:
-                if clip.media_type == 'image':
-                    clip_input = ffmpeg.input(clip.source_path, loop=1, framerate=fps)
-                else:
-                    clip_input = ffmpeg.input(clip.source_path)
-
-                timeline_start_sec = clip.timeline_start_ms / 1000.0
-                clip_start_sec = clip.clip_start_ms / 1000.0
-                time_shift_sec = timeline_start_sec - clip_start_sec
-
-                timed_layer = (
-                    clip_input.video
-                    .setpts(f'PTS+{time_shift_sec}/TB')
-                    .filter('scale', w, h, force_original_aspect_ratio='decrease')
-                    .filter('pad', w, h, '(ow-iw)/2', '(oh-ih)/2', 'black')
-                )
-
-                timeline_end_sec = (clip.timeline_start_ms + clip.duration_ms) / 1000.0
-                enable_expression = f'between(t,{timeline_start_sec:.6f},{timeline_end_sec:.6f})'
-
-                final_video = ffmpeg.overlay(final_video, timed_layer, enable=enable_expression, eof_action='pass')
-
-            all_subtitle_clips = sorted(
-                [c for c in timeline.clips if c.media_type == 'subtitle'],
-                key=lambda c: c.track_index
-            )
-
-            for sub_clip in all_subtitle_clips:                
-                timeline_start_sec = sub_clip.timeline_start_ms / 1000.0
-                timeline_end_sec = (sub_clip.timeline_start_ms + sub_clip.duration_ms) / 1000.0
-                enable_expression = f'between(t,{timeline_start_sec:.6f},{timeline_end_sec:.6f})'
-                subtitle_layer = (
-                    ffmpeg.input(f'color=c=black@0.0:s={w}x{h}:r={fps}:d={total_dur_sec}', f='lavfi')
-                    .filter('subtitles', filename=sub_clip.source_path)
-                )
-                final_video = ffmpeg.overlay(final_video, subtitle_layer, enable=enable_expression)
-
-            final_video = final_video.filter('format', pix_fmts='yuv420p').filter('fps', fps=fps)
-
-            track_audio_streams = []
-            for i in range(1, timeline.num_audio_tracks + 1):
-                track_clips = sorted([c for c in timeline.clips if c.track_type == 'audio' and c.track_index == i], key=lambda c: c.timeline_start_ms)
-                if not track_clips:
-                    continue
-
-                track_segments = []
-                last_end_ms = 0
-                for clip in track_clips:
-                    gap_ms = clip.timeline_start_ms - last_end_ms
-                    if gap_ms > 10:
-                        track_segments.append(ffmpeg.input(f'anullsrc=r={sample_rate}:cl={channel_layout}:d={gap_ms/1000.0}', f='lavfi'))
-
-                    clip_start_sec = clip.clip_start_ms / 1000.0
-                    clip_duration_sec = clip.duration_ms / 1000.0
-                    audio_source_node = ffmpeg.input(clip.source_path)
-                    a_seg = audio_source_node.audio.filter('atrim', start=clip_start_sec, duration=clip_duration_sec).filter('asetpts', 'PTS-STARTPTS')
-                    track_segments.append(a_seg)
-                    last_end_ms = clip.timeline_start_ms + clip.duration_ms
-
-                if track_segments:
-                    track_audio_streams.append(ffmpeg.concat(*track_segments, v=0, a=1))
-
-            output_args = {}
-            stream_args = []
-            has_audio = bool(track_audio_streams) and export_settings.get('acodec')
-
-            if export_settings.get('vcodec'):
-                stream_args.append(final_video)
-                output_args['vcodec'] = export_settings['vcodec']
-                if export_settings.get('v_bitrate'): output_args['b:v'] = export_settings['v_bitrate']
-
-            if has_audio:
-                final_audio = ffmpeg.filter(track_audio_streams, 'amix', inputs=len(track_audio_streams), duration='longest')
-                stream_args.append(final_audio)
-                output_args['acodec'] = export_settings['acodec']
-                if export_settings.get('a_bitrate'): output_args['b:a'] = export_settings['a_bitrate']
-            
-            if not has_audio:
-                output_args['an'] = None
-
-            if not stream_args:
-                raise ValueError("No streams to output. Check export settings.")
-                
-            ffmpeg_cmd = ffmpeg.output(*stream_args, export_settings['output_path'], **output_args).overwrite_output().compile()
+            self._started_at = time.monotonic()
+            self.timeline = _substitute_render_cache(self.timeline, self.project_settings, self.export_settings, self.render_cache)
+            self._plan_jobs()
+            if not self.resumable:
+                shutil.rmtree(self.work_dir, ignore_errors=True)
+            os.makedirs(self.work_dir, exist_ok=True)
+            pending = self._pending_jobs()
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(pending)))) as pool:
+                futures = [pool.submit(self._run_job, key, cmd, job_hash) for key, cmd, job_hash in pending]
+                failed = False
+                for future in futures:
+                    return_code, _ = future.result()
+                    if return_code != 0 and not failed and not self._cancelled:
+                        failed = True
+                        self.cancel()
+
+            if self._cancelled and not failed:
+                self.finished.emit(False, "Export cancelled.")
+                return
+            if failed:
+                self.finished.emit(False, "Export failed while encoding segments. Check console.")
+                return
+
+            list_path = os.path.join(self.work_dir, "segments.txt")
+            with open(list_path, "w", encoding="utf-8") as f:
+                for path in self.segment_paths:
+                    f.write(f"file '{os.path.abspath(path)}'\n")
+
+            join_cmd = self._join_command(list_path, self.audio_path)
+            return_code, output = self._run_job('join', join_cmd)
+            if return_code != 0:
+                self.finished.emit(False, f"Export failed while joining segments (code {return_code}). Check console.")
+                return
+
+            self.progress.emit(100)
+            summary = f"{len(self.segment_paths)} segments on {self.workers} workers"
+            if self.smart_render:
+                summary += f", {self.copied_segments} stream-copied"
+            if self.resumed_jobs:
+                summary += f", {self.resumed_jobs} resumed"
+            completed = True
+            self.finished.emit(True, f"Export completed successfully! ({summary})")
 
+        except FileNotFoundError:
+            self.finished.emit(False, "Export failed: ffmpeg.exe not found in your system's PATH.")
         except Exception as e:
-            self.finished.emit(False, f"Error building FFmpeg command: {e}")
-            self._is_running = False
-            return
-
-        self.worker_thread = QThread()
-        self.worker = _ExportRunner(ffmpeg_cmd, total_dur_ms)
-        self.worker.moveToThread(self.worker_thread)
-
-        self.worker.progress.connect(self.progress.emit)
-        self.worker.finished.connect(self._on_export_runner_finished)
-
-        self.worker_thread.started.connect(self.worker.run)
-        self.worker_thread.start()
-
-    def _on_export_runner_finished(self, success, message):
-        self._is_running = False
-        self.finished.emit(success, message)
-        
-        if self.worker_thread:
-            self.worker_thread.quit()
-            self.worker_thread.wait()
-        self.worker_thread = None
-        self.worker = None
-
-    def cancel_export(self):
-        if self.worker and self.worker.get_process() and self.worker.get_process().poll() is None:
-            self.worker.get_process().terminate()
-            print("Export cancelled by user.")
\ No newline at end of file
+            self.finished.emit(False, f"An exception occurred during export: {e}")
+        finally:
+            # Resumable exports keep their finished segments until the output is complete.
+            if completed or not self.resumable:
+                shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def cancel(self):
+        self._cancelled = True
+        with self._lock:
+            processes = list(self.processes)
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
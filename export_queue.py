@@ -0,0 +1,350 @@
+import os
+import uuid
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
+                             QTableWidgetItem, QProgressBar, QSpinBox, QLabel, QHeaderView,
+                             QAbstractItemView)
+from PyQt6.QtCore import Qt, QObject, QThread, pyqtSignal
+
+from encoding import TimelineSnapshot, create_export_runner
+from smart_render import KeyframeIndex
+
+EXPORT_QUEUE_DEFAULT_CONCURRENCY = 1
+
+JOB_QUEUED = "Queued"
+JOB_RUNNING = "Running"
+JOB_DONE = "Done"
+JOB_FAILED = "Failed"
+JOB_CANCELLED = "Cancelled"
+FINISHED_STATES = [JOB_DONE, JOB_FAILED, JOB_CANCELLED]
+ACTIVE_STATES = [JOB_QUEUED, JOB_RUNNING]
+
+def _within(path, directory):
+    return path == directory or path.startswith(directory + os.sep)
+
+def outputs_overlap(path_a, path_b):
+    # Same file, or one inside the other's resumable <output>.parts directory.
+    a, b = os.path.normcase(os.path.abspath(path_a)), os.path.normcase(os.path.abspath(path_b))
+    return a == b or _within(a, b + ".parts") or _within(b, a + ".parts")
+
+class ExportJob:
+    def __init__(self, name, timeline, project_settings, export_settings, priority=0):
+        self.id = str(uuid.uuid4())
+        self.name = name
+        # Everything is captured at enqueue time so later edits never leak into a queued render.
+        self.snapshot = timeline if isinstance(timeline, TimelineSnapshot) else TimelineSnapshot(timeline)
+        self.project_settings = dict(project_settings)
+        self.export_settings = dict(export_settings)
+        self.priority = priority
+        self.status = JOB_QUEUED
+        self.progress = 0
+        self.message = ""
+        self.info = None
+        self.cancel_requested = False
+
+class _JobRelay(QObject):
+    # Lives on the GUI thread so runner signals arrive queued and tagged with their job.
+    def __init__(self, queue, job_id):
+        super().__init__()
+        self.queue = queue
+        self.job_id = job_id
+
+    def on_progress(self, percentage):
+        self.queue._on_job_progress(self.job_id, percentage)
+
+    def on_progress_info(self, info):
+        self.queue._on_job_progress_info(self.job_id, info)
+
+    def on_finished(self, success, message):
+        self.queue._on_job_finished(self.job_id, success, message)
+
+class ExportQueue(QObject):
+    jobs_changed = pyqtSignal()
+    job_updated = pyqtSignal(str)
+    job_finished = pyqtSignal(str, bool, str)
+
+    def __init__(self, max_concurrent=EXPORT_QUEUE_DEFAULT_CONCURRENCY, parent=None):
+        super().__init__(parent)
+        self.jobs = []
+        self.max_concurrent = max(1, max_concurrent)
+        self.keyframe_index = KeyframeIndex()
+        self.render_cache = None
+        self.running = {}
+
+    def job(self, job_id):
+        return next((j for j in self.jobs if j.id == job_id), None)
+
+    def output_in_use(self, output_path, exclude=None):
+        return any(j is not exclude and j.status in ACTIVE_STATES and outputs_overlap(output_path, j.export_settings['output_path'])
+                   for j in self.jobs)
+
+    def _free_output_path(self, output_path):
+        base, ext = os.path.splitext(output_path)
+        n = 2
+        while self.output_in_use(output_path):
+            output_path = f"{base}_{n}{ext}"
+            n += 1
+        return output_path
+
+    def enqueue(self, name, timeline, project_settings, export_settings, priority=0):
+        # Two jobs writing one file or .parts directory would corrupt each other, so a colliding
+        # job is renamed to the next free <name>_N instead.
+        output_path = export_settings['output_path']
+        if self.output_in_use(output_path):
+            free_path = self._free_output_path(output_path)
+            if name == os.path.basename(output_path):
+                name = os.path.basename(free_path)
+            export_settings = dict(export_settings, output_path=free_path)
+        job = ExportJob(name, timeline, project_settings, export_settings, priority)
+        self.jobs.append(job)
+        self.jobs_changed.emit()
+        self._schedule()
+        return job
+
+    def set_max_concurrent(self, max_concurrent):
+        self.max_concurrent = max(1, max_concurrent)
+        self._schedule()
+
+    def set_priority(self, job_id, priority):
+        job = self.job(job_id)
+        if job and job.priority != priority:
+            job.priority = priority
+            self.job_updated.emit(job_id)
+
+    def move(self, job_id, offset):
+        job = self.job(job_id)
+        if not job: return
+        index = self.jobs.index(job)
+        new_index = max(0, min(len(self.jobs) - 1, index + offset))
+        if new_index != index:
+            self.jobs.insert(new_index, self.jobs.pop(index))
+            self.jobs_changed.emit()
+
+    def cancel(self, job_id):
+        job = self.job(job_id)
+        if not job: return
+        if job.status == JOB_QUEUED:
+            self._set_status(job, JOB_CANCELLED, "Cancelled before start.")
+            self.job_finished.emit(job_id, False, job.message)
+        elif job_id in self.running:
+            job.cancel_requested = True
+            self.running[job_id][1].cancel()
+
+    def retry(self, job_id):
+        job = self.job(job_id)
+        if job and job.status in (JOB_FAILED, JOB_CANCELLED):
+            if self.output_in_use(job.export_settings['output_path'], exclude=job):
+                self._set_status(job, job.status, "Output is in use by another queued or running export.")
+                return
+            job.progress = 0
+            job.info = None
+            job.cancel_requested = False
+            self._set_status(job, JOB_QUEUED, "")
+            self._schedule()
+
+    def remove(self, job_id):
+        job = self.job(job_id)
+        if job and job_id not in self.running:
+            self.jobs.remove(job)
+            self.jobs_changed.emit()
+
+    def clear_finished(self):
+        remaining = [j for j in self.jobs if j.status not in FINISHED_STATES]
+        if len(remaining) != len(self.jobs):
+            self.jobs = remaining
+            self.jobs_changed.emit()
+
+    def cancel_all(self, wait=False):
+        for job in self.jobs:
+            if job.status == JOB_QUEUED:
+                job.status = JOB_CANCELLED
+        for job_id, (thread, worker, relay) in list(self.running.items()):
+            self.job(job_id).cancel_requested = True
+            worker.cancel()
+            if wait:
+                thread.quit()
+                thread.wait(2000)
+
+    def _set_status(self, job, status, message):
+        job.status = status
+        job.message = message
+        self.job_updated.emit(job.id)
+
+    def _next_job(self):
+        # Higher priority first; list order breaks ties, so reordering only matters within a priority.
+        queued = [(-j.priority, i, j) for i, j in enumerate(self.jobs) if j.status == JOB_QUEUED]
+        return min(queued, key=lambda entry: entry[:2])[2] if queued else None
+
+    def _schedule(self):
+        while len(self.running) < self.max_concurrent:
+            job = self._next_job()
+            if job is None:
+                return
+            self._start(job)
+
+    def _start(self, job):
+        try:
+            worker = create_export_runner(job.snapshot, job.project_settings, job.export_settings, self.keyframe_index, self.render_cache)
+        except Exception as e:
+            self._set_status(job, JOB_FAILED, f"Error building FFmpeg command: {e}")
+            self.job_finished.emit(job.id, False, job.message)
+            return
+
+        thread = QThread()
+        relay = _JobRelay(self, job.id)
+        worker.moveToThread(thread)
+        worker.progress.connect(relay.on_progress)
+        worker.progress_info.connect(relay.on_progress_info)
+        worker.finished.connect(relay.on_finished)
+        thread.started.connect(worker.run)
+
+        self.running[job.id] = (thread, worker, relay)
+        self._set_status(job, JOB_RUNNING, "")
+        thread.start()
+
+    def _on_job_progress(self, job_id, percentage):
+        job = self.job(job_id)
+        if job:
+            job.progress = percentage
+            self.job_updated.emit(job_id)
+
+    def _on_job_progress_info(self, job_id, info):
+        job = self.job(job_id)
+        if job:
+            job.info = info
+            self.job_updated.emit(job_id)
+
+    def _on_job_finished(self, job_id, success, message):
+        entry = self.running.pop(job_id, None)
+        if entry:
+            thread, worker, relay = entry
+            thread.quit()
+            thread.wait()
+            worker.deleteLater()
+            thread.deleteLater()
+            relay.deleteLater()
+
+        job = self.job(job_id)
+        if job:
+            if success:
+                job.progress = 100
+                self._set_status(job, JOB_DONE, message)
+            else:
+                self._set_status(job, JOB_CANCELLED if job.cancel_requested else JOB_FAILED, message)
+        self.job_finished.emit(job_id, success, message)
+        self._schedule()
+
+class ExportQueueWidget(QWidget):
+    COLUMNS = ["Name", "Output", "Priority", "Status", "Progress"]
+
+    def __init__(self, export_queue, parent=None):
+        super().__init__(parent)
+        self.queue = export_queue
+
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.table.itemSelectionChanged.connect(self._update_buttons)
+        layout.addWidget(self.table)
+
+        buttons_layout = QHBoxLayout()
+        self.up_button = QPushButton("Up")
+        self.down_button = QPushButton("Down")
+        self.cancel_button = QPushButton("Cancel")
+        self.retry_button = QPushButton("Retry")
+        self.remove_button = QPushButton("Remove")
+        self.clear_button = QPushButton("Clear Finished")
+        self.up_button.clicked.connect(lambda: self._with_selected(lambda job_id: self.queue.move(job_id, -1)))
+        self.down_button.clicked.connect(lambda: self._with_selected(lambda job_id: self.queue.move(job_id, 1)))
+        self.cancel_button.clicked.connect(lambda: self._with_selected(self.queue.cancel))
+        self.retry_button.clicked.connect(lambda: self._with_selected(self.queue.retry))
+        self.remove_button.clicked.connect(lambda: self._with_selected(self.queue.remove))
+        self.clear_button.clicked.connect(self.queue.clear_finished)
+        for button in [self.up_button, self.down_button, self.cancel_button, self.retry_button, self.remove_button, self.clear_button]:
+            buttons_layout.addWidget(button)
+        buttons_layout.addStretch()
+        buttons_layout.addWidget(QLabel("Concurrent Jobs:"))
+        self.concurrency_spinbox = QSpinBox()
+        self.concurrency_spinbox.setRange(1, max(1, os.cpu_count() or 1))
+        self.concurrency_spinbox.setValue(self.queue.max_concurrent)
+        self.concurrency_spinbox.valueChanged.connect(self.queue.set_max_concurrent)
+        buttons_layout.addWidget(self.concurrency_spinbox)
+        layout.addLayout(buttons_layout)
+
+        self.queue.jobs_changed.connect(self._rebuild)
+        self.queue.job_updated.connect(self._update_row)
+        self._rebuild()
+
+    def _selected_job_id(self):
+        rows = self.table.selectionModel().selectedRows()
+        if not rows: return None
+        item = self.table.item(rows[0].row(), 0)
+        return item.data(Qt.ItemDataRole.UserRole) if item else None
+
+    def _with_selected(self, action):
+        job_id = self._selected_job_id()
+        if job_id:
+            action(job_id)
+
+    def _rebuild(self):
+        selected_id = self._selected_job_id()
+        self.table.setRowCount(len(self.queue.jobs))
+        for row, job in enumerate(self.queue.jobs):
+            name_item = QTableWidgetItem(job.name)
+            name_item.setData(Qt.ItemDataRole.UserRole, job.id)
+            self.table.setItem(row, 0, name_item)
+            self.table.setItem(row, 1, QTableWidgetItem(job.export_settings.get('output_path', '')))
+            self.table.setItem(row, 3, QTableWidgetItem(job.status))
+
+            priority_spinbox = QSpinBox()
+            priority_spinbox.setRange(-10, 10)
+            priority_spinbox.setValue(job.priority)
+            priority_spinbox.valueChanged.connect(lambda value, job_id=job.id: self.queue.set_priority(job_id, value))
+            self.table.setCellWidget(row, 2, priority_spinbox)
+
+            progress_bar = QProgressBar()
+            progress_bar.setRange(0, 100)
+            progress_bar.setValue(job.progress)
+            self.table.setCellWidget(row, 4, progress_bar)
+
+            if job.id == selected_id:
+                self.table.selectRow(row)
+        self._update_buttons()
+
+    def _row_for(self, job_id):
+        for row in range(self.table.rowCount()):
+            item = self.table.item(row, 0)
+            if item and item.data(Qt.ItemDataRole.UserRole) == job_id:
+                return row
+        return -1
+
+    def _update_row(self, job_id):
+        job = self.queue.job(job_id)
+        row = self._row_for(job_id)
+        if job is None or row == -1:
+            return
+        status_item = self.table.item(row, 3)
+        status_item.setText(job.status)
+        status_item.setToolTip(job.message)
+        progress_bar = self.table.cellWidget(row, 4)
+        progress_bar.setValue(job.progress)
+        eta_sec = job.info.get('eta_sec') if job.info and job.status == JOB_RUNNING else None
+        if eta_sec is not None:
+            minutes, seconds = divmod(int(eta_sec), 60)
+            progress_bar.setFormat(f"%p% (ETA {minutes}:{seconds:02d})")
+        else:
+            progress_bar.setFormat("%p%")
+        self._update_buttons()
+
+    def _update_buttons(self):
+        job = self.queue.job(self._selected_job_id()) if self._selected_job_id() else None
+        has_job = job is not None
+        self.up_button.setEnabled(has_job)
+        self.down_button.setEnabled(has_job)
+        self.cancel_button.setEnabled(has_job and job.status in (JOB_QUEUED, JOB_RUNNING))
+        self.retry_button.setEnabled(has_job and job.status in (JOB_FAILED, JOB_CANCELLED))
+        self.remove_button.setEnabled(has_job and job.status != JOB_RUNNING)
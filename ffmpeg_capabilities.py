@@ -0,0 +1,227 @@
+import os
+import re
+import json
+import shutil
+import subprocess
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from media_cache import CACHE_ROOT
+
+FFMPEG_CAPABILITIES_CACHE_PATH = os.path.join(CACHE_ROOT, "ffmpeg_capabilities.json")
+FFMPEG_CAPABILITIES_VERSION = 1
+
+_capabilities = None
+# Set when the tables in _capabilities are empty because probing failed; CapabilityRefresher retries.
+_capabilities_failed = False
+
+def _empty_capabilities():
+    return {'formats': {}, 'video_codecs': {}, 'audio_codecs': {}}
+
+def run_ffmpeg_command(args):
+    try:
+        startupinfo = None
+        if hasattr(subprocess, 'STARTUPINFO'):
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = subprocess.SW_HIDE
+
+        result = subprocess.run(
+            ['ffmpeg'] + args,
+            capture_output=True, text=True, encoding='utf-8',
+            errors='ignore', startupinfo=startupinfo
+        )
+        if result.returncode != 0 and "Unrecognized option" not in result.stderr:
+             print(f"FFmpeg command failed: {' '.join(args)}\n{result.stderr}")
+             return ""
+        return result.stdout
+    except FileNotFoundError:
+        print("Error: ffmpeg not found. Please ensure it is in your system's PATH.")
+        return None
+    except Exception as e:
+        print(f"An error occurred while running ffmpeg: {e}")
+        return None
+
+def parse_formats(output):
+    formats = {}
+    lines = output.split('\n')
+    header_found = False
+    for line in lines:
+        if "---" in line:
+            header_found = True
+            continue
+        if not header_found or not line.strip():
+            continue
+
+        if line[2] == 'E':
+            parts = line[4:].strip().split(None, 1)
+            if len(parts) == 2:
+                names, description = parts
+                primary_name = names.split(',')[0].strip()
+                formats[primary_name] = description.strip()
+
+    return dict(sorted(formats.items()))
+
+def parse_encoders(output):
+    video_codecs = {}
+    audio_codecs = {}
+    lines = output.split('\n')
+
+    header_found = False
+    for line in lines:
+        if "------" in line:
+            header_found = True
+            continue
+
+        if not header_found or not line.strip():
+            continue
+
+        parts = line.strip().split(None, 2)
+        if len(parts) < 3:
+            continue
+
+        flags, name, description = parts
+        type_flag = flags[0]
+        clean_description = re.sub(r'\s*\(codec .*\)$', '', description).strip()
+
+        if type_flag == 'V':
+            video_codecs[name] = clean_description
+        elif type_flag == 'A':
+            audio_codecs[name] = clean_description
+
+    return dict(sorted(video_codecs.items())), dict(sorted(audio_codecs.items()))
+
+def ffmpeg_binary_key():
+    # The binary that would run, plus its size and mtime, so an upgraded or swapped ffmpeg re-probes.
+    path = shutil.which('ffmpeg')
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+
+def probe_capabilities():
+    formats_output = run_ffmpeg_command(['-formats'])
+    if not formats_output:
+        return None
+    encoders_output = run_ffmpeg_command(['-encoders'])
+    if not encoders_output:
+        return None
+    video_codecs, audio_codecs = parse_encoders(encoders_output)
+    return {'formats': parse_formats(formats_output), 'video_codecs': video_codecs, 'audio_codecs': audio_codecs}
+
+class CapabilityCache:
+    def __init__(self, path=FFMPEG_CAPABILITIES_CACHE_PATH):
+        self.path = path
+
+    def get(self, binary_key):
+        if binary_key is None:
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != FFMPEG_CAPABILITIES_VERSION or data.get('binary') != binary_key:
+            return None
+        return data.get('capabilities')
+
+    def put(self, binary_key, capabilities):
+        if binary_key is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'version': FFMPEG_CAPABILITIES_VERSION, 'binary': binary_key, 'capabilities': capabilities}, f, indent=2)
+        except OSError as e:
+            print(f"Could not write ffmpeg capability cache: {e}")
+
+def get_capabilities(cache=None):
+    # In memory, then on disk for the current binary, then probed synchronously as a last resort.
+    # A failed probe is remembered for the session so callers don't each run ffmpeg again.
+    global _capabilities, _capabilities_failed
+    if _capabilities is not None:
+        return _capabilities
+    cache = cache or CapabilityCache()
+    binary_key = ffmpeg_binary_key()
+    capabilities = cache.get(binary_key)
+    if capabilities is None:
+        capabilities = probe_capabilities()
+        if capabilities is None:
+            _capabilities, _capabilities_failed = _empty_capabilities(), True
+            return _capabilities
+        cache.put(binary_key, capabilities)
+    _capabilities = capabilities
+    return _capabilities
+
+def capabilities_failed():
+    return _capabilities_failed
+
+def get_available_formats():
+    return get_capabilities()['formats']
+
+def get_available_codecs(codec_type='video'):
+    return get_capabilities()['video_codecs' if codec_type == 'video' else 'audio_codecs']
+
+class _CapabilityRefreshRunner(QObject):
+    finished = pyqtSignal(object, object)
+
+    def __init__(self, cache, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+
+    def run(self):
+        binary_key = ffmpeg_binary_key()
+        capabilities = self.cache.get(binary_key)
+        if capabilities is None:
+            capabilities = probe_capabilities()
+            if capabilities is not None:
+                self.cache.put(binary_key, capabilities)
+        self.finished.emit(binary_key, capabilities)
+
+class CapabilityRefresher(QObject):
+    # Loads or re-probes the capability tables off the GUI thread at start-up,
+    # so the export dialog never waits on ffmpeg.
+    finished = pyqtSignal(bool)
+
+    def __init__(self, cache=None, parent=None):
+        super().__init__(parent)
+        self.cache = cache or CapabilityCache()
+        self.thread = None
+        self.worker = None
+
+    def is_running(self):
+        return self.worker is not None
+
+    def start(self):
+        if self.worker is not None:
+            return False
+        self.thread = QThread()
+        self.worker = _CapabilityRefreshRunner(self.cache)
+        self.worker.moveToThread(self.thread)
+        self.worker.finished.connect(self._on_worker_finished)
+        self.thread.started.connect(self.worker.run)
+        self.thread.start()
+        return True
+
+    def _on_worker_finished(self, binary_key, capabilities):
+        global _capabilities, _capabilities_failed
+        if self.thread:
+            self.thread.quit()
+            self.thread.wait()
+            self.thread.deleteLater()
+        if self.worker:
+            self.worker.deleteLater()
+        self.thread = None
+        self.worker = None
+        if capabilities is not None:
+            _capabilities, _capabilities_failed = capabilities, False
+        elif _capabilities is None:
+            _capabilities, _capabilities_failed = _empty_capabilities(), True
+        self.finished.emit(capabilities is not None)
+
+    def cancel(self, wait=False):
+        # Probing can't be interrupted part way; this only waits for it when shutting down.
+        if wait and self.thread:
+            self.thread.quit()
+            self.thread.wait(2000)
@@ -0,0 +1,200 @@
+import os
+import hashlib
+import subprocess
+from collections import deque
+from PyQt6.QtCore import QObject, pyqtSignal, QThread
+
+# Anchored to the editor's directory rather than the working directory, which a plugin may
+# change while it loads.
+CACHE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+REINDEX_CACHE_DIR = os.path.join(CACHE_ROOT, "reindex")
+REINDEX_CACHE_MAX_BYTES = 20 * 1024 ** 3
+MP4_FAMILY_EXTENSIONS = ['.mp4', '.m4v', '.mov']
+
+def source_fingerprint(path):
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+class ReindexCache:
+    def __init__(self, cache_dir=REINDEX_CACHE_DIR, max_bytes=REINDEX_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def path_for(self, source_path):
+        ext = os.path.splitext(source_path)[1].lower()
+        out_ext = ext if ext in MP4_FAMILY_EXTENSIONS else '.mkv'
+        return os.path.join(self.cache_dir, f"{source_fingerprint(source_path)}{out_ext}")
+
+    def lookup(self, source_path):
+        try:
+            path = self.path_for(source_path)
+        except OSError:
+            return None
+        if not os.path.exists(path):
+            return None
+        try: os.utime(path)
+        except OSError: pass
+        return path
+
+    def prune(self, keep=()):
+        # Least recently used copies go first; lookup() touches the files it returns. Copies in keep
+        # (still used by the open project) and in-progress .part files are never removed.
+        keep = {os.path.abspath(path) for path in keep}
+        try:
+            entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if not name.endswith('.part')]
+        except OSError:
+            return
+        entries.sort(key=lambda path: os.path.getmtime(path), reverse=True)
+        total = 0
+        for path in entries:
+            if os.path.abspath(path) in keep:
+                continue
+            total += os.path.getsize(path)
+            if total > self.max_bytes:
+                try: os.remove(path)
+                except OSError: pass
+
+class _ReindexRunner(QObject):
+    progress = pyqtSignal(str, int)
+    finished = pyqtSignal(str, bool, str)
+
+    def __init__(self, source_path, target_path, parent=None):
+        super().__init__(parent)
+        self.source_path = source_path
+        self.target_path = target_path
+        self.process = None
+        self._cancelled = False
+
+    def run(self):
+        partial_path = self.target_path + ".part"
+        try:
+            os.makedirs(os.path.dirname(self.target_path), exist_ok=True)
+            source_size = os.path.getsize(self.source_path)
+
+            startupinfo = None
+            if hasattr(subprocess, 'STARTUPINFO'):
+                startupinfo = subprocess.STARTUPINFO()
+                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+            cmd = ['ffmpeg', '-y', '-loglevel', 'error', '-nostats', '-progress', 'pipe:1',
+                   '-i', self.source_path, '-c', 'copy']
+            if self.target_path.endswith(tuple(MP4_FAMILY_EXTENSIONS)):
+                cmd += ['-movflags', 'faststart', '-f', 'mp4']
+            else:
+                cmd += ['-f', 'matroska']
+            cmd.append(partial_path)
+
+            if self._cancelled:
+                self.finished.emit(self.source_path, False, "Re-indexing cancelled.")
+                return
+
+            self.process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                universal_newlines=True,
+                encoding="utf-8",
+                errors='ignore',
+                startupinfo=startupinfo
+            )
+
+            error_lines = deque(maxlen=50)
+            last_percentage = -1
+            for line in iter(self.process.stdout.readline, ""):
+                key, sep, value = line.strip().partition('=')
+                if not sep:
+                    error_lines.append(line)
+                    continue
+                if key == 'total_size' and value.isdigit() and source_size > 0:
+                    percentage = min(99, int(int(value) * 100 / source_size))
+                    if percentage != last_percentage:
+                        last_percentage = percentage
+                        self.progress.emit(self.source_path, percentage)
+
+            self.process.stdout.close()
+            return_code = self.process.wait()
+
+            if self._cancelled:
+                self._remove_partial(partial_path)
+                self.finished.emit(self.source_path, False, "Re-indexing cancelled.")
+            elif return_code == 0:
+                os.replace(partial_path, self.target_path)
+                self.progress.emit(self.source_path, 100)
+                self.finished.emit(self.source_path, True, self.target_path)
+            else:
+                self._remove_partial(partial_path)
+                print(f"--- Re-indexing {self.source_path} FAILED ---")
+                print("".join(error_lines))
+                self.finished.emit(self.source_path, False, "Failed to re-index the file. It may be unsupported or severely corrupt.")
+
+        except FileNotFoundError:
+            self.finished.emit(self.source_path, False, "Re-indexing failed: ffmpeg not found in your system's PATH.")
+        except Exception as e:
+            self._remove_partial(partial_path)
+            self.finished.emit(self.source_path, False, f"An error occurred during file re-indexing: {e}")
+
+    def _remove_partial(self, partial_path):
+        if os.path.exists(partial_path):
+            try: os.remove(partial_path)
+            except OSError: pass
+
+    def cancel(self):
+        self._cancelled = True
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+
+class ReindexManager(QObject):
+    job_started = pyqtSignal(str)
+    job_progress = pyqtSignal(str, int)
+    job_finished = pyqtSignal(str, object, str)
+
+    def __init__(self, cache=None, parent=None):
+        super().__init__(parent)
+        self.cache = cache or ReindexCache()
+        self.jobs = {}
+
+    def is_pending(self, source_path):
+        return source_path in self.jobs
+
+    def request(self, source_path):
+        cached_path = self.cache.lookup(source_path)
+        if cached_path:
+            return cached_path
+        if source_path in self.jobs:
+            return None
+
+        thread = QThread()
+        worker = _ReindexRunner(source_path, self.cache.path_for(source_path))
+        worker.moveToThread(thread)
+
+        thread.started.connect(worker.run)
+        worker.progress.connect(self.job_progress.emit)
+        worker.finished.connect(self._on_job_finished)
+
+        self.jobs[source_path] = (thread, worker)
+        thread.start()
+        self.job_started.emit(source_path)
+        return None
+
+    def _on_job_finished(self, source_path, success, message):
+        job = self.jobs.pop(source_path, None)
+        if job:
+            thread, worker = job
+            thread.quit()
+            thread.wait()
+            worker.deleteLater()
+            thread.deleteLater()
+        self.job_finished.emit(source_path, message if success else None, "" if success else message)
+
+    def cancel(self, source_path):
+        job = self.jobs.get(source_path)
+        if job:
+            job[1].cancel()
+
+    def cancel_all(self, wait=False):
+        for source_path, (thread, worker) in list(self.jobs.items()):
+            worker.cancel()
+            if wait:
+                thread.quit()
+                thread.wait(2000)
@@ -1,12 +1,13 @@
 import ffmpeg
 import numpy as np
-import sounddevice as sd
 import threading
 import time
 from queue import Queue, Empty
 import subprocess
 from PyQt6.QtCore import QObject, pyqtSignal, QTimer
 from PyQt6.QtGui import QImage, QPixmap, QColor
+from encoding import compile_ffmpeg, write_filter_script, remove_filter_script, place_audio_segment
+from subtitles import merged_subtitle_path
 
 AUDIO_BUFFER_SECONDS = 1.0
 VIDEO_BUFFER_SECONDS = 1.0
@@ -25,6 +26,9 @@ class PlaybackManager(QObject):
     def __init__(self, get_timeline_data_func, parent=None):
         super().__init__(parent)
         self.get_timeline_data = get_timeline_data_func
+        self.render_cache = None
+        # sounddevice module, imported on first play so PortAudio is not initialised at startup.
+        self.sounddevice = None
 
         self.is_playing = False
         self.is_muted = False
@@ -43,6 +47,7 @@ class PlaybackManager(QObject):
         self.video_reader_thread = None
         self.audio_reader_thread = None
         self.audio_stream = None
+        self.filter_scripts = []
 
         self.video_queue = None
         self.audio_queue = None
@@ -96,6 +101,9 @@ class PlaybackManager(QObject):
                     except Exception as ke:
                         print(f"Error killing process: {ke}")
 
+        for script_path in self.filter_scripts:
+            remove_filter_script(script_path)
+        self.filter_scripts = []
 
         self.video_reader_thread = None
         self.audio_reader_thread = None
@@ -162,7 +170,7 @@ class PlaybackManager(QObject):
             if self.audio_queue is None: raise Empty
             chunk = self.audio_queue.get_nowait()
             if chunk is None:
-                raise sd.CallbackStop
+                raise self.sounddevice.CallbackStop
             
             chunk_len = len(chunk)
             outdata_len = outdata.shape[0] * outdata.shape[1]
@@ -186,6 +194,16 @@ class PlaybackManager(QObject):
         except Empty:
             outdata.fill(0)
 
+    def _resolve_clips(self, clips, proj_settings):
+        # Pre-rendered complex ranges play from their cache file instead of the live graph.
+        if self.render_cache is None:
+            return clips
+        try:
+            return self.render_cache.substitute(clips, proj_settings)
+        except Exception as e:
+            print(f"Render cache lookup failed: {e}")
+            return clips
+
     def _seek_worker(self):
         while True:
             with self._seek_lock:
@@ -193,6 +211,7 @@ class PlaybackManager(QObject):
                 self._seek_request_ms = -1
             
             timeline, clips, proj_settings = self.get_timeline_data()
+            clips = self._resolve_clips(clips, proj_settings)
             w, h, fps = proj_settings['width'], proj_settings['height'], proj_settings['fps']
 
             video_clip_at_time = next((c for c in sorted(clips, key=lambda x: x.track_index, reverse=True) 
@@ -312,15 +331,6 @@ class PlaybackManager(QObject):
             if segment_clip.media_type == 'image':
                 segment_node = segment_node.filter('loop', loop=-1, size=1, start=0).filter('setpts', 'N/(FRAME_RATE*TB)').filter('trim', duration=clip_duration_ms / 1000.0)
 
-            segment_midpoint_ms = segment_clip.timeline_start_ms + (segment_clip.duration_ms / 2)
-            active_sub_clip = next((sc for sc in subtitle_clips if sc.timeline_start_ms <= segment_midpoint_ms < sc.timeline_end_ms), None)
-
-            if active_sub_clip:
-                time_offset_sec = (segment_clip.timeline_start_ms - active_sub_clip.timeline_start_ms + active_sub_clip.clip_start_ms) / 1000.0
-                segment_node = segment_node.filter('setpts', f'PTS-STARTPTS+{max(0, time_offset_sec):.6f}/TB')
-                segment_node = segment_node.filter('subtitles', filename=active_sub_clip.source_path)
-                segment_node = segment_node.filter('setpts', 'PTS-STARTPTS')
-
             gap_start_ms = max(start_ms, last_end_time_ms)
             if segment_clip.timeline_start_ms > gap_start_ms:
                 gap_duration_sec = (segment_clip.timeline_start_ms - gap_start_ms) / 1000.0
@@ -332,7 +342,19 @@ class PlaybackManager(QObject):
         if not concat_inputs:
             return None
 
-        return ffmpeg.concat(*concat_inputs, v=1, a=0)
+        video_node = ffmpeg.concat(*concat_inputs, v=1, a=0)
+        # One track for the whole timeline, so every play start reuses the same file. Frames are
+        # shifted to timeline time for the subtitles filter and back afterwards.
+        all_subtitle_clips = [c for c in clips if c.media_type == 'subtitle']
+        subtitle_path = merged_subtitle_path(all_subtitle_clips, 0, max(c.timeline_end_ms for c in all_subtitle_clips)) if subtitle_clips else None
+        if subtitle_path:
+            video_node = (
+                video_node
+                .filter('setpts', f'PTS-STARTPTS+{start_ms / 1000.0:.6f}/TB')
+                .filter('subtitles', filename=subtitle_path)
+                .filter('setpts', 'PTS-STARTPTS')
+            )
+        return video_node
 
     def _build_audio_graph(self, start_ms, timeline, clips, proj_settings):
         active_clips = [c for c in clips if c.track_type == 'audio' and c.timeline_end_ms > start_ms]
@@ -352,19 +374,14 @@ class PlaybackManager(QObject):
 
             for clip in track_clips:
                 gap_start_ms = max(start_ms, last_end_time_ms)
-                if clip.timeline_start_ms > gap_start_ms:
-                    gap_duration_sec = (clip.timeline_start_ms - gap_start_ms) / 1000.0
-                    concat_inputs.append(ffmpeg.input(f'anullsrc=r={DEFAULT_SAMPLE_RATE}:cl={DEFAULT_CHANNELS}:d={gap_duration_sec}', f='lavfi'))
-
                 clip_read_start_ms = clip.clip_start_ms + max(0, start_ms - clip.timeline_start_ms)
                 clip_play_start_ms = max(start_ms, clip.timeline_start_ms)
                 clip_remaining_duration_ms = clip.timeline_end_ms - clip_play_start_ms
                 
                 if clip_remaining_duration_ms > 0:
                     segment = ffmpeg.input(clip.source_path, ss=clip_read_start_ms/1000.0, t=clip_remaining_duration_ms/1000.0, re=None).audio
-                    concat_inputs.append(segment)
-                
-                last_end_time_ms = clip.timeline_end_ms
+                    concat_inputs.append(place_audio_segment(segment, clip_play_start_ms - gap_start_ms, clip_remaining_duration_ms))
+                    last_end_time_ms = clip.timeline_end_ms
             
             if concat_inputs:
                 track_streams.append(ffmpeg.concat(*concat_inputs, v=0, a=1))
@@ -393,6 +410,7 @@ class PlaybackManager(QObject):
             self.audio_clock_update_time = 0.0
 
         timeline, clips, proj_settings = self.get_timeline_data()
+        clips = self._resolve_clips(clips, proj_settings)
         w, h, fps = proj_settings['width'], proj_settings['height'], proj_settings['fps']
 
         video_buffer_size = int(fps * VIDEO_BUFFER_SECONDS)
@@ -403,8 +421,9 @@ class PlaybackManager(QObject):
         video_graph = self._build_video_graph(time_ms, timeline, clips, proj_settings)
         if video_graph:
             try:
-                args = (video_graph
-                        .output('pipe:', format='rawvideo', pix_fmt='rgb24', r=fps).compile())
+                args = compile_ffmpeg(video_graph.output('pipe:', format='rawvideo', pix_fmt='rgb24', r=fps))
+                args, script_path = write_filter_script(args)
+                self.filter_scripts.append(script_path)
                 self.video_process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
             except Exception as e:
                 print(f"Failed to start video process: {e}")
@@ -413,7 +432,9 @@ class PlaybackManager(QObject):
         audio_graph = self._build_audio_graph(time_ms, timeline, clips, proj_settings)
         if audio_graph:
             try:
-                args = ffmpeg.output(audio_graph, 'pipe:', format='f32le', ac=DEFAULT_CHANNELS, ar=DEFAULT_SAMPLE_RATE).compile()
+                args = compile_ffmpeg(ffmpeg.output(audio_graph, 'pipe:', format='f32le', ac=DEFAULT_CHANNELS, ar=DEFAULT_SAMPLE_RATE))
+                args, script_path = write_filter_script(args)
+                self.filter_scripts.append(script_path)
                 self.audio_process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
             except Exception as e:
                 print(f"Failed to start audio process: {e}")
@@ -425,7 +446,10 @@ class PlaybackManager(QObject):
         if self.audio_process:
             self.audio_reader_thread = threading.Thread(target=self._audio_reader_thread, args=(self.audio_process,), daemon=True)
             self.audio_reader_thread.start()
-            self.audio_stream = sd.OutputStream(samplerate=DEFAULT_SAMPLE_RATE, channels=DEFAULT_CHANNELS, callback=self._audio_callback, blocksize=AUDIO_CHUNK_SAMPLES)
+            if self.sounddevice is None:
+                import sounddevice
+                self.sounddevice = sounddevice
+            self.audio_stream = self.sounddevice.OutputStream(samplerate=DEFAULT_SAMPLE_RATE, channels=DEFAULT_CHANNELS, callback=self._audio_callback, blocksize=AUDIO_CHUNK_SAMPLES)
             self.audio_stream.start()
 
         self.stream_start_time_monotonic = time.monotonic()
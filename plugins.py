@@ -3,11 +3,11 @@ import sys
 import importlib.util
 import subprocess
 import shutil
-import git
 import json
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem,
                              QPushButton, QLabel, QLineEdit, QMessageBox, QProgressBar,
                              QDialogButtonBox, QWidget, QCheckBox)
+from PyQt6.QtGui import QAction
 from PyQt6.QtCore import Qt, QObject, pyqtSignal, QThread
 
 class VideoEditorPlugin:
@@ -25,43 +25,107 @@ class VideoEditorPlugin:
     def disable(self):
         pass
 
+PLUGIN_MANIFEST_NAME = "plugin.json"
+
+class _PluginStub:
+    # Stands in for a plugin that hasn't been imported yet wherever the app only needs its name.
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+
 class PluginManager:
     def __init__(self, main_app):
         self.app = main_app
-        self.plugins_dir = "plugins"
+        self.plugins_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plugins")
         self.plugins = {}
         if not os.path.exists(self.plugins_dir):
             os.makedirs(self.plugins_dir)
 
     def discover_and_load_plugins(self):
-        for plugin_name in os.listdir(self.plugins_dir):
+        # Plugins with a plugin.json are only registered here; their module is imported when they
+        # are first used. Plugins without one are imported straight away, as before.
+        for plugin_name in sorted(os.listdir(self.plugins_dir)):
             plugin_path = os.path.join(self.plugins_dir, plugin_name)
-            main_py_path = os.path.join(plugin_path, 'main.py')
-            if os.path.isdir(plugin_path) and os.path.exists(main_py_path):
+            if not os.path.isdir(plugin_path):
+                continue
+            manifest_path = os.path.join(plugin_path, PLUGIN_MANIFEST_NAME)
+            if os.path.exists(manifest_path):
                 try:
-                    spec = importlib.util.spec_from_file_location(f"plugins.{plugin_name}.main", main_py_path)
-                    module = importlib.util.module_from_spec(spec)
-                    
-                    sys.path.insert(0, plugin_path)
-                    spec.loader.exec_module(module)
-                    sys.path.pop(0)
-
-                    if hasattr(module, 'Plugin'):
-                        plugin_class = getattr(module, 'Plugin')
-                        instance = plugin_class(self.app)
-                        instance.initialize()
-                        self.plugins[instance.name] = {
-                            'instance': instance,
-                            'enabled': False,
-                            'module_path': plugin_path
-                        }
-                        print(f"Discovered and loaded plugin: {instance.name}")
-                    else:
-                        print(f"Warning: {main_py_path} does not have a 'Plugin' class.")
-                except Exception as e:
-                    print(f"Error loading plugin {plugin_name}: {e}")
-                    import traceback
-                    traceback.print_exc() 
+                    with open(manifest_path, 'r', encoding='utf-8') as f:
+                        manifest = json.load(f)
+                    name = manifest['name']
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Error reading plugin manifest {manifest_path}: {e}")
+                    continue
+                self.plugins[name] = {
+                    'instance': None,
+                    'stub': _PluginStub(name, manifest.get('description', "No description provided.")),
+                    'manifest': manifest,
+                    'hooks': None,
+                    'enabled': False,
+                    'module_path': plugin_path
+                }
+                print(f"Discovered plugin: {name}")
+            elif os.path.exists(os.path.join(plugin_path, 'main.py')):
+                instance = self._import_plugin(plugin_path, "main:Plugin")
+                if instance:
+                    self.plugins[instance.name] = {
+                        'instance': instance,
+                        'stub': instance,
+                        'manifest': {},
+                        'hooks': None,
+                        'enabled': False,
+                        'module_path': plugin_path
+                    }
+                    print(f"Discovered and loaded plugin: {instance.name}")
+
+    def _import_plugin(self, plugin_path, entry_point):
+        module_name, _, class_name = entry_point.partition(':')
+        module_file = os.path.join(plugin_path, f"{module_name}.py")
+        plugin_name = os.path.basename(plugin_path)
+        try:
+            spec = importlib.util.spec_from_file_location(f"plugins.{plugin_name}.{module_name}", module_file)
+            module = importlib.util.module_from_spec(spec)
+
+            sys.path.insert(0, plugin_path)
+            try:
+                spec.loader.exec_module(module)
+            finally:
+                sys.path.remove(plugin_path)
+
+            if not hasattr(module, class_name or 'Plugin'):
+                print(f"Warning: {module_file} does not have a '{class_name or 'Plugin'}' class.")
+                return None
+            instance = getattr(module, class_name or 'Plugin')(self.app)
+            instance.initialize()
+            return instance
+        except Exception as e:
+            print(f"Error loading plugin {plugin_name}: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    def get_plugin(self, name):
+        # The plugin instance, importing its module on first use.
+        data = self.plugins.get(name)
+        if data is None:
+            return None
+        if data['instance'] is None:
+            instance = self._import_plugin(data['module_path'], data['manifest'].get('entry_point', "main:Plugin"))
+            if instance is None:
+                return None
+            print(f"Loaded plugin: {name}")
+            data['instance'] = instance
+            # The plugin's enable() connects its own handler, so the stand-in must go first.
+            if data['hooks'] and data['hooks']['context_menu']:
+                self.app.timeline_widget.context_menu_requested.disconnect(data['hooks']['context_menu'])
+                data['hooks']['context_menu'] = None
+            if data['enabled']:
+                instance.enable()
+        return data['instance']
+
+    def is_loaded(self, name):
+        return name in self.plugins and self.plugins[name]['instance'] is not None
 
     def load_enabled_plugins_from_settings(self, enabled_plugins_list):
         for name in enabled_plugins_list:
@@ -73,20 +137,115 @@ class PluginManager:
 
     def enable_plugin(self, name):
         if name in self.plugins and not self.plugins[name]['enabled']:
-            self.plugins[name]['instance'].enable()
-            self.plugins[name]['enabled'] = True
+            data = self.plugins[name]
+            hooks = data['manifest'].get('hooks')
+            data['enabled'] = True
+            if hooks and data['instance'] is None:
+                # Stand-in UI from the manifest; the module is imported once one of these is used.
+                self._install_hooks(name, hooks)
+            elif data['instance'] is None:
+                # get_plugin() enables it once imported.
+                if self.get_plugin(name) is None:
+                    data['enabled'] = False
+                    return
+            else:
+                if data['hooks']:
+                    self._set_hooks_visible(name, True)
+                data['instance'].enable()
             # Notify the app to update the menu's checkmark
             self.app.toggle_plugin_action(name, True)
             self.app.update_plugin_ui_visibility(name, True)
 
     def disable_plugin(self, name):
         if name in self.plugins and self.plugins[name]['enabled']:
-            self.plugins[name]['instance'].disable()
-            self.plugins[name]['enabled'] = False
+            data = self.plugins[name]
+            if data['instance'] is not None:
+                data['instance'].disable()
+            if data['hooks']:
+                self._set_hooks_visible(name, False)
+            data['enabled'] = False
             # Notify the app to update the menu's checkmark
             self.app.toggle_plugin_action(name, False)
             self.app.update_plugin_ui_visibility(name, False)
 
+    def _install_hooks(self, name, hooks):
+        # Manifest hooks:
+        #   "menu_actions": [{"menu": "&File", "text": ..., "method": ..., "before": "Export"}]
+        #       adds a menu action that calls the plugin method when triggered.
+        #   "docks": [{"title": ..., "method": ...}] adds a dock with a placeholder; when it is first
+        #       shown the plugin is imported and the method is called with the dock.
+        #   "timeline_context_menu": method called with (menu, event) on the timeline's context menu.
+        # Once imported, the plugin's own enable() connects anything else it needs.
+        if self.plugins[name]['hooks'] is not None:
+            self._set_hooks_visible(name, True)
+            return
+        state = {'actions': [], 'docks': [], 'context_menu': None}
+        self.plugins[name]['hooks'] = state
+        stub = self.plugins[name]['stub']
+
+        menu_bar = self.app.menuBar()
+        for spec in hooks.get('menu_actions', []):
+            menu = next((a.menu() for a in menu_bar.actions() if a.menu() and a.text() == spec.get('menu', "&Plugins")), None)
+            if menu is None:
+                print(f"Warning: plugin '{name}' asked for unknown menu '{spec.get('menu')}'.")
+                continue
+            action = QAction(spec['text'], self.app)
+            action.triggered.connect(lambda _, n=name, m=spec['method']: self._call_plugin(n, m))
+            before = next((a for a in menu.actions() if spec.get('before') and spec['before'] in a.text()), None)
+            if before:
+                menu.insertAction(before, action)
+            else:
+                menu.addAction(action)
+            state['actions'].append(action)
+
+        for spec in hooks.get('docks', []):
+            placeholder = QLabel(f"Loading {spec['title']}...")
+            placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            dock = self.app.add_dock_widget(stub, placeholder, spec['title'])
+            state['docks'].append(dock)
+
+            def on_visibility_changed(visible, dock=dock, method=spec['method']):
+                if visible and dock in state['docks']:
+                    state['docks'].remove(dock)
+                    dock.visibilityChanged.disconnect(on_visibility_changed)
+                    self._call_plugin(name, method, dock)
+            dock.visibilityChanged.connect(on_visibility_changed)
+            if dock.isVisible():
+                on_visibility_changed(True)
+
+        self._install_context_hook(name)
+
+    def _install_context_hook(self, name):
+        method = self.plugins[name]['manifest']['hooks'].get('timeline_context_menu')
+        state = self.plugins[name]['hooks']
+        if not method or self.is_loaded(name):
+            return
+
+        def on_context_menu(menu, event):
+            self.app.timeline_widget.context_menu_requested.disconnect(on_context_menu)
+            state['context_menu'] = None
+            plugin = self.get_plugin(name)
+            # enable() has connected the plugin itself, but only for later menus.
+            if plugin is not None:
+                getattr(plugin, method)(menu, event)
+        self.app.timeline_widget.context_menu_requested.connect(on_context_menu)
+        state['context_menu'] = on_context_menu
+
+    def _set_hooks_visible(self, name, visible):
+        state = self.plugins[name]['hooks']
+        for action in state['actions']:
+            action.setVisible(visible)
+        if not visible and state['context_menu']:
+            self.app.timeline_widget.context_menu_requested.disconnect(state['context_menu'])
+            state['context_menu'] = None
+        elif visible and state['context_menu'] is None and not self.is_loaded(name):
+            self._install_context_hook(name)
+
+    def _call_plugin(self, name, method, *args):
+        plugin = self.get_plugin(name)
+        if plugin is not None and self.plugins[name]['enabled']:
+            return getattr(plugin, method)(*args)
+
     def uninstall_plugin(self, name):
         if name in self.plugins:
             path = self.plugins[name]['module_path']
@@ -119,6 +278,7 @@ class InstallWorker(QObject):
                 self.finished.emit(f"Directory '{repo_name}' already exists.", False)
                 return
 
+            import git
             git.Repo.clone_from(self.url, clone_path)
             
             req_path = os.path.join(clone_path, 'requirements.txt')
@@ -178,7 +338,7 @@ class ManagePluginsDialog(QDialog):
 
             checkbox = QCheckBox(name)
             checkbox.setChecked(data['enabled'])
-            checkbox.setToolTip(data['instance'].description)
+            checkbox.setToolTip(data['stub'].description)
             self.plugin_checkboxes[name] = checkbox
             item_layout.addWidget(checkbox, 1)
 
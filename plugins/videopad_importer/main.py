@@ -3,7 +3,6 @@ import uuid
 import re
 import urllib.parse
 from PyQt6.QtWidgets import QFileDialog, QMessageBox
-from PyQt6.QtGui import QAction
 
 from plugins import VideoEditorPlugin
 from videoeditor import TimelineClip
@@ -91,34 +90,6 @@ class Plugin(VideoEditorPlugin):
         super().__init__(app_instance)
         self.name = "VideoPad Importer"
         self.description = "Imports project files (.vpj) from VideoPad Video Editor."
-        self.import_action = None
-
-    def initialize(self):
-        self.import_action = QAction("Import VideoPad Project...", self.app)
-        self.import_action.triggered.connect(self.run_import_process)
-        self.import_action.setVisible(False)
-
-    def enable(self):
-        if not self.import_action:
-            return
-
-        menu_bar = self.app.menuBar()
-        file_menu = next((action.menu() for action in menu_bar.actions() if action.text() == "&File"), None)
-
-        if file_menu and self.import_action not in file_menu.actions():
-            target_action = next((action for action in file_menu.actions() if "Export" in action.text()), None)
-            if target_action:
-                file_menu.insertAction(target_action, self.import_action)
-                file_menu.insertSeparator(target_action)
-            else:
-                file_menu.addSeparator()
-                file_menu.addAction(self.import_action)
-
-        self.import_action.setVisible(True)
-
-    def disable(self):
-        if self.import_action:
-            self.import_action.setVisible(False)
 
     def run_import_process(self):
         path, _ = QFileDialog.getOpenFileName(self.app, "Open VideoPad Project", "", "VideoPad Project Files (*.vpj)")
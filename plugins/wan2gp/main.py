@@ -3,6 +3,8 @@ import os
 import threading
 import time
 import json
+import bisect
+from queue import Queue, Empty
 import tempfile
 import shutil
 import uuid
@@ -236,18 +238,23 @@ wan2gp_dir = root_dir / 'WAN2GP'
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
     QPushButton, QLabel, QLineEdit, QTextEdit, QSlider, QCheckBox, QComboBox,
-    QFileDialog, QGroupBox, QFormLayout, QTableWidget, QTableWidgetItem,
+    QFileDialog, QGroupBox, QFormLayout, QTableView,
     QHeaderView, QProgressBar, QScrollArea, QListWidget, QListWidgetItem,
-    QMessageBox, QRadioButton, QSizePolicy, QMenu, QSplitter, QInputDialog
+    QMessageBox, QRadioButton, QSizePolicy, QMenu, QSplitter, QInputDialog,
+    QListView, QStyledItemDelegate, QStyle, QStyleOptionButton
 )
-from PyQt6.QtCore import Qt, QThread, QObject, pyqtSignal, QUrl, QSize, QRectF, QTimer
-from PyQt6.QtGui import QPixmap, QImage, QDropEvent
+from PyQt6.QtCore import (
+    Qt, QThread, QObject, pyqtSignal, QUrl, QSize, QRect, QRectF, QTimer,
+    QAbstractTableModel, QAbstractListModel, QModelIndex
+)
+from PyQt6.QtGui import QPixmap, QPixmapCache, QImage, QDropEvent, QPalette
 from PyQt6.QtMultimedia import QMediaPlayer
 from PyQt6.QtMultimediaWidgets import QVideoWidget
 from PIL.ImageQt import ImageQt
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from plugins import VideoEditorPlugin
+from media_cache import CACHE_ROOT, source_fingerprint
 
 @contextmanager
 def working_directory(path):
@@ -624,100 +631,470 @@ class Wan2GPSetupWidget(QWidget):
         self.install_button.setEnabled(enabled)
         self.select_folder_button.setEnabled(enabled)
 
-class VideoResultItemWidget(QWidget):
-    """A widget to display a generated video with a hover-to-play preview and insert button."""
-    def __init__(self, video_path, plugin, parent=None):
+RESULT_PREVIEW_CACHE_DIR = os.path.join(CACHE_ROOT, "wan2gp_results")
+RESULT_PREVIEW_CACHE_MAX_ENTRIES = 500
+RESULT_PREVIEW_VERSION = 1
+RESULT_THUMB_WIDTH, RESULT_THUMB_HEIGHT = 160, 90
+RESULT_SPRITE_FRAMES = 10
+RESULT_HOVER_PLAY_DELAY_MS = 400
+
+def result_preview_info(video_path, cache_dir=RESULT_PREVIEW_CACHE_DIR):
+    # Probe data plus a sprite sheet of RESULT_SPRITE_FRAMES evenly spaced thumbnails in one row.
+    # Both are cached by source fingerprint, so a clip is only decoded once.
+    key = source_fingerprint(video_path)
+    info_path = os.path.join(cache_dir, f"{key}.json")
+    try:
+        with open(info_path, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        if info.get('version') == RESULT_PREVIEW_VERSION and os.path.exists(info['sprite']):
+            try: os.utime(info_path)
+            except OSError: pass
+            return info
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    probe = ffmpeg.probe(video_path)
+    duration = float(probe['format']['duration'])
+    info = {
+        'version': RESULT_PREVIEW_VERSION, 'duration': duration, 'sprite': None, 'frames': RESULT_SPRITE_FRAMES,
+        'has_audio': any(s['codec_type'] == 'audio' for s in probe.get('streams', [])),
+    }
+    os.makedirs(cache_dir, exist_ok=True)
+    sprite_path = os.path.join(cache_dir, f"{key}.jpg")
+    partial_path = os.path.join(cache_dir, f"{key}.part.jpg")
+    try:
+        (
+            ffmpeg
+            .input(video_path)
+            .filter('fps', f"{RESULT_SPRITE_FRAMES}/{max(duration, 0.001):.3f}")
+            .filter('scale', RESULT_THUMB_WIDTH, RESULT_THUMB_HEIGHT, force_original_aspect_ratio='decrease')
+            .filter('pad', RESULT_THUMB_WIDTH, RESULT_THUMB_HEIGHT, '(ow-iw)/2', '(oh-ih)/2', 'black')
+            .filter('tile', f"{RESULT_SPRITE_FRAMES}x1")
+            .output(partial_path, vframes=1)
+            .overwrite_output()
+            .run(quiet=True)
+        )
+        os.replace(partial_path, sprite_path)
+    except ffmpeg.Error as e:
+        print(f"Error rendering thumbnails for {video_path}: {e.stderr}")
+        return info
+    info['sprite'] = sprite_path
+    with open(info_path, 'w', encoding='utf-8') as f:
+        json.dump(info, f)
+    prune_result_preview_cache(cache_dir)
+    return info
+
+def _mtime_or_zero(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+def prune_result_preview_cache(cache_dir=RESULT_PREVIEW_CACHE_DIR, max_entries=RESULT_PREVIEW_CACHE_MAX_ENTRIES):
+    # Least recently used previews go first; result_preview_info() touches the JSON it reuses.
+    # Each entry is a JSON file plus the sprite sheet named after the same fingerprint.
+    try:
+        entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith('.json')]
+    except OSError:
+        return
+    entries.sort(key=_mtime_or_zero, reverse=True)
+    for info_path in entries[max_entries:]:
+        for path in (info_path, os.path.splitext(info_path)[0] + ".jpg"):
+            try: os.remove(path)
+            except OSError: pass
+
+class _ResultPreviewRunner(QObject):
+    finished = pyqtSignal(str, object)
+
+    def __init__(self, video_path, parent=None):
         super().__init__(parent)
         self.video_path = video_path
-        self.plugin = plugin
-        self.app = plugin.app
-        self.duration = 0.0
-        self.has_audio = False
-
-        self.setMinimumSize(200, 180)
-        self.setMaximumHeight(190)
-        
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(5, 5, 5, 5)
-        layout.setSpacing(5)
-
-        self.media_player = QMediaPlayer()
-        self.video_widget = QVideoWidget()
-        self.video_widget.setFixedSize(160, 90)
-        self.media_player.setVideoOutput(self.video_widget)
-        self.media_player.setSource(QUrl.fromLocalFile(self.video_path))
-        self.media_player.setLoops(QMediaPlayer.Loops.Infinite)
-        
-        self.info_label = QLabel(os.path.basename(video_path))
-        self.info_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.info_label.setWordWrap(True)
 
-        self.insert_button = QPushButton("Insert into Timeline")
-        self.insert_button.clicked.connect(self.on_insert)
-
-        h_layout = QHBoxLayout()
-        h_layout.addStretch()
-        h_layout.addWidget(self.video_widget)
-        h_layout.addStretch()
-        
-        layout.addLayout(h_layout)
-        layout.addWidget(self.info_label)
-        layout.addWidget(self.insert_button)
-        self.probe_video()
-
-    def probe_video(self):
+    def run(self):
         try:
-            probe = ffmpeg.probe(self.video_path)
-            self.duration = float(probe['format']['duration'])
-            self.has_audio = any(s['codec_type'] == 'audio' for s in probe.get('streams', []))
-            self.info_label.setText(f"{os.path.basename(self.video_path)}\n({self.duration:.2f}s)")
+            info = result_preview_info(self.video_path)
         except Exception as e:
-            self.info_label.setText(f"Error probing:\n{os.path.basename(self.video_path)}")
             print(f"Error probing video {self.video_path}: {e}")
-    
-    def enterEvent(self, event):
-        super().enterEvent(event)
-        self.media_player.play()
-        if not self.plugin.active_region or self.duration == 0: return
-        start_ms, _ = self.plugin.active_region
-        timeline = self.app.timeline_widget
-        video_rect, audio_rect = None, None
-        x = timeline.ms_to_x(start_ms)
-        duration_ms = int(self.duration * 1000)
-        w = int(duration_ms * timeline.pixels_per_ms)
-        if self.plugin.insert_on_new_track:
-            video_y = timeline.TIMESCALE_HEIGHT
-            video_rect = QRectF(x, video_y, w, timeline.TRACK_HEIGHT)
-            if self.has_audio:
-                audio_y = timeline.audio_tracks_y_start + self.app.timeline.num_audio_tracks * timeline.TRACK_HEIGHT
-                audio_rect = QRectF(x, audio_y, w, timeline.TRACK_HEIGHT)
+            info = None
+        self.finished.emit(self.video_path, info)
+
+class ResultPreviewLoader(QObject):
+    # Prepares result previews one clip at a time on a worker thread, in request order.
+    finished = pyqtSignal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pending = []
+        self.thread = None
+        self.worker = None
+
+    def request(self, video_path):
+        self.pending.append(video_path)
+        self._start_next()
+
+    def _start_next(self):
+        if self.worker is not None or not self.pending:
+            return
+        self.thread = QThread()
+        self.worker = _ResultPreviewRunner(self.pending.pop(0))
+        self.worker.moveToThread(self.thread)
+        self.worker.finished.connect(self._on_worker_finished)
+        self.thread.started.connect(self.worker.run)
+        self.thread.start()
+
+    def _on_worker_finished(self, video_path, info):
+        if self.thread:
+            self.thread.quit()
+            self.thread.wait()
+            self.thread.deleteLater()
+        if self.worker:
+            self.worker.deleteLater()
+        self.thread = None
+        self.worker = None
+        self.finished.emit(video_path, info)
+        self._start_next()
+
+    def cancel(self, wait=False):
+        self.pending = []
+        if wait and self.thread:
+            self.thread.quit()
+            self.thread.wait(2000)
+
+class ResultsModel(QAbstractListModel):
+    # Generated clips and their preview info; nothing per item is alive beyond this.
+    PathRole = Qt.ItemDataRole.UserRole + 1
+    InfoRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.paths = []
+        self.infos = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        path = self.paths[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return os.path.basename(path)
+        if role == Qt.ItemDataRole.ToolTipRole or role == self.PathRole:
+            return path
+        if role == self.InfoRole:
+            return self.infos.get(path, {})
+        return None
+
+    def add_path(self, path):
+        row = len(self.paths)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.paths.append(path)
+        self.endInsertRows()
+
+    def remove_path(self, path):
+        if path not in self.paths:
+            return
+        row = self.paths.index(path)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.paths[row]
+        self.infos.pop(path, None)
+        self.endRemoveRows()
+
+    def set_info(self, path, info):
+        if path not in self.paths:
+            return
+        # None marks a failed probe, as opposed to {} for one still running.
+        self.infos[path] = info if info is not None else {'error': True}
+        index = self.index(self.paths.index(path))
+        self.dataChanged.emit(index, index)
+
+    def clear(self):
+        self.beginResetModel()
+        self.paths = []
+        self.infos = {}
+        self.endResetModel()
+
+class ResultItemDelegate(QStyledItemDelegate):
+    # Paints a result from its cached sprite sheet: the first frame as the poster, or the
+    # scrubbed frame while hovered. The insert button is painted, not a real widget.
+    ITEM_SIZE = QSize(190, 160)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hover_row = -1
+        self.hover_frame = 0
+
+    def sizeHint(self, option, index):
+        return self.ITEM_SIZE
+
+    def thumb_rect(self, rect):
+        return QRect(rect.x() + (rect.width() - RESULT_THUMB_WIDTH) // 2, rect.y() + 5, RESULT_THUMB_WIDTH, RESULT_THUMB_HEIGHT)
+
+    def button_rect(self, rect):
+        return QRect(rect.x() + 5, rect.bottom() - 28, rect.width() - 10, 24)
+
+    def frame_at(self, rect, x):
+        thumb = self.thumb_rect(rect)
+        return max(0, min(RESULT_SPRITE_FRAMES - 1, (x - thumb.x()) * RESULT_SPRITE_FRAMES // thumb.width()))
+
+    def _sprite(self, sprite_path):
+        pixmap = QPixmapCache.find(sprite_path)
+        if pixmap is None:
+            pixmap = QPixmap(sprite_path)
+            QPixmapCache.insert(sprite_path, pixmap)
+        return pixmap
+
+    def paint(self, painter, option, index):
+        painter.save()
+        style = option.widget.style() if option.widget else QApplication.style()
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+
+        info = index.data(ResultsModel.InfoRole) or {}
+        thumb = self.thumb_rect(option.rect)
+        sprite = self._sprite(info['sprite']) if info.get('sprite') else None
+        if sprite and not sprite.isNull():
+            frame = self.hover_frame if index.row() == self.hover_row else 0
+            painter.drawPixmap(thumb, sprite, QRect(frame * RESULT_THUMB_WIDTH, 0, RESULT_THUMB_WIDTH, RESULT_THUMB_HEIGHT))
         else:
-            v_track_idx = 1
-            visual_v_idx = self.app.timeline.num_video_tracks - v_track_idx
-            video_y = timeline.video_tracks_y_start + visual_v_idx * timeline.TRACK_HEIGHT
-            video_rect = QRectF(x, video_y, w, timeline.TRACK_HEIGHT)
-            if self.has_audio:
-                a_track_idx = 1
-                visual_a_idx = a_track_idx - 1
-                audio_y = timeline.audio_tracks_y_start + visual_a_idx * timeline.TRACK_HEIGHT
-                audio_rect = QRectF(x, audio_y, w, timeline.TRACK_HEIGHT)
-        timeline.set_hover_preview_rects(video_rect, audio_rect)
+            painter.fillRect(thumb, Qt.GlobalColor.black)
+            painter.setPen(Qt.GlobalColor.lightGray)
+            painter.drawText(thumb, Qt.AlignmentFlag.AlignCenter, "Error probing" if info.get('error') else "Loading...")
+
+        name = index.data(Qt.ItemDataRole.DisplayRole)
+        if 'duration' in info:
+            name = f"{name} ({info['duration']:.2f}s)"
+        text_rect = QRect(option.rect.x() + 5, thumb.bottom() + 3, option.rect.width() - 10, self.button_rect(option.rect).top() - thumb.bottom() - 6)
+        painter.setPen(option.palette.color(QPalette.ColorRole.HighlightedText if option.state & QStyle.StateFlag.State_Selected else QPalette.ColorRole.Text))
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWrapAnywhere, name)
+
+        button = QStyleOptionButton()
+        button.rect = self.button_rect(option.rect)
+        button.text = "Insert into Timeline"
+        button.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Raised
+        style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+        painter.restore()
+
+class ResultsGalleryView(QListView):
+    # Hovering a thumbnail scrubs its sprite sheet; resting on it attaches the one shared player,
+    # which plays from the scrubbed point until the cursor moves on.
+    insert_requested = pyqtSignal(str)
+    hovered = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(True)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setMovement(QListView.Movement.Static)
+        self.setUniformItemSizes(True)
+        self.setSpacing(10)
+        self.setMouseTracking(True)
+        self.delegate = ResultItemDelegate(self)
+        self.setItemDelegate(self.delegate)
+
+        self.player = QMediaPlayer(self)
+        self.player.setLoops(QMediaPlayer.Loops.Infinite)
+        self.video_widget = QVideoWidget(self.viewport())
+        self.video_widget.setFixedSize(RESULT_THUMB_WIDTH, RESULT_THUMB_HEIGHT)
+        self.video_widget.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.video_widget.hide()
+        self.player.setVideoOutput(self.video_widget)
+
+        self.play_timer = QTimer(self)
+        self.play_timer.setSingleShot(True)
+        self.play_timer.setInterval(RESULT_HOVER_PLAY_DELAY_MS)
+        self.play_timer.timeout.connect(self._play_hovered)
+
+    def _hover_index(self):
+        return self.model().index(self.delegate.hover_row, 0) if self.model() and self.delegate.hover_row >= 0 else QModelIndex()
+
+    def _set_hover(self, index):
+        self._detach_player()
+        old_index = self._hover_index()
+        self.delegate.hover_row = index.row() if index.isValid() else -1
+        self.delegate.hover_frame = 0
+        for changed in (old_index, index):
+            if changed.isValid():
+                self.viewport().update(self.visualRect(changed))
+        self.hovered.emit(index.data(ResultsModel.PathRole) if index.isValid() else "")
+
+    def _pause_player(self):
+        self.play_timer.stop()
+        if self.video_widget.isVisible():
+            self.player.pause()
+            self.video_widget.hide()
+
+    def _detach_player(self):
+        # Dropping the source releases the decoder, so only the hovered clip ever holds one.
+        self._pause_player()
+        self.player.setSource(QUrl())
+
+    def _play_hovered(self):
+        index = self._hover_index()
+        info = index.data(ResultsModel.InfoRole) if index.isValid() else None
+        if not info or 'duration' not in info:
+            return
+        source = QUrl.fromLocalFile(index.data(ResultsModel.PathRole))
+        if self.player.source() != source:
+            self.player.setSource(source)
+        self.player.setPosition(int(info['duration'] * 1000 * self.delegate.hover_frame / RESULT_SPRITE_FRAMES))
+        self.video_widget.move(self.delegate.thumb_rect(self.visualRect(index)).topLeft())
+        self.video_widget.show()
+        self.player.play()
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        pos = event.position().toPoint()
+        index = self.indexAt(pos)
+        if index.row() != self.delegate.hover_row:
+            self._set_hover(index)
+        if not index.isValid():
+            return
+        rect = self.visualRect(index)
+        if self.delegate.thumb_rect(rect).contains(pos):
+            frame = self.delegate.frame_at(rect, pos.x())
+            if frame != self.delegate.hover_frame:
+                self._pause_player()
+                self.delegate.hover_frame = frame
+                self.viewport().update(self.delegate.thumb_rect(rect))
+            if not self.video_widget.isVisible():
+                self.play_timer.start()
+        else:
+            self._pause_player()
 
     def leaveEvent(self, event):
         super().leaveEvent(event)
-        self.media_player.pause()
-        self.media_player.setPosition(0)
-        self.app.timeline_widget.set_hover_preview_rects(None, None)
-    
-    def on_insert(self):
-        self.media_player.stop()
-        self.media_player.setSource(QUrl())
-        self.media_player.setVideoOutput(None)
-        self.app.timeline_widget.set_hover_preview_rects(None, None)
-        self.plugin.insert_generated_clip(self.video_path)
+        self._set_hover(QModelIndex())
+
+    def scrollContentsBy(self, dx, dy):
+        self._pause_player()
+        super().scrollContentsBy(dx, dy)
+
+    def rowsAboutToBeRemoved(self, parent, start, end):
+        if start <= self.delegate.hover_row:
+            self._set_hover(QModelIndex())
+        super().rowsAboutToBeRemoved(parent, start, end)
+
+    def reset(self):
+        self._set_hover(QModelIndex())
+        super().reset()
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        pos = event.position().toPoint()
+        index = self.indexAt(pos)
+        if event.button() == Qt.MouseButton.LeftButton and index.isValid() and self.delegate.button_rect(self.visualRect(index)).contains(pos):
+            self._request_insert(index)
+
+    def mouseDoubleClickEvent(self, event):
+        index = self.indexAt(event.position().toPoint())
+        if event.button() == Qt.MouseButton.LeftButton and index.isValid():
+            self._request_insert(index)
+        else:
+            super().mouseDoubleClickEvent(event)
+
+    def _request_insert(self, index):
+        self._detach_player()
+        self.insert_requested.emit(index.data(ResultsModel.PathRole))
+
+class QueueTableModel(QAbstractTableModel):
+    # Rows are (task key, cell texts). sync() diffs a new snapshot against the current rows and
+    # emits only the inserts, removals, moves and changed cells, so views keep selection and scroll.
+    HEADERS = ["Qty", "Prompt", "Length", "Steps"]
 
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if index.isValid() and role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return self.rows[index.row()][1][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.ItemIsDropEnabled
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsDragEnabled | Qt.ItemFlag.ItemIsDropEnabled
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+
+    def sync(self, new_rows):
+        new_keys = {key for key, _ in new_rows}
+        if len(new_keys) != len(new_rows):
+            self.beginResetModel()
+            self.rows = list(new_rows)
+            self.endResetModel()
+            return
+        for row in range(len(self.rows) - 1, -1, -1):
+            if self.rows[row][0] not in new_keys:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.rows[row]
+                self.endRemoveRows()
+
+        # Rows on the longest run already in the new order stay put; every other row is moved or
+        # inserted right after the row that precedes it in the new order.
+        new_index = {key: i for i, (key, _) in enumerate(new_rows)}
+        stable = self._longest_ordered_keys([key for key, _ in self.rows], new_index)
+        for target, (key, cells) in enumerate(new_rows):
+            if key in stable:
+                continue
+            keys = [k for k, _ in self.rows]
+            after = keys.index(new_rows[target - 1][0]) + 1 if target > 0 else 0
+            if key not in keys:
+                self.beginInsertRows(QModelIndex(), after, after)
+                self.rows.insert(after, (key, cells))
+                self.endInsertRows()
+                continue
+            source = keys.index(key)
+            if source != after and source + 1 != after:
+                self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), after)
+                row = self.rows.pop(source)
+                self.rows.insert(after - 1 if source < after else after, row)
+                self.endMoveRows()
+
+        for row, (key, cells) in enumerate(new_rows):
+            if self.rows[row][1] != cells:
+                self.rows[row] = (key, cells)
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
 
-class QueueTableWidget(QTableWidget):
+    @staticmethod
+    def _longest_ordered_keys(keys, new_index):
+        # Longest increasing subsequence of new positions, by patience sorting.
+        tails = []
+        tail_keys = []
+        previous = {}
+        for key in keys:
+            position = new_index[key]
+            i = bisect.bisect_left(tails, position)
+            previous[key] = tail_keys[i - 1] if i > 0 else None
+            if i == len(tails):
+                tails.append(position)
+                tail_keys.append(key)
+            else:
+                tails[i] = position
+                tail_keys[i] = key
+        stable = set()
+        key = tail_keys[-1] if tail_keys else None
+        while key is not None:
+            stable.add(key)
+            key = previous[key]
+        return stable
+
+class QueueTableView(QTableView):
     rowsMoved = pyqtSignal(int, int)
     rowsRemoved = pyqtSignal(list)
     clearAllRequested = pyqtSignal()
@@ -764,10 +1141,10 @@ class QueueTableWidget(QTableWidget):
 
     def dropEvent(self, event: QDropEvent):
         if event.source() == self and event.dropAction() == Qt.DropAction.MoveAction:
-            source_row = self.currentRow()
-            target_item = self.itemAt(event.position().toPoint())
-            dest_row = target_item.row() if target_item else self.rowCount()
-            if source_row != dest_row: self.rowsMoved.emit(source_row, dest_row)
+            source_row = self.currentIndex().row()
+            target_index = self.indexAt(event.position().toPoint())
+            dest_row = target_index.row() if target_index.isValid() else self.model().rowCount()
+            if source_row >= 0 and source_row != dest_row: self.rowsMoved.emit(source_row, dest_row)
             event.acceptProposedAction()
         else:
             super().dropEvent(event)
@@ -791,6 +1168,70 @@ class HoverVideoPreview(QWidget):
         self.player.pause()
         self.player.setPosition(0)
 
+class BackendLoader(QObject):
+    # Imports wgp.py (torch and the model definitions) off the GUI thread, reporting each stage.
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(bool, str)
+
+    def __init__(self, wgp_path):
+        super().__init__()
+        self.wgp_path = wgp_path
+
+    def run(self):
+        global wgp
+        try:
+            if wgp is None:
+                self.progress.emit("Importing PyTorch...")
+                import torch
+                self.progress.emit("Loading Wan2GP model definitions...")
+                import importlib
+                # wgp reads and creates its config files relative to its checkout while importing,
+                # so this changes the process working directory. The editor's own files use
+                # absolute paths and are unaffected.
+                with working_directory(wan2gp_dir):
+                    module_name = "wgp"
+                    spec = importlib.util.spec_from_file_location(module_name, self.wgp_path)
+
+                    if spec is None or spec.loader is None:
+                        raise ImportError(f"Could not create a module spec for the file at {self.wgp_path}")
+
+                    wgp_module = importlib.util.module_from_spec(spec)
+
+                    original_sys_path = list(sys.path)
+                    if str(wan2gp_dir) not in sys.path:
+                        sys.path.insert(0, str(wan2gp_dir))
+
+                    try:
+                        spec.loader.exec_module(wgp_module)
+                    finally:
+                        sys.path[:] = original_sys_path
+
+                    wgp = wgp_module
+            self.finished.emit(True, "")
+        except Exception as e:
+            print(f"Failed to load AI Generator plugin backend: {e}")
+            import traceback
+            traceback.print_exc()
+            self.finished.emit(False, str(e))
+
+class GenEventDict(dict):
+    # Stands in for state['gen'] during generation so wgp's progress and preview writes are
+    # pushed onto the worker's event queue as they happen.
+    EVENT_KEYS = ('progress_phase', 'preview')
+
+    def __init__(self, values, events):
+        super().__init__(values)
+        self.events = events
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if key in self.EVENT_KEYS and value is not None and self.events is not None:
+            self.events.put((key, value))
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
 class Worker(QObject):
     progress = pyqtSignal(list)
     status = pyqtSignal(str)
@@ -798,49 +1239,119 @@ class Worker(QObject):
     output = pyqtSignal()
     finished = pyqtSignal()
     error = pyqtSignal(str)
+
+    # How often to check that wgp hasn't swapped state['gen'] for a plain dict.
+    GEN_WATCH_INTERVAL_SEC = 1.0
+
     def __init__(self, plugin, state):
         super().__init__()
         self.plugin = plugin
         self.state = state
         self._is_running = True
         self._last_progress_phase = None
-        self._last_preview = None
+        # Previews faster than the display can show them are coalesced to the newest one.
+        screen = QApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen and screen.refreshRate() > 0 else 60.0
+        self.preview_interval = 1.0 / refresh_rate
+        # Set from the GUI thread: where previews are shown and whether they are wanted at all.
+        self.preview_size = QSize(200, 200)
+        self.previews_enabled = True
+        self._events = None
+        self._preview_shown = True
+
+    def preview_shown(self):
+        # Called by the GUI after displaying a preview, so the next one can be converted.
+        self._preview_shown = True
+        if self._events is not None:
+            self._events.put(('preview_shown', None))
+
+    def _convert_preview(self, pil_image):
+        # QImage (unlike QPixmap) can be built and scaled off the GUI thread.
+        try:
+            image = ImageQt(pil_image)
+            return image.scaled(self.preview_size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        except Exception as e:
+            print(f"Could not convert preview image: {e}")
+            return None
+
+    def _watch_gen(self, events):
+        gen = self.state.get('gen', {})
+        if not isinstance(gen, GenEventDict):
+            gen = GenEventDict(gen, events)
+            self.state['gen'] = gen
+        gen.events = events
+        return gen
+
+    def _emit_progress(self, gen, current_phase):
+        if current_phase == self._last_progress_phase:
+            return
+        self._last_progress_phase = current_phase
+        phase_name, step = current_phase
+        total_steps = gen.get("num_inference_steps", 1)
+        high_level_status = gen.get("progress_status", "")
+        status_msg = wgp.merge_status_context(high_level_status, phase_name)
+        self.progress.emit([(step, total_steps), status_msg])
 
     def run(self):
+        events = Queue()
+        self._events = events
+        self._watch_gen(events)
+
         def generation_target():
             with working_directory(wan2gp_dir):
                 try:
                     for _ in wgp.process_tasks(self.state):
-                        if self._is_running: self.output.emit()
+                        if self._is_running: events.put(('output', None))
                         else: break
                 except Exception as e:
                     import traceback
                     print("Error in generation thread:")
                     traceback.print_exc()
-                    if "gradio.Error" in str(type(e)): self.error.emit(str(e))
-                    else: self.error.emit(f"An unexpected error occurred: {e}")
+                    if "gradio.Error" in str(type(e)): events.put(('error', str(e)))
+                    else: events.put(('error', f"An unexpected error occurred: {e}"))
                 finally:
                     self._is_running = False
+                    events.put(('done', None))
         gen_thread = threading.Thread(target=generation_target, daemon=True)
         gen_thread.start()
-        while self._is_running:
-            gen = self.state.get('gen', {})
-            current_phase = gen.get("progress_phase")
-            if current_phase and current_phase != self._last_progress_phase:
-                self._last_progress_phase = current_phase
-                phase_name, step = current_phase
-                total_steps = gen.get("num_inference_steps", 1)
-                high_level_status = gen.get("progress_status", "")
-                status_msg = wgp.merge_status_context(high_level_status, phase_name)
-                progress_args = [(step, total_steps), status_msg]
-                self.progress.emit(progress_args)
-            preview_img = gen.get('preview')
-            if preview_img is not None and preview_img is not self._last_preview:
-                self._last_preview = preview_img
-                self.preview.emit(preview_img)
+
+        pending_preview = None
+        last_preview_at = 0.0
+        while True:
+            timeout = self.GEN_WATCH_INTERVAL_SEC
+            if pending_preview is not None and self._preview_shown:
+                timeout = max(0.0, last_preview_at + self.preview_interval - time.monotonic())
+            try:
+                kind, value = events.get(timeout=timeout)
+            except Empty:
+                kind, value = None, None
+
+            gen = self._watch_gen(events)
+            if kind == 'done':
+                break
+            elif kind == 'progress_phase':
+                self._emit_progress(gen, value)
+            elif kind == 'preview':
+                pending_preview = value
                 gen['preview'] = None
-            time.sleep(0.1)
+            elif kind == 'output':
+                self.output.emit()
+            elif kind == 'error':
+                self.error.emit(value)
+
+            # Only the newest preview is kept while the GUI is still showing the last one.
+            if pending_preview is not None and not self.previews_enabled:
+                pending_preview = None
+            if pending_preview is not None and self._preview_shown and time.monotonic() - last_preview_at >= self.preview_interval:
+                q_image = self._convert_preview(pending_preview)
+                pending_preview = None
+                last_preview_at = time.monotonic()
+                if q_image is not None:
+                    self._preview_shown = False
+                    self.preview.emit(q_image)
         gen_thread.join()
+        self._watch_gen(None)
+        self._events = None
         self.finished.emit()
 
 class ListEditorWidget(QWidget):
@@ -878,6 +1389,9 @@ class ListEditorWidget(QWidget):
         return [self.list_widget.item(i).text() for i in range(self.list_widget.count())]
 
 class WgpDesktopPluginWidget(QWidget):
+    # Built advanced-option forms kept for switching back to recently used models.
+    ADVANCED_UI_CACHE_SIZE = 4
+
     def __init__(self, plugin):
         super().__init__()
         self.plugin = plugin
@@ -892,6 +1406,8 @@ class WgpDesktopPluginWidget(QWidget):
         self.dynamic_inputs_config = {}
         self.config_inputs_config = {}
         self.advanced_tabs_widget = None
+        self.advanced_ui = None
+        self.advanced_ui_cache = {}
         self.config_tabs_widget = None
         
         self.load_main_config()
@@ -902,16 +1418,14 @@ class WgpDesktopPluginWidget(QWidget):
         self.init_wgp_state()
 
     def _get_queue_data_for_table(self, queue):
+        # (task key, cells) per waiting task; the dict's identity tracks it across moves.
         data = []
-        if len(queue) <= 1:
-            return data
-
-        for item in queue[1:]:
+        for item in queue:
             repeats = item.get('repeats', "1")
             prompt = item.get('prompt', "")
             length = item.get('length', "")
             steps = item.get('steps', "")
-            data.append([str(repeats), prompt, str(length), str(steps)])
+            data.append((item.get('id', id(item)), [str(repeats), prompt, str(length), str(steps)]))
         return data
 
     def setup_ui(self):
@@ -1219,19 +1733,18 @@ class WgpDesktopPluginWidget(QWidget):
         results_group = QGroupBox("Generated Clips")
         results_group.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         results_layout = QVBoxLayout(results_group)
-        self.results_list = self.create_widget(QListWidget, 'results_list')
-        self.results_list.setFlow(QListWidget.Flow.LeftToRight)
-        self.results_list.setWrapping(True)
-        self.results_list.setResizeMode(QListWidget.ResizeMode.Adjust)
-        self.results_list.setSpacing(10)
+        self.results_model = ResultsModel(self)
+        self.results_list = self.create_widget(ResultsGalleryView, 'results_list')
+        self.results_list.setModel(self.results_model)
         results_layout.addWidget(self.results_list)
+        self.result_previews = ResultPreviewLoader(self)
         right_layout.addWidget(results_group)
 
         right_layout.addWidget(QLabel("Queue"))
-        self.queue_table = self.create_widget(QueueTableWidget, 'queue_table')
+        self.queue_model = QueueTableModel(self)
+        self.queue_table = self.create_widget(QueueTableView, 'queue_table')
+        self.queue_table.setModel(self.queue_model)
         self.queue_table.verticalHeader().setVisible(False)
-        self.queue_table.setColumnCount(4)
-        self.queue_table.setHorizontalHeaderLabels(["Qty", "Prompt", "Length", "Steps"])
         header = self.queue_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
@@ -1410,19 +1923,7 @@ class WgpDesktopPluginWidget(QWidget):
             self.widgets['denoising_strength'].setValue(int(denoising_val * 100))
             self.widgets['denoising_strength_label'].setText(f"{denoising_val:.2f}")
 
-            if self.advanced_tabs_widget:
-                self.adv_layout.removeWidget(self.advanced_tabs_widget)
-                self.advanced_tabs_widget.deleteLater()
-                self.advanced_tabs_widget = None
-            
-            self.dynamic_inputs_config.clear()
-            
-            tabs_widget = self.ui_builder.build_advanced_tab(model_type)
-            if tabs_widget:
-                self.adv_layout.addWidget(tabs_widget)
-                self.advanced_tabs_widget = tabs_widget
-            else:
-                self.adv_layout.addWidget(QLabel("Advanced options unavailable."))
+            self._show_advanced_ui(model_type, ui_defaults)
 
             for var_name, config in self.dynamic_inputs_config.items():
                 widget = config['widget']
@@ -1465,6 +1966,90 @@ class WgpDesktopPluginWidget(QWidget):
                 
             self._update_input_visibility()
 
+    def _show_advanced_ui(self, model_type, ui_defaults):
+        # A model's form is built once and swapped back in on later switches, reset to the values
+        # it was built with. It is rebuilt only if the model's defaults have changed since.
+        key = json.dumps(ui_defaults, sort_keys=True, default=str)
+        self._detach_advanced_ui()
+        ui = self.advanced_ui_cache.pop(model_type, None)
+        if ui is not None and ui['key'] != key:
+            ui['tabs'].deleteLater()
+            ui = None
+        if ui is None:
+            ui = self._build_advanced_ui(model_type, key)
+        else:
+            self._restore_widget_values(ui['values'])
+        if ui['values'] is not None:
+            self.advanced_ui_cache[model_type] = ui
+            while len(self.advanced_ui_cache) > self.ADVANCED_UI_CACHE_SIZE:
+                oldest = next(iter(self.advanced_ui_cache))
+                self.advanced_ui_cache.pop(oldest)['tabs'].deleteLater()
+
+        self.widgets.update(ui['widgets'])
+        self.dynamic_inputs_config = ui['inputs']
+        self.adv_layout.addWidget(ui['tabs'])
+        ui['tabs'].show()
+        self.advanced_ui = ui
+        self.advanced_tabs_widget = ui['tabs'] if ui['values'] is not None else None
+
+    def _build_advanced_ui(self, model_type, key):
+        widgets_before = dict(self.widgets)
+        self.dynamic_inputs_config = {}
+        tabs_widget = self.ui_builder.build_advanced_tab(model_type)
+        registered = {name: widget for name, widget in self.widgets.items() if widgets_before.get(name) is not widget}
+        return {
+            'model_type': model_type,
+            'key': key,
+            'tabs': tabs_widget or QLabel("Advanced options unavailable."),
+            'inputs': self.dynamic_inputs_config,
+            'widgets': registered,
+            # Entries the form's names hid in self.widgets, put back when it is swapped out.
+            'shadowed': {name: widgets_before[name] for name in registered if name in widgets_before},
+            'values': self._snapshot_widget_values(tabs_widget) if tabs_widget else None,
+        }
+
+    def _detach_advanced_ui(self):
+        ui = self.advanced_ui
+        if ui is None:
+            return
+        self.advanced_ui = None
+        self.advanced_tabs_widget = None
+        self.adv_layout.removeWidget(ui['tabs'])
+        ui['tabs'].hide()
+        for name, widget in ui['widgets'].items():
+            if self.widgets.get(name) is widget:
+                if name in ui['shadowed']: self.widgets[name] = ui['shadowed'][name]
+                else: del self.widgets[name]
+        if self.advanced_ui_cache.get(ui['model_type']) is not ui:
+            ui['tabs'].deleteLater()
+
+    def _snapshot_widget_values(self, root):
+        # (widget, setter, value) for every editable widget under root.
+        values = []
+        for widget in root.findChildren(QWidget):
+            if isinstance(widget, QSlider):
+                values.append((widget, widget.setValue, widget.value()))
+            elif isinstance(widget, QLineEdit):
+                values.append((widget, widget.setText, widget.text()))
+            elif isinstance(widget, QTextEdit):
+                values.append((widget, widget.setPlainText, widget.toPlainText()))
+            elif isinstance(widget, QComboBox):
+                values.append((widget, widget.setCurrentIndex, widget.currentIndex()))
+            elif isinstance(widget, QCheckBox) or (isinstance(widget, QGroupBox) and widget.isCheckable()):
+                values.append((widget, widget.setChecked, widget.isChecked()))
+            elif isinstance(widget, QListWidget):
+                def set_check_states(states, list_widget=widget):
+                    for i, state in enumerate(states[:list_widget.count()]):
+                        list_widget.item(i).setCheckState(state)
+                values.append((widget, set_check_states, [widget.item(i).checkState() for i in range(widget.count())]))
+        return values
+
+    def _restore_widget_values(self, values):
+        for widget, setter, value in values:
+            widget.blockSignals(True)
+            setter(value)
+            widget.blockSignals(False)
+
     def _update_generation_mode_visibility(self, model_def):
         allowed = model_def.get("image_prompt_types_allowed", "")
         choices = []
@@ -1530,6 +2115,9 @@ class WgpDesktopPluginWidget(QWidget):
         self.queue_table.rowsMoved.connect(self._on_queue_rows_moved)
         self.queue_table.rowsRemoved.connect(self._remove_queue_rows)
         self.queue_table.clearAllRequested.connect(self._on_clear_queue)
+        self.results_list.hovered.connect(self._on_result_hovered)
+        self.results_list.insert_requested.connect(self._on_result_insert_requested)
+        self.result_previews.finished.connect(self.results_model.set_info)
 
     def load_main_config(self):
         try:
@@ -1571,6 +2159,8 @@ class WgpDesktopPluginWidget(QWidget):
 
     def _on_preview_toggled(self, checked):
         self.widgets['preview_image'].setVisible(checked)
+        if self.worker:
+            self.worker.previews_enabled = checked
         self.main_config['preview_visible'] = checked
         self.save_main_config()
 
@@ -1846,6 +2436,8 @@ class WgpDesktopPluginWidget(QWidget):
         self.add_to_queue_btn.setEnabled(True)
         self.thread = QThread()
         self.worker = Worker(self.plugin, self.state)
+        self.worker.preview_size = self.preview_image.size()
+        self.worker.previews_enabled = self.widgets['preview_group'].isChecked()
         self.worker.moveToThread(self.thread)
         self.thread.started.connect(self.worker.run)
         self.worker.finished.connect(self.thread.quit)
@@ -1861,7 +2453,6 @@ class WgpDesktopPluginWidget(QWidget):
         self.update_queue_table()
 
     def on_generation_finished(self):
-        time.sleep(0.1)
         self.status_label.setText("Finished.")
         self.progress_bar.setValue(0)
         self.generate_btn.setEnabled(True)
@@ -1882,11 +2473,13 @@ class WgpDesktopPluginWidget(QWidget):
             if step <= 1: self.update_queue_table()
         elif len(data) > 1: self.status_label.setText(str(data[1]))
 
-    def update_preview(self, pil_image):
-        if pil_image and self.widgets['preview_group'].isChecked():
-            q_image = ImageQt(pil_image)
-            pixmap = QPixmap.fromImage(q_image)
-            self.preview_image.setPixmap(pixmap.scaled(self.preview_image.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
+    def update_preview(self, q_image):
+        # Already converted and scaled by the worker.
+        if self.widgets['preview_group'].isChecked():
+            self.preview_image.setPixmap(QPixmap.fromImage(q_image))
+        if self.worker:
+            self.worker.preview_size = self.preview_image.size()
+            self.worker.preview_shown()
 
     def update_queue_and_results(self):
         self.update_queue_table()
@@ -1902,32 +2495,59 @@ class WgpDesktopPluginWidget(QWidget):
                 self.processed_files.add(abs_path)
 
     def add_result_item(self, video_path):
-        item_widget = VideoResultItemWidget(video_path, self.plugin)
-        list_item = QListWidgetItem(self.results_list)
-        list_item.setSizeHint(item_widget.sizeHint())
-        self.results_list.addItem(list_item)
-        self.results_list.setItemWidget(list_item, item_widget)
+        self.results_model.add_path(video_path)
+        self.result_previews.request(video_path)
+
+    def _on_result_hovered(self, video_path):
+        # Outlines where the hovered clip would land in the active region.
+        timeline = self.plugin.app.timeline_widget
+        info = self.results_model.infos.get(video_path) if video_path else None
+        if not self.plugin.active_region or not info or not info.get('duration'):
+            timeline.set_hover_preview_rects(None, None)
+            return
+        app = self.plugin.app
+        start_ms, _ = self.plugin.active_region
+        video_rect, audio_rect = None, None
+        x = timeline.ms_to_x(start_ms)
+        duration_ms = int(info['duration'] * 1000)
+        w = int(duration_ms * timeline.pixels_per_ms)
+        if self.plugin.insert_on_new_track:
+            video_y = timeline.TIMESCALE_HEIGHT
+            video_rect = QRectF(x, video_y, w, timeline.TRACK_HEIGHT)
+            if info['has_audio']:
+                audio_y = timeline.audio_tracks_y_start + app.timeline.num_audio_tracks * timeline.TRACK_HEIGHT
+                audio_rect = QRectF(x, audio_y, w, timeline.TRACK_HEIGHT)
+        else:
+            v_track_idx = 1
+            visual_v_idx = app.timeline.num_video_tracks - v_track_idx
+            video_y = timeline.video_tracks_y_start + visual_v_idx * timeline.TRACK_HEIGHT
+            video_rect = QRectF(x, video_y, w, timeline.TRACK_HEIGHT)
+            if info['has_audio']:
+                a_track_idx = 1
+                visual_a_idx = a_track_idx - 1
+                audio_y = timeline.audio_tracks_y_start + visual_a_idx * timeline.TRACK_HEIGHT
+                audio_rect = QRectF(x, audio_y, w, timeline.TRACK_HEIGHT)
+        timeline.set_hover_preview_rects(video_rect, audio_rect)
+
+    def _on_result_insert_requested(self, video_path):
+        self.plugin.app.timeline_widget.set_hover_preview_rects(None, None)
+        self.plugin.insert_generated_clip(video_path)
 
     def update_queue_table(self):
+        # The lock is held only to copy the queue; the model applies just what changed.
         with wgp.lock:
-            queue = self.state.get('gen', {}).get('queue', [])
-            is_running = self.thread and self.thread.isRunning()
-            queue_to_display = queue if is_running else [None] + queue
-            table_data = self._get_queue_data_for_table(queue_to_display)
-            self.queue_table.setRowCount(0)
-            self.queue_table.setRowCount(len(table_data))
-
-            for row_idx, row_data in enumerate(table_data):
-                for col_idx, cell_data in enumerate(row_data):
-                    item = QTableWidgetItem(str(cell_data))
-                    self.queue_table.setItem(row_idx, col_idx, item)
+            queue = list(self.state.get('gen', {}).get('queue', []))
+        is_running = self.thread and self.thread.isRunning()
+        # While running, queue[0] is the task being generated.
+        waiting = queue[1:] if is_running else queue
+        self.queue_model.sync(self._get_queue_data_for_table(waiting))
 
     def _on_remove_selected_from_queue(self):
         selected_row_indexes = self.queue_table.selectionModel().selectedRows()
         row_indices_to_remove = [index.row() for index in selected_row_indexes]
         
         if not row_indices_to_remove:
-            current_row = self.queue_table.currentRow()
+            current_row = self.queue_table.currentIndex().row()
             if current_row >= 0:
                 row_indices_to_remove.append(current_row)
 
@@ -2043,6 +2663,10 @@ class Plugin(VideoEditorPlugin):
         self.dock_widget = None
         self._heavy_content_loaded = False
         self.setup_widget = None
+        self.loading_label = None
+        self.loader_thread = None
+        self.loader = None
+        self._pending_actions = []
 
         self.active_region = None
         self.temp_dir = None
@@ -2057,17 +2681,18 @@ class Plugin(VideoEditorPlugin):
             wan2gp_dir = Path(wan2gp_path_override)
 
     def enable(self):
-        if not self.dock_widget:
-            placeholder = QLabel("Loading AI Generator...")
-            placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.dock_widget = self.app.add_dock_widget(self, placeholder, self.name)
+        # The dock itself comes from plugin.json and is handed over in attach_dock().
+        if self.dock_widget:
             self.dock_widget.visibilityChanged.connect(self._on_visibility_changed)
-            if self.dock_widget.isVisible():
-                self._on_visibility_changed(True)
-        
         self.app.timeline_widget.context_menu_requested.connect(self.on_timeline_context_menu)
         self.app.status_label.setText(f"{self.name}: Enabled.")
 
+    def attach_dock(self, dock):
+        self.dock_widget = dock
+        self.dock_widget.visibilityChanged.connect(self._on_visibility_changed)
+        if self.dock_widget.isVisible():
+            self._on_visibility_changed(True)
+
     def _on_visibility_changed(self, visible):
         if visible and not self._heavy_content_loaded:
             self._load_heavy_ui()
@@ -2204,8 +2829,11 @@ class Plugin(VideoEditorPlugin):
                 shutil.rmtree(wan2gp_dir, ignore_errors=True)
 
     def _load_heavy_ui(self):
+        # Starts loading the backend in the background; False until the UI is ready.
         if self._heavy_content_loaded:
             return True
+        if self.loader_thread is not None:
+            return False
 
         wgp_path = wan2gp_dir / 'wgp.py'
 
@@ -2214,53 +2842,66 @@ class Plugin(VideoEditorPlugin):
             self.dock_widget.setWidget(self.setup_widget)
             return False
 
+        self.loading_label = QLabel("Loading AI Generator backend...")
+        self.loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.loading_label.setWordWrap(True)
+        self.dock_widget.setWidget(self.loading_label)
         self.app.status_label.setText("Loading AI Generator backend...")
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        QApplication.processEvents()
-        try:
-            import importlib
-            global wgp
-            if wgp is None:
-                with working_directory(wan2gp_dir):
-                    module_name = "wgp"
-                    spec = importlib.util.spec_from_file_location(module_name, wgp_path)
-                    
-                    if spec is None or spec.loader is None:
-                        raise ImportError(f"Could not create a module spec for the file at {wgp_path}")
 
-                    wgp_module = importlib.util.module_from_spec(spec)
-
-                    original_sys_path = list(sys.path)
-                    if str(wan2gp_dir) not in sys.path:
-                        sys.path.insert(0, str(wan2gp_dir))
-
-                    try:
-                        spec.loader.exec_module(wgp_module)
-                    finally:
-                        sys.path[:] = original_sys_path
-
-                    wgp = wgp_module
+        # A daemon thread rather than a QThread: an import can't be interrupted, and closing the
+        # editor mid-load must not wait for it.
+        self.loader = BackendLoader(wgp_path)
+        self.loader.progress.connect(self._on_backend_progress)
+        self.loader.finished.connect(self._on_backend_loaded)
+        self.loader_thread = threading.Thread(target=self.loader.run, daemon=True)
+        self.loader_thread.start()
+        return False
+
+    def _on_backend_progress(self, message):
+        if self.loading_label:
+            self.loading_label.setText(message)
+        self.app.status_label.setText(f"{self.name}: {message}")
+
+    def _on_backend_loaded(self, success, message):
+        if self.loader:
+            self.loader.deleteLater()
+        self.loader_thread = None
+        self.loader = None
+
+        if not success:
+            self._pending_actions.clear()
+            self._show_load_error(message)
+            return
 
+        self._on_backend_progress("Building interface...")
+        try:
             wgp.app = MockApp()
             self.client_widget = WgpDesktopPluginWidget(self)
-            self.dock_widget.setWidget(self.client_widget)
-            self._heavy_content_loaded = True
-            self.app.status_label.setText("AI Generator loaded.")
-            self.setup_widget = None
-            return True
         except Exception as e:
-            print(f"Failed to load AI Generator plugin backend: {e}")
+            print(f"Failed to build AI Generator interface: {e}")
             import traceback
             traceback.print_exc()
-            error_label = QLabel(f"Failed to load AI Generator:\n\n{e}\n\nPlease see console for details.")
-            error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            error_label.setWordWrap(True)
-            if self.dock_widget:
-                self.dock_widget.setWidget(error_label)
-            QMessageBox.critical(self.app, "Plugin Load Error", f"Failed to load the AI Generator backend.\n\n{e}")
-            return False
-        finally:
-            QApplication.restoreOverrideCursor()
+            self._pending_actions.clear()
+            self._show_load_error(str(e))
+            return
+        self.dock_widget.setWidget(self.client_widget)
+        self._heavy_content_loaded = True
+        self.loading_label = None
+        self.app.status_label.setText("AI Generator loaded.")
+        self.setup_widget = None
+
+        pending_actions, self._pending_actions = self._pending_actions, []
+        for action in pending_actions:
+            action()
+
+    def _show_load_error(self, message):
+        error_label = QLabel(f"Failed to load AI Generator:\n\n{message}\n\nPlease see console for details.")
+        error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        error_label.setWordWrap(True)
+        self.loading_label = None
+        if self.dock_widget:
+            self.dock_widget.setWidget(error_label)
+        QMessageBox.critical(self.app, "Plugin Load Error", f"Failed to load the AI Generator backend.\n\n{message}")
 
     def disable(self):
         try: self.app.timeline_widget.context_menu_requested.disconnect(self.on_timeline_context_menu)
@@ -2271,16 +2912,23 @@ class Plugin(VideoEditorPlugin):
             except TypeError: pass
 
         self._cleanup_temp_dir()
+        if self.client_widget:
+            self.client_widget.result_previews.cancel()
         if self.client_widget and self.client_widget.worker:
             self.client_widget._on_abort()
             
         self.app.status_label.setText(f"{self.name}: Disabled.")
 
-    def _ensure_ui_loaded(self):
-        if not self._heavy_content_loaded:
-            if not self._load_heavy_ui():
-                return False
-        return True
+    def _ensure_ui_loaded(self, retry_action=None):
+        # While the backend loads, retry_action is queued to run once the UI is built.
+        if self._heavy_content_loaded:
+            return True
+        if self.dock_widget:
+            self.dock_widget.show()
+            self.dock_widget.raise_()
+        if not self._load_heavy_ui() and retry_action and self.loader_thread is not None:
+            self._pending_actions = [retry_action]
+        return self._heavy_content_loaded
 
     def _cleanup_temp_dir(self):
         if self.temp_dir and os.path.exists(self.temp_dir):
@@ -2292,7 +2940,7 @@ class Plugin(VideoEditorPlugin):
         self.start_frame_path = None; self.end_frame_path = None
         if self._heavy_content_loaded:
             self.client_widget.processed_files.clear()
-            self.client_widget.results_list.clear()
+            self.client_widget.results_model.clear()
             self.client_widget.widgets['image_start'].clear()
             self.client_widget.widgets['image_end'].clear()
             self.client_widget.widgets['video_source'].clear()
@@ -2329,7 +2977,7 @@ class Plugin(VideoEditorPlugin):
             create_action_new_track.triggered.connect(lambda: self.setup_creator_for_region(region, on_new_track=True))
 
     def setup_generator_for_region(self, region, on_new_track=False):
-        if not self._ensure_ui_loaded(): return
+        if not self._ensure_ui_loaded(lambda: self.setup_generator_for_region(region, on_new_track)): return
         self._reset_state()
         self.active_region = region
         self.insert_on_new_track = on_new_track
@@ -2389,7 +3037,7 @@ class Plugin(VideoEditorPlugin):
         self.dock_widget.raise_()
 
     def setup_generator_from_start(self, region, on_new_track=False):
-        if not self._ensure_ui_loaded(): return
+        if not self._ensure_ui_loaded(lambda: self.setup_generator_from_start(region, on_new_track)): return
         self._reset_state()
         self.active_region = region
         self.insert_on_new_track = on_new_track
@@ -2448,7 +3096,7 @@ class Plugin(VideoEditorPlugin):
         self.dock_widget.raise_()
 
     def setup_generator_to_end(self, region, on_new_track=False):
-        if not self._ensure_ui_loaded(): return
+        if not self._ensure_ui_loaded(lambda: self.setup_generator_to_end(region, on_new_track)): return
         self._reset_state()
         self.active_region = region
         self.insert_on_new_track = on_new_track
@@ -2518,7 +3166,7 @@ class Plugin(VideoEditorPlugin):
         self.dock_widget.raise_()
 
     def setup_creator_for_region(self, region, on_new_track=False):
-        if not self._ensure_ui_loaded(): return
+        if not self._ensure_ui_loaded(lambda: self.setup_creator_for_region(region, on_new_track)): return
         self._reset_state()
         self.active_region = region
         self.insert_on_new_track = on_new_track
@@ -2584,10 +3232,7 @@ class Plugin(VideoEditorPlugin):
             self.app._perform_complex_timeline_change("Insert AI Clip", complex_insertion_action)
             self.app.prune_empty_tracks()
             self.app.status_label.setText("AI clip inserted successfully.")
-            for i in range(self.client_widget.results_list.count()):
-                widget = self.client_widget.results_list.itemWidget(self.client_widget.results_list.item(i))
-                if widget and widget.video_path == video_path:
-                    self.client_widget.results_list.takeItem(i); break
+            self.client_widget.results_model.remove_path(video_path)
         except Exception as e:
             import traceback; traceback.print_exc()
             self.app.status_label.setText(f"Error during clip insertion: {e}")
\ No newline at end of file
@@ -0,0 +1,267 @@
+import os
+import copy
+import uuid
+import hashlib
+import ffmpeg
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from encoding import TimelineSnapshot, build_video_stream, plan_video_layers, compile_ffmpeg, _popen_ffmpeg, _read_ffmpeg_output
+from media_cache import CACHE_ROOT, source_fingerprint
+
+RENDER_CACHE_DIR = os.path.join(CACHE_ROOT, "render")
+RENDER_CACHE_VERSION = 2
+RENDER_CACHE_MAX_BYTES = 20 * 1024 ** 3
+RENDER_CACHE_VCODEC = 'libx264'
+RENDER_CACHE_CRF = 16
+RENDER_CACHE_PRESET = 'veryfast'
+
+class CachedRangeClip:
+    # Stands in for every visual and subtitle clip of a pre-rendered range.
+    def __init__(self, source_path, timeline_start_ms, duration_ms, track_index):
+        self.id = str(uuid.uuid4())
+        self.source_path = source_path
+        self.timeline_start_ms = int(timeline_start_ms)
+        self.clip_start_ms = 0
+        self.duration_ms = int(duration_ms)
+        self.track_index = track_index
+        self.track_type = 'video'
+        self.media_type = 'video'
+        self.group_id = self.id
+
+    @property
+    def timeline_end_ms(self):
+        return self.timeline_start_ms + self.duration_ms
+
+def _is_visual(clip):
+    return clip.track_type == 'video' or clip.media_type == 'subtitle'
+
+def find_complex_ranges(clips, fps):
+    # (start_ms, end_ms) ranges that stack layers, loop images or burn subtitles; the
+    # kinds of stretches that neither play in real time nor export cheaply.
+    visual = [c for c in clips if _is_visual(c)]
+    if not visual:
+        return []
+    end_frame = int(round(max(c.timeline_end_ms for c in visual) * fps / 1000.0))
+    subtitles = [c for c in visual if c.media_type == 'subtitle']
+
+    ranges = []
+    for a, b, layers in plan_video_layers(clips, fps, 0, end_frame):
+        start_ms, end_ms = a * 1000.0 / fps, b * 1000.0 / fps
+        has_subtitle = any(s.timeline_start_ms < end_ms and s.timeline_end_ms > start_ms for s in subtitles)
+        if len(layers) > 1 or any(c.media_type == 'image' for c in layers) or (layers and has_subtitle):
+            if ranges and ranges[-1][1] == a:
+                ranges[-1] = (ranges[-1][0], b)
+            else:
+                ranges.append((a, b))
+    return [(int(round(a * 1000.0 / fps)), int(round(b * 1000.0 / fps))) for a, b in ranges]
+
+def range_content_hash(clips, start_ms, end_ms, project_settings):
+    # Only what is visible inside the range counts, relative to the range start, so moving the
+    # whole range keeps its cache entry while any edit to an overlapping clip produces a new key.
+    digest = hashlib.sha1(f"{RENDER_CACHE_VERSION}|{project_settings['width']}x{project_settings['height']}@{project_settings['fps']}|{end_ms - start_ms}".encode('utf-8'))
+    overlapping = [c for c in clips if _is_visual(c) and c.timeline_start_ms < end_ms and c.timeline_end_ms > start_ms]
+    for clip in sorted(overlapping, key=lambda c: (c.track_index, c.timeline_start_ms, c.media_type)):
+        try:
+            source_key = source_fingerprint(clip.source_path)
+        except OSError:
+            source_key = clip.source_path
+        visible_start_ms = max(clip.timeline_start_ms, start_ms)
+        visible_end_ms = min(clip.timeline_end_ms, end_ms)
+        source_offset_ms = clip.clip_start_ms + visible_start_ms - clip.timeline_start_ms
+        digest.update(f"|{source_key}|{clip.media_type}|{clip.track_type}|{clip.track_index}|{source_offset_ms}|{visible_start_ms - start_ms}|{visible_end_ms - start_ms}".encode('utf-8'))
+    return digest.hexdigest()
+
+def _clip_outside(clip, start_ms, end_ms):
+    # The parts of clip before start_ms and after end_ms.
+    pieces = []
+    if clip.timeline_start_ms < start_ms:
+        head = copy.copy(clip)
+        head.duration_ms = min(clip.timeline_end_ms, start_ms) - clip.timeline_start_ms
+        pieces.append(head)
+    if clip.timeline_end_ms > end_ms:
+        tail = copy.copy(clip)
+        tail_start_ms = max(clip.timeline_start_ms, end_ms)
+        tail.clip_start_ms = clip.clip_start_ms + tail_start_ms - clip.timeline_start_ms
+        tail.timeline_start_ms = tail_start_ms
+        tail.duration_ms = clip.timeline_end_ms - tail_start_ms
+        pieces.append(tail)
+    return pieces
+
+class RenderCache:
+    def __init__(self, cache_dir=RENDER_CACHE_DIR, max_bytes=RENDER_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def path_for(self, content_hash):
+        return os.path.join(self.cache_dir, f"{content_hash}.mkv")
+
+    def plan(self, clips, project_settings):
+        # [(start_ms, end_ms, content_hash, cached_path or None)] for every complex range.
+        planned = []
+        for start_ms, end_ms in find_complex_ranges(clips, project_settings['fps']):
+            content_hash = range_content_hash(clips, start_ms, end_ms, project_settings)
+            path = self.path_for(content_hash)
+            planned.append((start_ms, end_ms, content_hash, path if os.path.exists(path) else None))
+        return planned
+
+    def substitute(self, clips, project_settings):
+        # Clip list where each cached range is replaced by a single clip reading the rendered file.
+        cached = [(s, e, path) for s, e, _, path in self.plan(clips, project_settings) if path]
+        if not cached:
+            return clips
+        top_track = max([c.track_index for c in clips if c.track_type == 'video'] or [1])
+        result = list(clips)
+        for start_ms, end_ms, path in cached:
+            next_result = []
+            for clip in result:
+                if _is_visual(clip) and clip.timeline_start_ms < end_ms and clip.timeline_end_ms > start_ms:
+                    next_result.extend(_clip_outside(clip, start_ms, end_ms))
+                else:
+                    next_result.append(clip)
+            next_result.append(CachedRangeClip(path, start_ms, end_ms - start_ms, top_track))
+            result = next_result
+            try: os.utime(path)
+            except OSError: pass
+        return sorted(result, key=lambda c: c.timeline_start_ms)
+
+    def substitute_timeline(self, timeline, project_settings):
+        snapshot = TimelineSnapshot(timeline)
+        snapshot.clips = self.substitute(snapshot.clips, project_settings)
+        return snapshot
+
+    def prune(self):
+        # Least recently used entries go first; substitute() touches the files it reads.
+        try:
+            entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.mkv')]
+        except OSError:
+            return
+        entries.sort(key=lambda path: os.path.getmtime(path), reverse=True)
+        total = 0
+        for path in entries:
+            total += os.path.getsize(path)
+            if total > self.max_bytes:
+                try: os.remove(path)
+                except OSError: pass
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir) if os.path.isdir(self.cache_dir) else []:
+            try: os.remove(os.path.join(self.cache_dir, name))
+            except OSError: pass
+
+class _RenderCacheRunner(QObject):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(bool, str)
+
+    def __init__(self, cache, snapshot, project_settings, pending, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.snapshot = snapshot
+        self.project_settings = project_settings
+        self.pending = pending
+        self.process = None
+        self._cancelled = False
+
+    def _command(self, start_ms, end_ms, partial_path):
+        w, h, fps = self.project_settings['width'], self.project_settings['height'], self.project_settings['fps']
+        video = build_video_stream(self.snapshot.clips, w, h, fps, start_ms, end_ms)
+        output_args = {
+            'vcodec': RENDER_CACHE_VCODEC, 'crf': RENDER_CACHE_CRF, 'preset': RENDER_CACHE_PRESET,
+            'g': max(1, int(round(fps))), 'pix_fmt': 'yuv420p', 'an': None, 'f': 'matroska',
+            'frames:v': int(round((end_ms - start_ms) * fps / 1000.0)),
+        }
+        return compile_ffmpeg(ffmpeg.output(video, partial_path, **output_args).overwrite_output())
+
+    def run(self):
+        total_ms = max(1, sum(end_ms - start_ms for start_ms, end_ms, _ in self.pending))
+        done_ms = 0
+        try:
+            os.makedirs(self.cache.cache_dir, exist_ok=True)
+            for start_ms, end_ms, content_hash in self.pending:
+                if self._cancelled:
+                    break
+                target_path = self.cache.path_for(content_hash)
+                partial_path = target_path + ".part"
+                cmd = self._command(start_ms, end_ms, partial_path)
+                def on_progress(info, base_ms=done_ms):
+                    if info['out_time_ms'] is not None:
+                        self.progress.emit(min(99, int((base_ms + info['out_time_ms']) * 100 / total_ms)))
+                self.process = _popen_ffmpeg(cmd)
+                return_code, stderr_tail = _read_ffmpeg_output(self.process, on_progress)
+                if return_code != 0 or self._cancelled:
+                    if os.path.exists(partial_path):
+                        try: os.remove(partial_path)
+                        except OSError: pass
+                    if self._cancelled:
+                        break
+                    print("--- Render cache FAILED ---")
+                    print("Command: " + " ".join(cmd))
+                    print("".join(stderr_tail))
+                    self.finished.emit(False, "Rendering a complex range failed. Check console.")
+                    return
+                os.replace(partial_path, target_path)
+                done_ms += end_ms - start_ms
+
+            if self._cancelled:
+                self.finished.emit(False, "Range rendering cancelled.")
+                return
+            self.cache.prune()
+            self.progress.emit(100)
+            self.finished.emit(True, f"Rendered {len(self.pending)} complex range(s).")
+        except FileNotFoundError:
+            self.finished.emit(False, "Range rendering failed: ffmpeg not found in your system's PATH.")
+        except Exception as e:
+            self.finished.emit(False, f"An exception occurred while rendering ranges: {e}")
+
+    def cancel(self):
+        self._cancelled = True
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+
+class RenderCacheManager(QObject):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(bool, str)
+
+    def __init__(self, cache=None, parent=None):
+        super().__init__(parent)
+        self.cache = cache or RenderCache()
+        self.thread = None
+        self.worker = None
+
+    def is_running(self):
+        return self.worker is not None
+
+    def render_ranges(self, timeline, project_settings):
+        # Renders every complex range that has no cache entry yet; returns how many were started.
+        if self.worker is not None:
+            return 0
+        snapshot = TimelineSnapshot(timeline)
+        pending = [(s, e, h) for s, e, h, path in self.cache.plan(snapshot.clips, project_settings) if not path]
+        if not pending:
+            return 0
+
+        self.thread = QThread()
+        self.worker = _RenderCacheRunner(self.cache, snapshot, dict(project_settings), pending)
+        self.worker.moveToThread(self.thread)
+        self.worker.progress.connect(self.progress.emit)
+        self.worker.finished.connect(self._on_worker_finished)
+        self.thread.started.connect(self.worker.run)
+        self.thread.start()
+        return len(pending)
+
+    def _on_worker_finished(self, success, message):
+        if self.thread:
+            self.thread.quit()
+            self.thread.wait()
+            self.thread.deleteLater()
+        if self.worker:
+            self.worker.deleteLater()
+        self.thread = None
+        self.worker = None
+        self.finished.emit(success, message)
+
+    def cancel(self, wait=False):
+        if self.worker:
+            self.worker.cancel()
+            if wait and self.thread:
+                self.thread.quit()
+                self.thread.wait(2000)
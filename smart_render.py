@@ -0,0 +1,171 @@
+import os
+import json
+import subprocess
+import threading
+from media_cache import CACHE_ROOT, source_fingerprint
+
+KEYFRAME_CACHE_DIR = os.path.join(CACHE_ROOT, "keyframes")
+SMART_RENDER_MIN_COPY_SEC = 2.0
+SMART_RENDER_PIX_FMTS = ['yuv420p', 'yuvj420p']
+
+# Export encoder -> codec_name reported by ffprobe for streams it can be copied from.
+ENCODER_CODEC_NAMES = {
+    'libx264': 'h264',
+    'libx265': 'hevc',
+    'libvpx-vp9': 'vp9',
+    'libaom-av1': 'av1',
+    'mpeg4': 'mpeg4',
+}
+
+# These carry parameter sets in-band inside MPEG-TS, so copied and re-encoded pieces can be joined.
+MPEGTS_INTERMEDIATE_CODECS = ['h264', 'hevc']
+
+def _run_ffprobe(cmd):
+    startupinfo = None
+    if hasattr(subprocess, 'STARTUPINFO'):
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    result = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8", errors='ignore', startupinfo=startupinfo)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"ffprobe failed with code {result.returncode}")
+    return result.stdout
+
+def _parse_rate(rate):
+    num, _, den = (rate or '0/1').partition('/')
+    try:
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+class KeyframeIndex:
+    def __init__(self, cache_dir=KEYFRAME_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, source_path):
+        # Returns stream properties plus keyframe times (seconds from file start), or None if unprobeable.
+        try:
+            fingerprint = source_fingerprint(source_path)
+        except OSError:
+            return None
+
+        with self._lock:
+            if fingerprint in self._entries:
+                return self._entries[fingerprint]
+
+        cache_path = os.path.join(self.cache_dir, f"{fingerprint}.json")
+        entry = None
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                entry = None
+
+        if entry is None:
+            try:
+                entry = self._probe(source_path)
+            except (OSError, RuntimeError, ValueError) as e:
+                print(f"Keyframe index failed for {os.path.basename(source_path)}: {e}")
+                return None
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(cache_path, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f)
+            except OSError as e:
+                print(f"Could not write keyframe index cache: {e}")
+
+        with self._lock:
+            self._entries[fingerprint] = entry
+        return entry
+
+    def _probe(self, source_path):
+        info = json.loads(_run_ffprobe([
+            'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'stream=codec_name,width,height,pix_fmt,avg_frame_rate,r_frame_rate:format=start_time',
+            '-of', 'json', source_path
+        ]))
+        streams = info.get('streams') or []
+        if not streams:
+            raise ValueError("no video stream")
+        stream = streams[0]
+        start_time = float(info.get('format', {}).get('start_time') or 0.0)
+
+        # Packet flags come straight from the demuxer, so this never decodes a frame.
+        packets = _run_ffprobe([
+            'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', source_path
+        ])
+        keyframes = []
+        for line in packets.splitlines():
+            pts_time, _, flags = line.strip().partition(',')
+            if 'K' in flags and pts_time not in ('', 'N/A'):
+                keyframes.append(round(float(pts_time) - start_time, 6))
+
+        return {
+            'codec_name': stream.get('codec_name'),
+            'width': stream.get('width'),
+            'height': stream.get('height'),
+            'pix_fmt': stream.get('pix_fmt'),
+            'fps': _parse_rate(stream.get('avg_frame_rate')) or _parse_rate(stream.get('r_frame_rate')),
+            'keyframes': sorted(set(keyframes)),
+        }
+
+def intermediate_format_for(vcodec):
+    return ('mpegts', 'ts') if ENCODER_CODEC_NAMES.get(vcodec) in MPEGTS_INTERMEDIATE_CODECS else ('matroska', 'mkv')
+
+def _is_copy_compatible(entry, vcodec, w, h, fps):
+    return (
+        entry is not None
+        and entry['codec_name'] == ENCODER_CODEC_NAMES.get(vcodec)
+        and entry['width'] == w and entry['height'] == h
+        and entry['pix_fmt'] in SMART_RENDER_PIX_FMTS
+        and abs(entry['fps'] - fps) < 0.01
+        and entry['keyframes']
+    )
+
+def plan_smart_render(clips, fps, w, h, vcodec, total_frames, index):
+    # Splits [0, total_frames) into ('copy', a, b, source_path, source_start_sec) pieces for
+    # keyframe-aligned stretches showing one untouched clip, and ('encode', a, b) for the rest.
+    visual = [c for c in clips if c.track_type == 'video' and c.media_type != 'subtitle']
+    subtitles = [c for c in clips if c.media_type == 'subtitle']
+    to_frame = lambda ms: int(round(ms * fps / 1000.0))
+    min_copy_frames = max(1, int(round(SMART_RENDER_MIN_COPY_SEC * fps)))
+
+    edits = sorted({0, total_frames} | {min(total_frames, to_frame(ms)) for c in clips if c.track_type == 'video'
+                                         for ms in (c.timeline_start_ms, c.timeline_end_ms)})
+
+    copies = []
+    for a, b in zip(edits[:-1], edits[1:]):
+        mid_ms = (a + b) * 500.0 / fps
+        active = [c for c in visual if c.timeline_start_ms <= mid_ms < c.timeline_end_ms]
+        if len(active) != 1 or active[0].media_type != 'video':
+            continue
+        if any(s.timeline_start_ms < b * 1000.0 / fps and s.timeline_end_ms > a * 1000.0 / fps for s in subtitles):
+            continue
+        clip = active[0]
+        entry = index.get(clip.source_path)
+        if not _is_copy_compatible(entry, vcodec, w, h, fps):
+            continue
+
+        source_at = lambda frame: (clip.clip_start_ms + frame * 1000.0 / fps - clip.timeline_start_ms) / 1000.0
+        half_frame = 0.5 / fps
+        inner = [k for k in entry['keyframes'] if source_at(a) - half_frame <= k <= source_at(b) + half_frame]
+        if len(inner) < 2:
+            continue
+        copy_start = a + int(round((inner[0] - source_at(a)) * fps))
+        copy_end = a + int(round((inner[-1] - source_at(a)) * fps))
+        if copy_end - copy_start >= min_copy_frames:
+            copies.append(('copy', copy_start, copy_end, clip.source_path, inner[0]))
+
+    pieces = []
+    cursor = 0
+    for piece in copies:
+        if piece[1] > cursor:
+            pieces.append(('encode', cursor, piece[1]))
+        pieces.append(piece)
+        cursor = piece[2]
+    if cursor < total_frames:
+        pieces.append(('encode', cursor, total_frames))
+    return pieces
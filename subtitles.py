@@ -0,0 +1,240 @@
+import os
+import re
+import hashlib
+import tempfile
+from media_cache import CACHE_ROOT, source_fingerprint
+
+SUBTITLE_CACHE_DIR = os.path.join(CACHE_ROOT, "subtitles")
+SUBTITLE_CACHE_VERSION = 1
+SUBTITLE_CACHE_MAX_FILES = 100
+
+# What ffmpeg/libass use when rendering an SRT file, so SRT cues look the same once merged.
+SRT_PLAY_RES = (384, 288)
+SRT_DEFAULT_STYLE = {
+    'Name': 'Default', 'Fontname': 'Arial', 'Fontsize': '16', 'PrimaryColour': '&Hffffff',
+    'SecondaryColour': '&Hffffff', 'OutlineColour': '&H0', 'BackColour': '&H0', 'Bold': '0',
+    'Italic': '0', 'Underline': '0', 'StrikeOut': '0', 'ScaleX': '100', 'ScaleY': '100',
+    'Spacing': '0', 'Angle': '0', 'BorderStyle': '1', 'Outline': '1', 'Shadow': '0',
+    'Alignment': '2', 'MarginL': '10', 'MarginR': '10', 'MarginV': '10', 'Encoding': '0',
+}
+STYLE_FORMAT = list(SRT_DEFAULT_STYLE.keys())
+EVENT_FORMAT = ['Layer', 'Start', 'End', 'Style', 'Name', 'MarginL', 'MarginR', 'MarginV', 'Effect', 'Text']
+STYLE_SCALED_FIELDS = ['Fontsize', 'Outline', 'Shadow', 'Spacing', 'MarginV']
+STYLE_SCALED_X_FIELDS = ['MarginL', 'MarginR']
+
+SRT_TIME_RE = re.compile(r'(\d+):(\d{2}):(\d{2})[,.](\d{1,3})\s*-->\s*(\d+):(\d{2}):(\d{2})[,.](\d{1,3})')
+SRT_TAG_RE = re.compile(r'<\s*(/?)\s*([biu])\s*>', re.IGNORECASE)
+
+class SubtitleFile:
+    # Cues in file time with the styles they reference, read from .srt or .ass/.ssa.
+    def __init__(self, play_res, styles, events):
+        self.play_res = play_res
+        self.styles = styles
+        self.events = events
+
+def _srt_ms(h, m, s, frac):
+    return int(h) * 3600000 + int(m) * 60000 + int(s) * 1000 + int(frac.ljust(3, '0'))
+
+def _ass_ms(value):
+    h, m, s = value.strip().split(':')
+    return int(round((int(h) * 3600 + int(m) * 60 + float(s)) * 1000))
+
+def _format_ass_time(ms):
+    cs = int(round(max(0, ms) / 10.0))
+    h, cs = divmod(cs, 360000)
+    m, cs = divmod(cs, 6000)
+    s, cs = divmod(cs, 100)
+    return f"{h}:{m:02d}:{s:02d}.{cs:02d}"
+
+def _srt_text_to_ass(text):
+    # <b>, <i> and <u> become override tags; other markup such as <font> is dropped.
+    text = SRT_TAG_RE.sub(lambda m: '{\\' + m.group(2).lower() + ('0' if m.group(1) else '1') + '}', text)
+    return re.sub(r'<[^>]*>', '', text).replace('\n', '\\N')
+
+def _read_srt(content):
+    events = []
+    for block in re.split(r'\n\s*\n', content.replace('\r\n', '\n').replace('\r', '\n')):
+        lines = block.strip('\n').split('\n')
+        for i, line in enumerate(lines):
+            match = SRT_TIME_RE.search(line)
+            if match:
+                g = match.groups()
+                text = '\n'.join(lines[i + 1:]).strip()
+                if text:
+                    fields = dict(zip(EVENT_FORMAT, ['0', '', '', 'Default', '', '0', '0', '0', '', '']))
+                    fields['Text'] = _srt_text_to_ass(text)
+                    events.append((_srt_ms(*g[:4]), _srt_ms(*g[4:]), fields))
+                break
+    return SubtitleFile(SRT_PLAY_RES, {'Default': dict(SRT_DEFAULT_STYLE)}, events)
+
+def _read_ass(content):
+    play_res = [None, None]
+    styles = {}
+    events = []
+    section = None
+    style_format = STYLE_FORMAT
+    event_format = EVENT_FORMAT
+    for raw_line in content.splitlines():
+        line = raw_line.strip()
+        if line.startswith('[') and line.endswith(']'):
+            section = line.lower()
+            continue
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
+        key, value = key.strip(), value.strip()
+        if section == '[script info]':
+            if key == 'PlayResX': play_res[0] = int(value)
+            elif key == 'PlayResY': play_res[1] = int(value)
+        elif section in ('[v4+ styles]', '[v4 styles]'):
+            if key == 'Format':
+                style_format = [f.strip() for f in value.split(',')]
+            elif key == 'Style':
+                style = dict(zip(style_format, [f.strip() for f in value.split(',', len(style_format) - 1)]))
+                styles[style.get('Name', 'Default')] = style
+        elif section == '[events]':
+            if key == 'Format':
+                event_format = [f.strip() for f in value.split(',')]
+            elif key == 'Dialogue':
+                fields = dict(zip(event_format, raw_line.split(':', 1)[1].lstrip().split(',', len(event_format) - 1)))
+                try:
+                    events.append((_ass_ms(fields['Start']), _ass_ms(fields['End']), fields))
+                except (KeyError, ValueError):
+                    continue
+
+    # libass fills in whichever PlayRes is missing from the other, defaulting to 384x288.
+    if play_res[0] is None and play_res[1] is None:
+        play_res = list(SRT_PLAY_RES)
+    elif play_res[1] is None:
+        play_res[1] = 1024 if play_res[0] == 1280 else max(1, play_res[0] * 3 // 4)
+    elif play_res[0] is None:
+        play_res[0] = 1280 if play_res[1] == 1024 else max(1, play_res[1] * 4 // 3)
+    if not styles:
+        styles['Default'] = dict(SRT_DEFAULT_STYLE)
+    return SubtitleFile(tuple(play_res), styles, events)
+
+def read_subtitle_file(path):
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        content = f.read()
+    if os.path.splitext(path)[1].lower() in ('.ass', '.ssa'):
+        return _read_ass(content)
+    return _read_srt(content)
+
+def _scaled_style(style, name, scale_x, scale_y):
+    style = dict(SRT_DEFAULT_STYLE, **style)
+    style['Name'] = name
+    for field, scale in [(f, scale_y) for f in STYLE_SCALED_FIELDS] + [(f, scale_x) for f in STYLE_SCALED_X_FIELDS]:
+        try:
+            style[field] = f"{float(style[field]) * scale:g}"
+        except ValueError:
+            pass
+    return style
+
+def merged_subtitle_content(clips, start_ms, end_ms):
+    # One ASS script holding every cue of clips that shows inside [start_ms, end_ms), retimed so
+    # 0 is start_ms. Each clip's trim and timeline position are applied, styles are namespaced
+    # per clip and rescaled to a shared PlayRes, and higher tracks draw on top.
+    parsed = [(clip, read_subtitle_file(clip.source_path)) for clip in clips]
+    play_res = next((sub.play_res for _, sub in parsed if sub.play_res != SRT_PLAY_RES), SRT_PLAY_RES)
+
+    style_lines = []
+    event_lines = []
+    for n, (clip, sub) in enumerate(parsed):
+        scale_x = play_res[0] / float(sub.play_res[0])
+        scale_y = play_res[1] / float(sub.play_res[1])
+        for name, style in sub.styles.items():
+            merged_style = _scaled_style(style, f"c{n}_{name}", scale_x, scale_y)
+            style_lines.append("Style: " + ",".join(merged_style.get(f, '') for f in STYLE_FORMAT))
+
+        # File time -> output time; cues are cut to the clip's visible window and the range.
+        shift_ms = clip.timeline_start_ms - clip.clip_start_ms - start_ms
+        window_start_ms = max(clip.timeline_start_ms, start_ms) - start_ms
+        window_end_ms = min(clip.timeline_end_ms, end_ms) - start_ms
+        for cue_start_ms, cue_end_ms, fields in sub.events:
+            out_start_ms = max(cue_start_ms + shift_ms, window_start_ms)
+            out_end_ms = min(cue_end_ms + shift_ms, window_end_ms)
+            if out_end_ms <= out_start_ms:
+                continue
+            event = dict(fields)
+            event['Start'] = _format_ass_time(out_start_ms)
+            event['End'] = _format_ass_time(out_end_ms)
+            style_name = (event.get('Style') or '').lstrip('*')
+            event['Style'] = f"c{n}_{style_name if style_name in sub.styles else next(iter(sub.styles))}"
+            try:
+                event['Layer'] = str(clip.track_index * 1000 + int(event.get('Layer') or 0))
+            except ValueError:
+                event['Layer'] = str(clip.track_index * 1000)
+            event_lines.append((out_start_ms, "Dialogue: " + ",".join(event.get(f, '') for f in EVENT_FORMAT)))
+
+    if not event_lines:
+        return None
+    event_lines.sort(key=lambda entry: entry[0])
+    return "\n".join([
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {play_res[0]}",
+        f"PlayResY: {play_res[1]}",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: " + ", ".join(STYLE_FORMAT),
+        *style_lines,
+        "",
+        "[Events]",
+        "Format: " + ", ".join(EVENT_FORMAT),
+        *[line for _, line in event_lines],
+        "",
+    ])
+
+def merged_subtitle_path(clips, start_ms, end_ms, cache_dir=SUBTITLE_CACHE_DIR):
+    # Writes the merged track for the subtitle clips overlapping [start_ms, end_ms) and returns its
+    # path, or None if no cue is visible there. Files are keyed by their inputs and reused.
+    clips = [c for c in clips if c.timeline_start_ms < end_ms and c.timeline_end_ms > start_ms]
+    if not clips:
+        return None
+    clips = sorted(clips, key=lambda c: (c.track_index, c.timeline_start_ms))
+    digest = hashlib.sha1(f"{SUBTITLE_CACHE_VERSION}|{start_ms}|{end_ms}".encode('utf-8'))
+    for clip in clips:
+        try:
+            source_key = source_fingerprint(clip.source_path)
+        except OSError:
+            source_key = clip.source_path
+        digest.update(f"|{source_key}|{clip.track_index}|{clip.timeline_start_ms}|{clip.clip_start_ms}|{clip.duration_ms}".encode('utf-8'))
+    path = os.path.join(cache_dir, f"{digest.hexdigest()}.ass")
+    if os.path.exists(path):
+        try: os.utime(path)
+        except OSError: pass
+        return path
+
+    try:
+        content = merged_subtitle_content(clips, start_ms, end_ms)
+    except OSError as e:
+        print(f"Could not read subtitles: {e}")
+        return None
+    if content is None:
+        return None
+    os.makedirs(cache_dir, exist_ok=True)
+    # Segment jobs may build the same track concurrently; each writes its own file first.
+    fd, partial_path = tempfile.mkstemp(dir=cache_dir, suffix='.part')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(partial_path, path)
+    prune_subtitle_cache(cache_dir)
+    return path
+
+def _mtime_or_zero(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+def prune_subtitle_cache(cache_dir=SUBTITLE_CACHE_DIR, max_files=SUBTITLE_CACHE_MAX_FILES):
+    # Least recently used tracks go first; merged_subtitle_path() touches the files it reuses.
+    try:
+        entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if name.endswith('.ass')]
+    except OSError:
+        return
+    entries.sort(key=_mtime_or_zero, reverse=True)
+    for path in entries[max_files:]:
+        try: os.remove(path)
+        except OSError: pass
@@ -1,20 +1,22 @@
-import onnxruntime
+import time
+STARTUP_STARTED_AT = time.perf_counter()
 import sys
 import os
+import threading
 import uuid
 import subprocess
 import re
 import json
 import ffmpeg
 import copy
-import tempfile
+import argparse
 from plugins import PluginManager, ManagePluginsDialog
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QFileDialog, QLabel,
                              QScrollArea, QFrame, QProgressBar, QDialog,
                              QCheckBox, QDialogButtonBox, QMenu, QSplitter, QDockWidget,
                              QListWidget, QListWidgetItem, QMessageBox, QComboBox,
-                             QFormLayout, QGroupBox, QLineEdit, QSlider)
+                             QFormLayout, QGroupBox, QLineEdit, QSlider, QSpinBox, QDoubleSpinBox)
 from PyQt6.QtGui import (QPainter, QColor, QPen, QFont, QFontMetrics, QMouseEvent, QAction,
                          QPixmap, QImage, QDrag, QCursor, QKeyEvent, QIcon, QTransform)
 from PyQt6.QtCore import (Qt, QPoint, QRect, QRectF, QSize, QPointF, QObject, QThread,
@@ -22,7 +24,35 @@ from PyQt6.QtCore import (Qt, QPoint, QRect, QRectF, QSize, QPointF, QObject, QT
 
 from undo import UndoStack, TimelineStateChangeCommand, MoveClipsCommand
 from playback import PlaybackManager
-from encoding import Encoder
+from encoding import TimelineSnapshot, create_export_runner, get_default_parallel_workers
+from smart_render import KeyframeIndex
+from export_queue import ExportQueue, ExportQueueWidget, JOB_QUEUED
+from render_cache import RenderCacheManager
+from encoder_tuning import EncoderTuner, speed_presets_for, preset_options, choose_preset, ENCODER_TUNING_DEFAULT_TARGET_SPEED
+from media_cache import ReindexCache, ReindexManager
+from ffmpeg_capabilities import CapabilityRefresher, capabilities_failed, get_available_formats, get_available_codecs
+
+class StartupProfile:
+    # Wall time per start-up phase, printed once the editor is interactive with --startup-profile.
+    def __init__(self, started_at):
+        self.enabled = False
+        self.started_at = started_at
+        self.last_mark = started_at
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last_mark))
+        self.last_mark = now
+
+    def report(self):
+        if not self.enabled: return
+        print("Start-up profile:")
+        for phase, seconds in self.phases:
+            print(f"  {phase:<26}{seconds * 1000:9.1f} ms")
+        print(f"  {'total':<26}{(self.last_mark - self.started_at) * 1000:9.1f} ms")
+
+STARTUP_PROFILE = StartupProfile(STARTUP_STARTED_AT)
 
 CONTAINER_PRESETS = {
     'mp4': {
@@ -82,10 +112,6 @@ CONTAINER_PRESETS = {
     }
 }
 
-_cached_formats = None
-_cached_video_codecs = None
-_cached_audio_codecs = None
-
 def download_ffmpeg():
     if os.name != 'nt': return
     exes = ['ffmpeg.exe', 'ffprobe.exe', 'ffplay.exe']
@@ -113,103 +139,6 @@ def download_ffmpeg():
                 os.rename(f, os.path.basename(f))
     os.remove(zip_name)
 
-def run_ffmpeg_command(args):
-    try:
-        startupinfo = None
-        if hasattr(subprocess, 'STARTUPINFO'):
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = subprocess.SW_HIDE
-        
-        result = subprocess.run(
-            ['ffmpeg'] + args,
-            capture_output=True, text=True, encoding='utf-8',
-            errors='ignore', startupinfo=startupinfo
-        )
-        if result.returncode != 0 and "Unrecognized option" not in result.stderr:
-             print(f"FFmpeg command failed: {' '.join(args)}\n{result.stderr}")
-             return ""
-        return result.stdout
-    except FileNotFoundError:
-        print("Error: ffmpeg not found. Please ensure it is in your system's PATH.")
-        return None
-    except Exception as e:
-        print(f"An error occurred while running ffmpeg: {e}")
-        return None
-
-def get_available_formats():
-    global _cached_formats
-    if _cached_formats is not None:
-        return _cached_formats
-
-    output = run_ffmpeg_command(['-formats'])
-    if not output:
-        _cached_formats = {}
-        return {}
-
-    formats = {}
-    lines = output.split('\n')
-    header_found = False
-    for line in lines:
-        if "---" in line:
-            header_found = True
-            continue
-        if not header_found or not line.strip():
-            continue
-
-        if line[2] == 'E':
-            parts = line[4:].strip().split(None, 1)
-            if len(parts) == 2:
-                names, description = parts
-                primary_name = names.split(',')[0].strip()
-                formats[primary_name] = description.strip()
-
-    _cached_formats = dict(sorted(formats.items()))
-    return _cached_formats
-
-def get_available_codecs(codec_type='video'):
-    global _cached_video_codecs, _cached_audio_codecs
-    
-    if codec_type == 'video' and _cached_video_codecs is not None: return _cached_video_codecs
-    if codec_type == 'audio' and _cached_audio_codecs is not None: return _cached_audio_codecs
-
-    output = run_ffmpeg_command(['-encoders'])
-    if not output:
-        if codec_type == 'video': _cached_video_codecs = {}
-        else: _cached_audio_codecs = {}
-        return {}
-
-    video_codecs = {}
-    audio_codecs = {}
-    lines = output.split('\n')
-    
-    header_found = False
-    for line in lines:
-        if "------" in line:
-            header_found = True
-            continue
-
-        if not header_found or not line.strip():
-            continue
-
-        parts = line.strip().split(None, 2)
-        if len(parts) < 3:
-            continue
-
-        flags, name, description = parts
-        type_flag = flags[0]
-        clean_description = re.sub(r'\s*\(codec .*\)$', '', description).strip()
-
-        if type_flag == 'V':
-            video_codecs[name] = clean_description
-        elif type_flag == 'A':
-            audio_codecs[name] = clean_description
-
-    _cached_video_codecs = dict(sorted(video_codecs.items()))
-    _cached_audio_codecs = dict(sorted(audio_codecs.items()))
-
-    return _cached_video_codecs if codec_type == 'video' else _cached_audio_codecs
-
 def _get_subtitle_duration_ms(file_path):
     last_time_ms = 0
     try:
@@ -280,6 +209,8 @@ class Timeline:
         self.clips = []
         self.num_video_tracks = 1
         self.num_audio_tracks = 1
+        # Maps a clip's saved source path to the file actually decoded (e.g. a re-indexed copy).
+        self.source_resolver = None
 
     def add_clip(self, clip):
         self.clips.append(clip)
@@ -289,6 +220,44 @@ class Timeline:
         if not self.clips: return 0
         return max(c.timeline_end_ms for c in self.clips)
 
+def _infer_clip_media_type(clip_data):
+    if 'media_type' not in clip_data:
+        ext = os.path.splitext(clip_data['source_path'])[1].lower()
+        if ext in ['.mp3', '.wav', '.m4a', '.aac']:
+             clip_data['media_type'] = 'audio'
+        else:
+             clip_data['media_type'] = 'video'
+    return clip_data
+
+def load_project_timeline(project_data):
+    project_settings = project_data.get("settings", {})
+    timeline = Timeline()
+    timeline.num_video_tracks = project_settings.get("num_video_tracks", 1)
+    timeline.num_audio_tracks = project_settings.get("num_audio_tracks", 1)
+    for clip_data in project_data["clips"]:
+        timeline.add_clip(TimelineClip(**_infer_clip_media_type(dict(clip_data))))
+    return timeline, {
+        'width': project_settings.get("project_width", 1280),
+        'height': project_settings.get("project_height", 720),
+        'fps': project_settings.get("project_fps", 25.0)
+    }
+
+class MediaProbeWorker(QObject):
+    finished = pyqtSignal(str, object)
+
+    def __init__(self, file_path, probe_func):
+        super().__init__()
+        self.file_path = file_path
+        self.probe_func = probe_func
+
+    def run(self):
+        try:
+            media_props = self.probe_func(self.file_path)
+        except Exception as e:
+            print(f"Background probe failed for {os.path.basename(self.file_path)}: {e}")
+            media_props = None
+        self.finished.emit(self.file_path, media_props)
+
 class TimelineWidget(QWidget):
     TIMESCALE_HEIGHT = 30
     HEADER_WIDTH = 120
@@ -296,6 +265,7 @@ class TimelineWidget(QWidget):
     AUDIO_TRACKS_SEPARATOR_Y = 15
     RESIZE_HANDLE_WIDTH = 8
     SNAP_THRESHOLD_PIXELS = 8
+    DRAG_PLACEHOLDER_DURATION_MS = 5000
 
     split_requested = pyqtSignal(object)
     delete_clip_requested = pyqtSignal(object)
@@ -366,6 +336,9 @@ class TimelineWidget(QWidget):
         self.drag_over_active = False
         self.drag_over_rect = QRectF()
         self.drag_over_audio_rect = QRectF()
+        self.drag_over_pending = False
+        self.drag_over_pos = QPointF()
+        self.drag_over_file_path = None
         self.drag_url_cache = {}
 
     def set_hover_preview_rects(self, video_rect, audio_rect):
@@ -401,7 +374,10 @@ class TimelineWidget(QWidget):
         self.draw_selections(painter)
         
         if self.drag_over_active:
-            painter.setPen(QColor(0, 255, 0, 150))
+            if self.drag_over_pending:
+                painter.setPen(QPen(QColor(0, 255, 0, 150), 1, Qt.PenStyle.DashLine))
+            else:
+                painter.setPen(QColor(0, 255, 0, 150))
             if not self.drag_over_rect.isNull():
                 painter.fillRect(self.drag_over_rect, QColor(0, 255, 0, 80))
                 painter.drawRect(self.drag_over_rect)
@@ -1247,10 +1223,89 @@ class TimelineWidget(QWidget):
         self.drag_url_cache.clear()
         self.update()
 
+    def _placeholder_drag_props(self, file_path):
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext in ['.png', '.jpg', '.jpeg']:
+            media_type, has_audio = 'image', False
+        elif ext in ['.srt', '.ass']:
+            media_type, has_audio = 'subtitle', False
+        elif ext in ['.mp3', '.wav', '.m4a', '.aac', '.flac', '.ogg']:
+            media_type, has_audio = 'audio', True
+        else:
+            media_type, has_audio = 'video', True
+        return {'duration_ms': self.DRAG_PLACEHOLDER_DURATION_MS, 'media_type': media_type, 'has_audio': has_audio, 'pending': True}
+
+    def on_drag_probe_finished(self, file_path, media_props):
+        cached = self.drag_url_cache.get(file_path)
+        if not cached or not cached.get('pending'):
+            return
+        self.drag_url_cache[file_path] = media_props
+        if self.drag_over_active and self.drag_over_file_path == file_path:
+            self._update_drag_over_rects(self.drag_over_pos, media_props)
+            self.update()
+
+    def _update_drag_over_rects(self, pos, media_props):
+        track_info = self.y_to_track_info(pos.y())
+
+        self.drag_over_rect = QRectF()
+        self.drag_over_audio_rect = QRectF()
+        self.drag_over_active = False
+        self.drag_over_pending = bool(media_props and media_props.get('pending'))
+        self.highlighted_ghost_track_info = None
+        self.highlighted_track_info = None
+
+        if not track_info:
+            return
+
+        self.drag_over_active = True
+        track_type, track_index = track_info
+
+        is_ghost_track = (track_type == 'video' and track_index > self.timeline.num_video_tracks) or \
+                         (track_type == 'audio' and track_index > self.timeline.num_audio_tracks)
+        if is_ghost_track:
+            self.highlighted_ghost_track_info = track_info
+        else:
+            self.highlighted_track_info = track_info
+
+        if not media_props:
+            return
+
+        duration_ms = media_props['duration_ms']
+        media_type = media_props['media_type']
+        has_audio = media_props['has_audio']
+
+        start_ms = self.x_to_ms(pos.x())
+        width = int(duration_ms * self.pixels_per_ms)
+        x = self.ms_to_x(start_ms)
+
+        video_y, audio_y = -1, -1
+
+        if media_type in ['video', 'image', 'subtitle']:
+            if track_type == 'video':
+                visual_index = self.timeline.num_video_tracks - track_index
+                video_y = self.video_tracks_y_start + visual_index * self.TRACK_HEIGHT
+                if has_audio:
+                    audio_y = self.audio_tracks_y_start
+            elif track_type == 'audio' and has_audio:
+                visual_index = track_index - 1
+                audio_y = self.audio_tracks_y_start + visual_index * self.TRACK_HEIGHT
+                video_y = self.video_tracks_y_start + (self.timeline.num_video_tracks - 1) * self.TRACK_HEIGHT
+
+        elif media_type == 'audio':
+            if track_type == 'audio':
+                visual_index = track_index - 1
+                audio_y = self.audio_tracks_y_start + visual_index * self.TRACK_HEIGHT
+
+        if video_y != -1:
+            self.drag_over_rect = QRectF(x, video_y, width, self.TRACK_HEIGHT)
+        if audio_y != -1:
+            self.drag_over_audio_rect = QRectF(x, audio_y, width, self.TRACK_HEIGHT)
+
     def dragMoveEvent(self, event):
         mime_data = event.mimeData()
         media_props = None
-        
+        self.drag_over_file_path = None
+
         if mime_data.hasUrls():
             urls = mime_data.urls()
             if not urls:
@@ -1258,164 +1313,91 @@ class TimelineWidget(QWidget):
                 return
             
             file_path = urls[0].toLocalFile()
-            
-            if file_path in self.drag_url_cache:
-                media_props = self.drag_url_cache[file_path]
-            else:
-                probed_props = self.window()._probe_for_drag(file_path)
-                if probed_props:
-                    self.drag_url_cache[file_path] = probed_props
-                    media_props = probed_props
+            self.drag_over_file_path = file_path
+
+            if file_path not in self.drag_url_cache:
+                # Probing (and possibly re-indexing) can take seconds, so show a
+                # placeholder ghost and resize it once the background probe lands.
+                self.drag_url_cache[file_path] = self._placeholder_drag_props(file_path)
+                self.window()._probe_for_drag(file_path, self.on_drag_probe_finished)
+            media_props = self.drag_url_cache[file_path]
         
         elif mime_data.hasFormat('application/x-vnd.video.filepath'):
             json_data_bytes = mime_data.data('application/x-vnd.video.filepath').data()
             media_props = json.loads(json_data_bytes.decode('utf-8'))
         
-        if not media_props:
-            if mime_data.hasUrls():
-                event.acceptProposedAction()
-                pos = event.position()
-                track_info = self.y_to_track_info(pos.y())
-
-                self.drag_over_rect = QRectF()
-                self.drag_over_audio_rect = QRectF()
-                self.drag_over_active = False
-                self.highlighted_ghost_track_info = None
-                self.highlighted_track_info = None
-
-                if track_info:
-                    self.drag_over_active = True
-                    track_type, track_index = track_info
-                    is_ghost_track = (track_type == 'video' and track_index > self.timeline.num_video_tracks) or \
-                                     (track_type == 'audio' and track_index > self.timeline.num_audio_tracks)
-                    if is_ghost_track:
-                        self.highlighted_ghost_track_info = track_info
-                    else:
-                        self.highlighted_track_info = track_info
-                
-                self.update()
-            else:
-                event.ignore()
+        if not media_props and not mime_data.hasUrls():
+            event.ignore()
             return
 
         event.acceptProposedAction()
-        
-        duration_ms = media_props['duration_ms']
-        media_type = media_props['media_type']
-        has_audio = media_props['has_audio']
+        self.drag_over_pos = event.position()
+        self._update_drag_over_rects(self.drag_over_pos, media_props)
+        self.update()
 
-        pos = event.position()
-        start_ms = self.x_to_ms(pos.x())
-        track_info = self.y_to_track_info(pos.y())
+    def _place_dropped_files(self, added_files, start_ms, track_info):
+        main_window = self.window()
+        current_timeline_pos = start_ms
 
-        self.drag_over_rect = QRectF()
-        self.drag_over_audio_rect = QRectF()
-        self.drag_over_active = False
-        self.highlighted_ghost_track_info = None
-        self.highlighted_track_info = None
+        for file_path in added_files:
+            media_info = main_window.media_properties.get(file_path)
+            if not media_info: continue
 
-        if track_info:
-            self.drag_over_active = True
-            track_type, track_index = track_info
-            
-            is_ghost_track = (track_type == 'video' and track_index > self.timeline.num_video_tracks) or \
-                             (track_type == 'audio' and track_index > self.timeline.num_audio_tracks)
-            if is_ghost_track:
-                self.highlighted_ghost_track_info = track_info
-            else:
-                self.highlighted_track_info = track_info
-            
-            width = int(duration_ms * self.pixels_per_ms)
-            x = self.ms_to_x(start_ms)
-            
-            video_y, audio_y = -1, -1
-
-            if media_type in ['video', 'image', 'subtitle']:
-                if track_type == 'video':
-                    visual_index = self.timeline.num_video_tracks - track_index
-                    video_y = self.video_tracks_y_start + visual_index * self.TRACK_HEIGHT
-                    if has_audio:
-                        audio_y = self.audio_tracks_y_start
-                elif track_type == 'audio' and has_audio:
-                    visual_index = track_index - 1
-                    audio_y = self.audio_tracks_y_start + visual_index * self.TRACK_HEIGHT
-                    video_y = self.video_tracks_y_start + (self.timeline.num_video_tracks - 1) * self.TRACK_HEIGHT
-            
-            elif media_type == 'audio':
-                if track_type == 'audio':
-                    visual_index = track_index - 1
-                    audio_y = self.audio_tracks_y_start + visual_index * self.TRACK_HEIGHT
+            duration_ms = media_info['duration_ms']
+            has_audio = media_info['has_audio']
+            media_type = media_info['media_type']
 
-            if video_y != -1:
-                self.drag_over_rect = QRectF(x, video_y, width, self.TRACK_HEIGHT)
-            if audio_y != -1:
-                self.drag_over_audio_rect = QRectF(x, audio_y, width, self.TRACK_HEIGHT)
-        
-        self.update()
+            drop_track_type, drop_track_index = track_info
+            video_track_idx = None
+            audio_track_idx = None
+
+            if media_type in ['image', 'subtitle']:
+                if drop_track_type == 'video': video_track_idx = drop_track_index
+            elif media_type == 'audio':
+                if drop_track_type == 'audio': audio_track_idx = drop_track_index
+            elif media_type == 'video':
+                if drop_track_type == 'video':
+                    video_track_idx = drop_track_index
+                    if has_audio: audio_track_idx = 1
+                elif drop_track_type == 'audio' and has_audio:
+                    audio_track_idx = drop_track_index
+                    video_track_idx = 1
+                
+            if video_track_idx is None and audio_track_idx is None:
+                continue
+
+            main_window._add_clip_to_timeline(
+                source_path=file_path,
+                timeline_start_ms=current_timeline_pos,
+                duration_ms=duration_ms,
+                media_type=media_type,
+                clip_start_ms=0,
+                video_track_index=video_track_idx,
+                audio_track_index=audio_track_idx
+            )
+            current_timeline_pos += duration_ms
 
     def dropEvent(self, event):
         self.drag_over_active = False
         self.highlighted_ghost_track_info = None
         self.highlighted_track_info = None
+        # Probes that landed during the drag are reused so the drop does not probe those files again.
+        probed = {path: props for path, props in self.drag_url_cache.items() if props and not props.get('pending')}
         self.drag_url_cache.clear()
         self.update()
         
         mime_data = event.mimeData()
         if mime_data.hasUrls():
             file_paths = [url.toLocalFile() for url in mime_data.urls()]
-            main_window = self.window()
-            added_files = main_window._add_media_files_to_project(file_paths)
-            if not added_files:
-                event.ignore()
-                return
-
             pos = event.position()
             start_ms = self.x_to_ms(pos.x())
             track_info = self.y_to_track_info(pos.y())
             if not track_info:
                 event.ignore()
                 return
-            
-            current_timeline_pos = start_ms
-
-            for file_path in added_files:
-                media_info = main_window.media_properties.get(file_path)
-                if not media_info: continue
-
-                duration_ms = media_info['duration_ms']
-                has_audio = media_info['has_audio']
-                media_type = media_info['media_type']
-
-                drop_track_type, drop_track_index = track_info
-                video_track_idx = None
-                audio_track_idx = None
-
-                if media_type in ['image', 'subtitle']:
-                    if drop_track_type == 'video': video_track_idx = drop_track_index
-                elif media_type == 'audio':
-                    if drop_track_type == 'audio': audio_track_idx = drop_track_index
-                elif media_type == 'video':
-                    if drop_track_type == 'video':
-                        video_track_idx = drop_track_index
-                        if has_audio: audio_track_idx = 1
-                    elif drop_track_type == 'audio' and has_audio:
-                        audio_track_idx = drop_track_index
-                        video_track_idx = 1
-                
-                if video_track_idx is None and audio_track_idx is None:
-                    continue
 
-                main_window._add_clip_to_timeline(
-                    source_path=file_path,
-                    timeline_start_ms=current_timeline_pos,
-                    duration_ms=duration_ms,
-                    media_type=media_type,
-                    clip_start_ms=0,
-                    video_track_index=video_track_idx,
-                    audio_track_index=audio_track_idx
-                )
-                current_timeline_pos += duration_ms
-            
+            # Anything still unprobed is probed off the GUI thread; clips are placed once all files are in.
+            self.window().add_media_files_async(file_paths, probed, lambda added_files: self._place_dropped_files(added_files, start_ms, track_info))
             event.acceptProposedAction()
             return
 
@@ -1589,7 +1571,7 @@ class SettingsDialog(QDialog):
         }
 
 class ExportDialog(QDialog):
-    def __init__(self, default_path, parent=None):
+    def __init__(self, default_path, parent=None, timeline=None, project_settings=None):
         super().__init__(parent)
         self.setWindowTitle("Export Settings")
         self.setMinimumWidth(550)
@@ -1598,10 +1580,16 @@ class ExportDialog(QDialog):
         self.audio_bitrate_options = ["96k", "128k", "192k", "256k", "320k", "Custom..."]
         self.display_ext_map = {'matroska': 'mkv', 'oga': 'ogg'}
 
+        self.add_to_queue = False
         self.layout = QVBoxLayout(self)
         self.formats = get_available_formats()
         self.video_codecs = get_available_codecs('video')
         self.audio_codecs = get_available_codecs('audio')
+        self.timeline = timeline
+        self.project_settings = project_settings
+        self.encoder_tuner = EncoderTuner()
+        self.encoder_tuner.progress.connect(self.on_tuning_progress)
+        self.encoder_tuner.finished.connect(self.on_tuning_finished)
 
         self._setup_ui()
         
@@ -1660,11 +1648,124 @@ class ExportDialog(QDialog):
         self.audio_group.setLayout(audio_layout)
         self.layout.addWidget(self.audio_group)
 
+        self.performance_group = QGroupBox("Performance")
+        performance_layout = QFormLayout()
+        self.parallel_checkbox = QCheckBox("Parallel segmented encoding")
+        self.parallel_checkbox.setToolTip("Encodes timeline segments concurrently and joins them losslessly.")
+        self.workers_spinbox = QSpinBox()
+        self.workers_spinbox.setRange(1, max(1, os.cpu_count() or 1))
+        self.workers_spinbox.setValue(get_default_parallel_workers())
+        self.workers_spinbox.setEnabled(False)
+        self.parallel_checkbox.toggled.connect(self.workers_spinbox.setEnabled)
+        self.parallel_checkbox.toggled.connect(self.on_tuning_profile_changed)
+        self.workers_spinbox.valueChanged.connect(self.on_tuning_profile_changed)
+        self.smart_render_checkbox = QCheckBox("Smart render (stream-copy unchanged clips)")
+        self.smart_render_checkbox.setToolTip("Copies untouched stretches between keyframes and re-encodes only the edited ranges around them.")
+        performance_layout.addRow(self.parallel_checkbox)
+        performance_layout.addRow("Parallel Workers:", self.workers_spinbox)
+        performance_layout.addRow(self.smart_render_checkbox)
+        self.resumable_checkbox = QCheckBox("Resumable (keep finished segments if interrupted)")
+        self.resumable_checkbox.setToolTip("Checkpoints each finished segment next to the output file. Exporting again to the same file re-encodes only what is missing.")
+        performance_layout.addRow(self.resumable_checkbox)
+        self.render_cache_checkbox = QCheckBox("Reuse pre-rendered complex ranges")
+        self.render_cache_checkbox.setToolTip("Reads ranges rendered with Edit > Pre-render Complex Ranges instead of compositing them again.")
+        performance_layout.addRow(self.render_cache_checkbox)
+
+        self.speed_preset_combo = QComboBox()
+        performance_layout.addRow("Encoder Preset:", self.speed_preset_combo)
+        tuning_layout = QHBoxLayout()
+        self.target_speed_spinbox = QDoubleSpinBox()
+        self.target_speed_spinbox.setRange(0.1, 20.0)
+        self.target_speed_spinbox.setSingleStep(0.5)
+        self.target_speed_spinbox.setSuffix("x realtime")
+        self.target_speed_spinbox.setValue(ENCODER_TUNING_DEFAULT_TARGET_SPEED)
+        self.target_speed_spinbox.valueChanged.connect(self.apply_tuned_preset)
+        self.auto_tune_button = QPushButton("Auto-Tune")
+        self.auto_tune_button.setToolTip("Encodes a 5 second slice of the timeline with each preset and picks the slowest one that still meets the target speed. Results are remembered for this machine.")
+        self.auto_tune_button.clicked.connect(self.start_auto_tune)
+        tuning_layout.addWidget(self.target_speed_spinbox)
+        tuning_layout.addWidget(self.auto_tune_button)
+        performance_layout.addRow("Target Speed:", tuning_layout)
+        self.tuning_status_label = QLabel("")
+        performance_layout.addRow(self.tuning_status_label)
+        self.video_codec_combo.currentIndexChanged.connect(self.on_video_codec_changed)
+        self.performance_group.setLayout(performance_layout)
+        self.layout.addWidget(self.performance_group)
+
         self.button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
         self.button_box.accepted.connect(self.accept)
         self.button_box.rejected.connect(self.reject)
+        queue_button = self.button_box.addButton("Add to Queue", QDialogButtonBox.ButtonRole.ActionRole)
+        queue_button.clicked.connect(self.on_add_to_queue)
         self.layout.addWidget(self.button_box)
 
+    def on_add_to_queue(self):
+        self.add_to_queue = True
+        self.accept()
+
+    def done(self, result):
+        self.encoder_tuner.cancel(wait=True)
+        super().done(result)
+
+    def on_video_codec_changed(self, index):
+        vcodec = self.video_codec_combo.currentData()
+        presets = speed_presets_for(vcodec)
+        self.speed_preset_combo.clear()
+        self.speed_preset_combo.addItem("Encoder default", None)
+        for label, _ in presets:
+            self.speed_preset_combo.addItem(label, label)
+        can_tune = bool(presets) and self.timeline is not None and self.project_settings is not None
+        self.speed_preset_combo.setEnabled(bool(presets))
+        self.auto_tune_button.setEnabled(can_tune and not self.encoder_tuner.is_running())
+        self.tuning_status_label.setText("")
+        self.apply_tuned_preset()
+
+    def _current_v_bitrate(self):
+        v_bitrate = self.v_bitrate_combo.currentText()
+        if v_bitrate == "Custom...": v_bitrate = self.v_bitrate_custom_edit.text()
+        return v_bitrate if self.v_bitrate_combo.isEnabled() else None
+
+    def _tuning_workers(self):
+        # Calibration is stored per worker count, since parallel encoders compete for the same cores.
+        return self.workers_spinbox.value() if self.parallel_checkbox.isChecked() else 1
+
+    def on_tuning_profile_changed(self):
+        if self.encoder_tuner.is_running():
+            return
+        self.tuning_status_label.setText("")
+        self.apply_tuned_preset()
+
+    def apply_tuned_preset(self):
+        # Picks from earlier calibration runs on this machine, if there are any for this codec.
+        vcodec = self.video_codec_combo.currentData()
+        if self.project_settings is None or not speed_presets_for(vcodec):
+            return
+        measurements = self.encoder_tuner.cache.get(vcodec, self.project_settings, self._current_v_bitrate(), self._tuning_workers())
+        label = choose_preset(vcodec, measurements, self.target_speed_spinbox.value())
+        if label:
+            self.speed_preset_combo.setCurrentIndex(max(0, self.speed_preset_combo.findData(label)))
+            result = measurements[label]
+            self.tuning_status_label.setText(f"Calibrated: {label} at {result['speed']:.2f}x ({result['fps']:.0f} fps)")
+
+    def start_auto_tune(self):
+        vcodec = self.video_codec_combo.currentData()
+        started = self.encoder_tuner.start(self.timeline, self.project_settings, vcodec,
+                                           self._current_v_bitrate(), self.target_speed_spinbox.value(), self._tuning_workers())
+        if started:
+            self.auto_tune_button.setEnabled(False)
+            self.tuning_status_label.setText("Calibrating...")
+        else:
+            self.tuning_status_label.setText("Nothing to calibrate.")
+
+    def on_tuning_progress(self, message):
+        self.tuning_status_label.setText(message)
+
+    def on_tuning_finished(self, success, message, measurements):
+        self.auto_tune_button.setEnabled(True)
+        self.tuning_status_label.setText(message)
+        if success:
+            self.apply_tuned_preset()
+
     def _populate_combo(self, combo, data_dict, filter_keys=None):
         current_selection = combo.currentData()
         combo.blockSignals(True)
@@ -1759,6 +1860,7 @@ class ExportDialog(QDialog):
         if new_container_codename:
             self.update_output_path_extension(new_container_codename)
             self.apply_preset(new_container_codename)
+        self.on_video_codec_changed(self.video_codec_combo.currentIndex())
 
     def update_output_path_extension(self, new_container_codename):
         current_path = self.path_edit.text()
@@ -1783,6 +1885,12 @@ class ExportDialog(QDialog):
             "v_bitrate": v_bitrate if self.v_bitrate_combo.isEnabled() else None,
             "acodec": self.audio_codec_combo.currentData() if self.audio_group.isEnabled() else None,
             "a_bitrate": a_bitrate if self.a_bitrate_combo.isEnabled() else None,
+            "parallel": self.parallel_checkbox.isChecked(),
+            "workers": self.workers_spinbox.value(),
+            "smart_render": self.smart_render_checkbox.isChecked(),
+            "resumable": self.resumable_checkbox.isChecked(),
+            "use_render_cache": self.render_cache_checkbox.isChecked(),
+            "encoder_options": preset_options(self.video_codec_combo.currentData(), self.speed_preset_combo.currentData()) if self.video_group.isEnabled() else {},
         }
 
 class MediaListWidget(QListWidget):
@@ -1851,7 +1959,7 @@ class ProjectMediaWidget(QWidget):
     def dropEvent(self, event):
         if event.mimeData().hasUrls():
             file_paths = [url.toLocalFile() for url in event.mimeData().urls()]
-            self.main_window._add_media_files_to_project(file_paths)
+            self.main_window.add_media_files_async(file_paths)
             event.acceptProposedAction()
         else:
             event.ignore()
@@ -1896,22 +2004,35 @@ class MainWindow(QMainWindow):
         self.setDockOptions(QMainWindow.DockOption.AnimatedDocks | QMainWindow.DockOption.AllowNestedDocks)
 
         self.timeline = Timeline()
+        self.timeline.source_resolver = self._resolve_clip_source
         self.undo_stack = UndoStack()
         self.media_pool = []
         self.media_properties = {}
+        self.drag_probe_threads = []
+        # file path -> callbacks waiting on its background probe
+        self.media_probe_callbacks = {}
         self.current_project_path = None
         self.last_export_path = None
         self.settings = {}
-        self.settings_file = "settings.json"
+        self.settings_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.json")
         self.is_shutting_down = False
         self.pre_fullscreen_visibility = {}
         self._load_settings()
 
         self.playback_manager = PlaybackManager(self._get_playback_data)
-        self.encoder = Encoder()
+        self.export_queue = ExportQueue()
+        # Queue job shown in the status bar for File > Export; every export goes through the queue.
+        self.foreground_export_id = None
+        self.render_cache_manager = RenderCacheManager()
+        self.playback_manager.render_cache = self.render_cache_manager.cache
+        self.export_queue.render_cache = self.render_cache_manager.cache
+        self.reindex_manager = ReindexManager()
+        self.capability_refresher = CapabilityRefresher()
+        self.pending_reindex_pool_adds = set()
 
         self.plugin_manager = PluginManager(self)
-        self.plugin_manager.discover_and_load_plugins()
+        self.plugins_loaded = False
+        STARTUP_PROFILE.mark("main window managers")
         
         self.project_fps = 50.0
         self.project_width = 1280
@@ -1927,10 +2048,27 @@ class MainWindow(QMainWindow):
         self.preview_widget.installEventFilter(self)
         self._default_splitter_handle_width = self.splitter.handleWidth()
 
-        self.plugin_manager.load_enabled_plugins_from_settings(self.settings.get("enabled_plugins", []))
         self._apply_loaded_settings()
+        STARTUP_PROFILE.mark("main window ui")
+
+        # Plugin discovery executes every plugin's main.py and the first preview frame spawns ffmpeg,
+        # so both wait until the window is up and the event loop is running.
+        QTimer.singleShot(0, lambda: self._finish_startup(project_to_load))
+
+    def _finish_startup(self, project_to_load):
+        STARTUP_PROFILE.mark("first event loop pass")
+        self.plugin_manager.discover_and_load_plugins()
+        self._populate_plugins_menu()
+        STARTUP_PROFILE.mark(f"plugin discovery ({len(self.plugin_manager.plugins)} found)")
+        self.plugin_manager.load_enabled_plugins_from_settings(self.settings.get("enabled_plugins", []))
+        self.plugins_loaded = True
+        loaded_count = sum(1 for name in self.plugin_manager.plugins if self.plugin_manager.is_loaded(name))
+        STARTUP_PROFILE.mark(f"plugin enable ({loaded_count} imported)")
         self.playback_manager.seek_to_frame(0)
-        
+        STARTUP_PROFILE.mark("initial seek")
+        self.capability_refresher.start()
+        STARTUP_PROFILE.report()
+
         if not self.settings_file_was_loaded: self._save_settings()
         if project_to_load: QTimer.singleShot(100, lambda: self._load_project_from_path(project_to_load))
 
@@ -1945,10 +2083,25 @@ class MainWindow(QMainWindow):
             self.timeline.num_audio_tracks
         )
     
+    def _resolve_clip_source(self, path):
+        media_info = self.media_properties.get(path)
+        return media_info.get('source_path_for_clips', path) if media_info else path
+
+    def _get_playback_clips(self):
+        # Clips keep their original paths; copies pointing at re-indexed files are handed to the decoders.
+        clips = []
+        for clip in self.timeline.clips:
+            resolved = self._resolve_clip_source(clip.source_path)
+            if resolved != clip.source_path:
+                clip = copy.copy(clip)
+                clip.source_path = resolved
+            clips.append(clip)
+        return clips
+
     def _get_playback_data(self):
         return (
             self.timeline,
-            self.timeline.clips,
+            self._get_playback_clips(),
             {
                 'width': self.project_width,
                 'height': self.project_height,
@@ -1962,6 +2115,10 @@ class MainWindow(QMainWindow):
         self.media_dock.setWidget(self.project_media_widget)
         self.addDockWidget(Qt.DockWidgetArea.LeftDockWidgetArea, self.media_dock)
 
+        self.export_queue_dock = QDockWidget("Export Queue", self)
+        self.export_queue_dock.setWidget(ExportQueueWidget(self.export_queue))
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.export_queue_dock)
+
         self.splitter = QSplitter(Qt.Orientation.Vertical)
 
         self.preview_scroll_area = QScrollArea()
@@ -2064,6 +2221,13 @@ class MainWindow(QMainWindow):
         self.progress_bar.setTextVisible(True)
         self.progress_bar.setRange(0, 100)
 
+        self.reindex_progress_bar = QProgressBar()
+        self.reindex_progress_bar.setVisible(False)
+        self.reindex_progress_bar.setRange(0, 100)
+        self.reindex_progress_bar.setMaximumWidth(120)
+        self.reindex_cancel_button = QPushButton("Cancel Re-index")
+        self.reindex_cancel_button.setVisible(False)
+
         self.mute_button = QPushButton("Mute")
         self.mute_button.setCheckable(True)
         self.volume_slider = QSlider(Qt.Orientation.Horizontal)
@@ -2074,6 +2238,8 @@ class MainWindow(QMainWindow):
         status_layout.addWidget(self.status_label, 1)
         status_layout.addWidget(self.stats_label)
         status_layout.addWidget(self.progress_bar, 1)
+        status_layout.addWidget(self.reindex_progress_bar)
+        status_layout.addWidget(self.reindex_cancel_button)
         status_layout.addStretch()
         status_layout.addWidget(self.mute_button)
         status_layout.addWidget(self.volume_slider)
@@ -2085,7 +2251,8 @@ class MainWindow(QMainWindow):
         self.managed_widgets = {
             'preview': {'widget': self.preview_scroll_area, 'name': 'Video Preview', 'action': None},
             'timeline': {'widget': self.timeline_widget, 'name': 'Timeline', 'action': None},
-            'project_media': {'widget': self.media_dock, 'name': 'Project Media', 'action': None}
+            'project_media': {'widget': self.media_dock, 'name': 'Project Media', 'action': None},
+            'export_queue': {'widget': self.export_queue_dock, 'name': 'Export Queue', 'action': None}
         }
         self.plugin_menu_actions = {}
         self.windows_menu = None
@@ -2134,8 +2301,16 @@ class MainWindow(QMainWindow):
         self.playback_manager.paused.connect(self._on_playback_paused)
         self.playback_manager.stats_updated.connect(self.stats_label.setText)
 
-        self.encoder.progress.connect(self.progress_bar.setValue)
-        self.encoder.finished.connect(self.on_export_finished)
+        self.export_queue.jobs_changed.connect(self.on_export_queue_changed)
+        self.export_queue.job_updated.connect(self.on_queued_export_updated)
+        self.export_queue.job_finished.connect(self.on_queued_export_finished)
+        self.render_cache_manager.progress.connect(self.progress_bar.setValue)
+        self.render_cache_manager.finished.connect(self.on_render_cache_finished)
+
+        self.reindex_manager.job_started.connect(self._on_reindex_started)
+        self.reindex_manager.job_progress.connect(self._on_reindex_progress)
+        self.reindex_manager.job_finished.connect(self._on_reindex_finished)
+        self.reindex_cancel_button.clicked.connect(lambda: self.reindex_manager.cancel_all())
 
         self.mute_button.toggled.connect(self._on_mute_toggled)
         self.volume_slider.valueChanged.connect(self._on_volume_changed)
@@ -2302,6 +2477,7 @@ class MainWindow(QMainWindow):
         add_media_to_timeline_action.triggered.connect(self.add_media_to_timeline)
         add_media_action = QAction("&Add Media to Project...", self); add_media_action.triggered.connect(self.add_media_files)
         export_action = QAction("&Export Video...", self); export_action.triggered.connect(self.export_video)
+        export_regions_action = QAction("Queue &Selection Regions for Export...", self); export_regions_action.triggered.connect(self.queue_region_exports)
         settings_action = QAction("Se&ttings...", self); settings_action.triggered.connect(self.open_settings_dialog)
         exit_action = QAction("E&xit", self); exit_action.triggered.connect(self.close)
         file_menu.addAction(new_action); file_menu.addAction(open_action); file_menu.addSeparator()
@@ -2312,6 +2488,7 @@ class MainWindow(QMainWindow):
         file_menu.addAction(add_media_to_timeline_action)
         file_menu.addAction(add_media_action)
         file_menu.addAction(export_action)
+        file_menu.addAction(export_regions_action)
         file_menu.addSeparator(); file_menu.addAction(settings_action); file_menu.addSeparator(); file_menu.addAction(exit_action)
         self._update_recent_files_menu()
 
@@ -2322,20 +2499,17 @@ class MainWindow(QMainWindow):
 
         split_action = QAction("Split Clip at Playhead", self); split_action.triggered.connect(self.split_clip_at_playhead)
         edit_menu.addAction(split_action)
+        edit_menu.addSeparator()
+        prerender_action = QAction("Pre-render Complex Ranges", self); prerender_action.triggered.connect(self.prerender_complex_ranges)
+        clear_render_cache_action = QAction("Clear Render Cache", self); clear_render_cache_action.triggered.connect(self.clear_render_cache)
+        edit_menu.addAction(prerender_action); edit_menu.addAction(clear_render_cache_action)
         self.update_undo_redo_actions()
         
-        plugins_menu = menu_bar.addMenu("&Plugins")
-        for name, data in self.plugin_manager.plugins.items():
-            plugin_action = QAction(name, self, checkable=True)
-            plugin_action.setChecked(data['enabled'])
-            plugin_action.toggled.connect(lambda checked, n=name: self.toggle_plugin(n, checked))
-            plugins_menu.addAction(plugin_action)
-            self.plugin_menu_actions[name] = plugin_action
-
-        plugins_menu.addSeparator()
+        self.plugins_menu = menu_bar.addMenu("&Plugins")
+        self.plugins_menu_separator = self.plugins_menu.addSeparator()
         manage_action = QAction("Manage plugins...", self)
         manage_action.triggered.connect(self.open_manage_plugins_dialog)
-        plugins_menu.addAction(manage_action)
+        self.plugins_menu.addAction(manage_action)
         
         self.windows_menu = menu_bar.addMenu("&Windows")
         for key, data in self.managed_widgets.items():
@@ -2350,47 +2524,54 @@ class MainWindow(QMainWindow):
             data['action'] = action
             self.windows_menu.addAction(action)
         
-    def _re_index_video_to_temp_file(self, original_path):
-        self.status_label.setText(f"File may be corrupt or missing an index. Attempting to rebuild, please wait...")
-        QApplication.processEvents()
+    def _populate_plugins_menu(self):
+        for name, data in self.plugin_manager.plugins.items():
+            if name in self.plugin_menu_actions: continue
+            plugin_action = QAction(name, self, checkable=True)
+            plugin_action.setChecked(data['enabled'])
+            plugin_action.toggled.connect(lambda checked, n=name: self.toggle_plugin(n, checked))
+            self.plugins_menu.insertAction(self.plugins_menu_separator, plugin_action)
+            self.plugin_menu_actions[name] = plugin_action
 
-        try:
-            temp_dir = tempfile.gettempdir()
-            temp_filename = f"ve_reindex_{uuid.uuid4().hex}.mp4"
-            temp_filepath = os.path.join(temp_dir, temp_filename)
-
-            startupinfo = None
-            if hasattr(subprocess, 'STARTUPINFO'):
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-
-            process = subprocess.Popen(
-                ['ffmpeg', '-y', '-i', original_path, '-c', 'copy', '-movflags', 'faststart', temp_filepath],
-                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True,
-                encoding='utf-8', errors='ignore', startupinfo=startupinfo
-            )
-            
-            for line in iter(process.stdout.readline, ""):
-                pass
-            
-            process.wait()
+    def _on_reindex_started(self, source_path):
+        self.status_label.setText(f"{os.path.basename(source_path)} may be corrupt or missing an index. Rebuilding it in the background...")
+        self.reindex_progress_bar.setValue(0)
+        self.reindex_progress_bar.setVisible(True)
+        self.reindex_cancel_button.setVisible(True)
 
-            if process.returncode == 0:
-                self.status_label.setText("Successfully re-indexed file to a temporary location for analysis.")
-                QApplication.processEvents()
-                return temp_filepath
-            else:
-                self.status_label.setText("Failed to re-index the file. It may be unsupported or severely corrupt.")
-                QApplication.processEvents()
-                if os.path.exists(temp_filepath):
-                    os.remove(temp_filepath)
-                return None
-        except Exception as e:
-            self.status_label.setText(f"An error occurred during file re-indexing: {e}")
-            QApplication.processEvents()
-            return None
+    def _on_reindex_progress(self, source_path, percentage):
+        self.reindex_progress_bar.setValue(percentage)
+
+    def _on_reindex_finished(self, source_path, cached_path, error_message):
+        if not self.reindex_manager.jobs:
+            self.reindex_progress_bar.setVisible(False)
+            self.reindex_cancel_button.setVisible(False)
+
+        if not cached_path:
+            self.pending_reindex_pool_adds.discard(source_path)
+            self.status_label.setText(error_message)
+            return
+
+        self.status_label.setText(f"Re-indexed {os.path.basename(source_path)}.")
+        in_use = {info['source_path_for_clips'] for info in self.media_properties.values()}
+        self.reindex_manager.cache.prune(keep=in_use | {cached_path})
+        if source_path in self.pending_reindex_pool_adds:
+            self.pending_reindex_pool_adds.discard(source_path)
+            self._add_media_to_pool(source_path)
+        elif source_path in self.media_properties:
+            media_info = self._get_media_properties(source_path)
+            if media_info:
+                self.media_properties[source_path] = media_info
 
-    def _get_media_properties(self, file_path):
+        media_info = self.media_properties.get(source_path)
+        if not media_info or media_info['source_path_for_clips'] != cached_path:
+            return
+        # Clips keep the original path; playback and export resolve it to the re-indexed copy.
+        if any(clip.source_path == source_path for clip in self.timeline.clips):
+            self.timeline_widget.update()
+            self.playback_manager.seek_to_frame(self.timeline_widget.playhead_pos_ms)
+
+    def _get_media_properties(self, file_path, allow_reindex=True):
         try:
             file_ext = os.path.splitext(file_path)[1].lower()
             media_info = {}
@@ -2428,17 +2609,18 @@ class MainWindow(QMainWindow):
                         try: current_duration_ms = float(dur_str) * 1000
                         except ValueError: current_duration_ms = 0
 
+                source_path_for_clips = file_path
                 if not probe or current_duration_ms < 1000:
-                    temp_path = self._re_index_video_to_temp_file(file_path)
-                    if temp_path:
+                    # Remux once into the managed cache; later probes, playback and export use the copy.
+                    cached_path = self.reindex_manager.cache.lookup(file_path)
+                    if cached_path:
                         try:
-                            probe = ffmpeg.probe(temp_path)
-                        except Exception as e:
-                            print(f"Failed to probe temp file: {e}")
-                        finally:
-                            if os.path.exists(temp_path):
-                                try: os.remove(temp_path)
-                                except: pass
+                            probe = ffmpeg.probe(cached_path)
+                            source_path_for_clips = cached_path
+                        except ffmpeg.Error as e:
+                            print(f"Failed to probe re-indexed file: {e}")
+                    elif allow_reindex:
+                        self.reindex_manager.request(file_path)
 
                 if not probe: return None
 
@@ -2458,7 +2640,7 @@ class MainWindow(QMainWindow):
                     if 'r_frame_rate' in video_stream and video_stream['r_frame_rate'] != '0/0':
                         num, den = map(int, video_stream['r_frame_rate'].split('/'))
                         if den > 0: media_info['fps'] = num / den
-                    media_info['source_path_for_clips'] = file_path
+                    media_info['source_path_for_clips'] = source_path_for_clips
 
                 elif audio_stream:
                     media_info['media_type'] = 'audio'
@@ -2467,7 +2649,7 @@ class MainWindow(QMainWindow):
                          duration_str = audio_stream.get('duration')
                     media_info['duration_ms'] = int(float(duration_str) * 1000) if duration_str and duration_str != 'N/A' else 0
                     media_info['has_audio'] = True
-                    media_info['source_path_for_clips'] = file_path
+                    media_info['source_path_for_clips'] = source_path_for_clips
                 else:
                     return None
             
@@ -2510,8 +2692,31 @@ class MainWindow(QMainWindow):
             print(f"Could not probe for project properties: {e}")
         return False
 
-    def _probe_for_drag(self, file_path):
-        return self._get_media_properties(file_path)
+    def _probe_for_drag(self, file_path, callback):
+        # One background probe per file at a time; every caller that asks while it runs gets the result.
+        callbacks = self.media_probe_callbacks.get(file_path)
+        if callbacks is not None:
+            callbacks.append(callback)
+            return
+        self.media_probe_callbacks[file_path] = [callback]
+        thread = QThread()
+        worker = MediaProbeWorker(file_path, lambda p: self._get_media_properties(p, allow_reindex=False))
+        worker.moveToThread(thread)
+
+        entry = (thread, worker)
+        thread.started.connect(worker.run)
+        worker.finished.connect(self._on_media_probed)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.finished.connect(lambda: self.drag_probe_threads.remove(entry))
+
+        self.drag_probe_threads.append(entry)
+        thread.start()
+
+    def _on_media_probed(self, file_path, media_props):
+        for callback in self.media_probe_callbacks.pop(file_path, []):
+            callback(file_path, media_props)
 
     def get_frame_data_at_time(self, time_ms):
         """Blocking frame grab for plugin compatibility."""
@@ -2645,7 +2850,7 @@ class MainWindow(QMainWindow):
 
     def _load_settings(self):
         self.settings_file_was_loaded = False
-        defaults = {"window_visibility": {"project_media": False}, "splitter_state": None, "enabled_plugins": [], "recent_files": [], "confirm_on_exit": True, "default_export_path": ""}
+        defaults = {"window_visibility": {"project_media": False, "export_queue": False}, "splitter_state": None, "enabled_plugins": [], "recent_files": [], "confirm_on_exit": True, "default_export_path": ""}
         if os.path.exists(self.settings_file):
             try:
                 with open(self.settings_file, "r") as f: self.settings = json.load(f)
@@ -2661,8 +2866,12 @@ class MainWindow(QMainWindow):
             key: data['action'].isChecked()
             for key, data in self.managed_widgets.items() if data.get('action')
         }
-        self.settings["window_visibility"] = visibility_to_save
-        self.settings['enabled_plugins'] = self.plugin_manager.get_enabled_plugin_names()
+        if self.plugins_loaded:
+            self.settings["window_visibility"] = visibility_to_save
+            self.settings['enabled_plugins'] = self.plugin_manager.get_enabled_plugin_names()
+        else:
+            # Plugin docks don't exist yet, so keep what was saved for them.
+            self.settings["window_visibility"] = dict(self.settings.get("window_visibility", {}), **visibility_to_save)
         try:
             with open(self.settings_file, "w") as f: json.dump(self.settings, f, indent=4)
         except IOError as e: print(f"Error saving settings: {e}")
@@ -2670,7 +2879,7 @@ class MainWindow(QMainWindow):
     def _apply_loaded_settings(self):
         visibility_settings = self.settings.get("window_visibility", {})
         for key, data in self.managed_widgets.items():
-            is_visible = visibility_settings.get(key, False if key == 'project_media' else True)
+            is_visible = visibility_settings.get(key, False if key in ('project_media', 'export_queue') else True)
             if data['widget'] is not self.preview_scroll_area:
                 data['widget'].setVisible(is_visible)
             if data['action']: data['action'].setChecked(is_visible)
@@ -2696,6 +2905,7 @@ class MainWindow(QMainWindow):
         self.playback_manager.stop()
         self.timeline.clips.clear(); self.timeline.num_video_tracks = 1; self.timeline.num_audio_tracks = 1
         self.media_pool.clear(); self.media_properties.clear(); self.project_media_widget.clear_list()
+        self.pending_reindex_pool_adds.clear()
         self.current_project_path = None
         self.last_export_path = None
         self.project_fps = 25.0
@@ -2774,14 +2984,7 @@ class MainWindow(QMainWindow):
                 if not os.path.exists(clip_data["source_path"]):
                     self.status_label.setText(f"Error: Missing media file {clip_data['source_path']}"); self.new_project(); return
 
-                if 'media_type' not in clip_data:
-                    ext = os.path.splitext(clip_data['source_path'])[1].lower()
-                    if ext in ['.mp3', '.wav', '.m4a', '.aac']:
-                         clip_data['media_type'] = 'audio'
-                    else:
-                         clip_data['media_type'] = 'video'
-                
-                self.timeline.add_clip(TimelineClip(**clip_data))
+                self.timeline.add_clip(TimelineClip(**_infer_clip_media_type(clip_data)))
             
             self.current_project_path = path
             self.prune_empty_tracks()
@@ -2809,15 +3012,19 @@ class MainWindow(QMainWindow):
                 action.triggered.connect(lambda checked, p=path: self._load_project_from_path(p))
                 self.recent_menu.addAction(action)
 
-    def _add_media_to_pool(self, original_path):
+    def _add_media_to_pool(self, original_path, media_info=None):
         if original_path in self.media_pool:
             return True
         
-        self.status_label.setText(f"Probing {os.path.basename(original_path)}..."); QApplication.processEvents()
-        
-        media_info = self._get_media_properties(original_path)
+        if media_info is None:
+            self.status_label.setText(f"Probing {os.path.basename(original_path)}..."); QApplication.processEvents()
+            media_info = self._get_media_properties(original_path)
         
-        if media_info:
+        if not media_info and self.reindex_manager.is_pending(original_path):
+            self.pending_reindex_pool_adds.add(original_path)
+            self.status_label.setText(f"Rebuilding the index of {os.path.basename(original_path)}. It will be added to the project when ready.")
+            return False
+        elif media_info:
             self.media_properties[original_path] = media_info
             if original_path not in self.media_pool:
                 self.media_pool.append(original_path)
@@ -2832,10 +3039,11 @@ class MainWindow(QMainWindow):
     def on_media_removed_from_pool(self, file_path):
         old_state = self._get_current_timeline_state()
         
+        clip_paths = {file_path}
         if file_path in self.media_pool: self.media_pool.remove(file_path)
-        if file_path in self.media_properties: del self.media_properties[file_path]
+        if file_path in self.media_properties: clip_paths.add(self.media_properties.pop(file_path)['source_path_for_clips'])
         
-        clips_to_remove = [c for c in self.timeline.clips if c.source_path == file_path]
+        clips_to_remove = [c for c in self.timeline.clips if c.source_path in clip_paths]
         for clip in clips_to_remove: self.timeline.clips.remove(clip)
 
         new_state = self._get_current_timeline_state()
@@ -2843,20 +3051,48 @@ class MainWindow(QMainWindow):
         command.undo()
         self.undo_stack.push(command)
 
-    def _add_media_files_to_project(self, file_paths):
+    def _add_media_files_to_project(self, file_paths, probed=None):
         if not file_paths:
             return []
 
         self.media_dock.show()
         added_files = []
+        probed = probed or {}
 
         for file_path in file_paths:
             self._update_project_properties_from_clip(file_path)
-            if self._add_media_to_pool(file_path):
+            if self._add_media_to_pool(file_path, probed.get(file_path)):
                 added_files.append(file_path)
         
         return added_files
 
+    def add_media_files_async(self, file_paths, probed=None, on_added=None):
+        # Probes files on worker threads, then adds them in order on the GUI thread. Files whose
+        # background probe fails go through the normal path, which can start a re-index.
+        results = dict(probed or {})
+        remaining = {p for p in file_paths if p not in results and p not in self.media_pool}
+
+        def add_all():
+            added_files = self._add_media_files_to_project(file_paths, results)
+            if added_files and on_added:
+                on_added(added_files)
+
+        def on_probed(file_path, media_props):
+            if file_path not in remaining:
+                return
+            remaining.discard(file_path)
+            if media_props:
+                results[file_path] = media_props
+            if not remaining:
+                add_all()
+
+        if not remaining:
+            add_all()
+            return
+        self.status_label.setText(f"Probing {len(remaining)} file(s)...")
+        for file_path in list(remaining):
+            self._probe_for_drag(file_path, on_probed)
+
     def add_media_to_timeline(self):
         file_paths, _ = QFileDialog.getOpenFileNames(self, "Add Media to Timeline", "", "All Supported Files (*.mp4 *.mov *.mkv *.avi *.png *.jpg *.jpeg *.mp3 *.wav *.srt *.ass);;Video Files (*.mp4 *.mov *.mkv *.avi);;Image Files (*.png *.jpg *.jpeg);;Audio Files (*.mp3 *.wav);;Subtitle Files (*.srt *.ass)")
         if not file_paths:
@@ -2907,13 +3143,13 @@ class MainWindow(QMainWindow):
                 if video_track_index is not None:
                     if video_track_index > self.timeline.num_video_tracks:
                         self.timeline.num_video_tracks = video_track_index
-                    video_clip = TimelineClip(media_info['source_path_for_clips'], clip_start_time, 0, duration_ms, video_track_index, 'video', media_type, group_id)
+                    video_clip = TimelineClip(file_path, clip_start_time, 0, duration_ms, video_track_index, 'video', media_type, group_id)
                     self.timeline.add_clip(video_clip)
                 
                 if audio_track_index is not None:
                     if audio_track_index > self.timeline.num_audio_tracks:
                         self.timeline.num_audio_tracks = audio_track_index
-                    audio_clip = TimelineClip(media_info['source_path_for_clips'], clip_start_time, 0, duration_ms, audio_track_index, 'audio', media_type, group_id)
+                    audio_clip = TimelineClip(file_path, clip_start_time, 0, duration_ms, audio_track_index, 'audio', media_type, group_id)
                     self.timeline.add_clip(audio_clip)
 
             self.status_label.setText(f"Added {len(added_files)} file(s) to timeline.")
@@ -2931,8 +3167,6 @@ class MainWindow(QMainWindow):
             self.status_label.setText(f"Cannot add clip, missing properties for {os.path.basename(source_path)}")
             return
 
-        path_for_clip = media_info['source_path_for_clips']
-
         if media_type in ['video', 'image']:
             self._update_project_properties_from_clip(source_path)
 
@@ -2942,13 +3176,13 @@ class MainWindow(QMainWindow):
         if video_track_index is not None:
              if video_track_index > self.timeline.num_video_tracks:
                  self.timeline.num_video_tracks = video_track_index
-             video_clip = TimelineClip(path_for_clip, timeline_start_ms, clip_start_ms, duration_ms, video_track_index, 'video', media_type, group_id)
+             video_clip = TimelineClip(source_path, timeline_start_ms, clip_start_ms, duration_ms, video_track_index, 'video', media_type, group_id)
              self.timeline.add_clip(video_clip)
         
         if audio_track_index is not None:
              if audio_track_index > self.timeline.num_audio_tracks:
                  self.timeline.num_audio_tracks = audio_track_index
-             audio_clip = TimelineClip(path_for_clip, timeline_start_ms, clip_start_ms, duration_ms, audio_track_index, 'audio', media_type, group_id)
+             audio_clip = TimelineClip(source_path, timeline_start_ms, clip_start_ms, duration_ms, audio_track_index, 'audio', media_type, group_id)
              self.timeline.add_clip(audio_clip)
 
         new_state = self._get_current_timeline_state()
@@ -3221,11 +3455,7 @@ class MainWindow(QMainWindow):
         self._perform_complex_timeline_change("Delete All Regions", action)
 
 
-    def export_video(self):
-        if not self.timeline.clips:
-            self.status_label.setText("Timeline is empty.")
-            return
-
+    def _default_export_path(self):
         default_path = ""
         if self.last_export_path and os.path.isdir(os.path.dirname(self.last_export_path)):
             default_path = self.last_export_path
@@ -3243,36 +3473,143 @@ class MainWindow(QMainWindow):
         else:
             default_path = "output.mp4"
 
-        default_path = os.path.normpath(default_path)
+        return os.path.normpath(default_path)
+
+    def _get_project_settings(self):
+        return {
+            'width': self.project_width,
+            'height': self.project_height,
+            'fps': self.project_fps
+        }
 
-        dialog = ExportDialog(default_path, self)
+    def _run_export_dialog(self):
+        if capabilities_failed():
+            # The last ffmpeg probe failed; try again in the background for the next dialog.
+            self.capability_refresher.start()
+        dialog = ExportDialog(self._default_export_path(), self, self.timeline, self._get_project_settings())
         if dialog.exec() != QDialog.DialogCode.Accepted:
             self.status_label.setText("Export canceled.")
-            return
+            return None, False
 
         export_settings = dialog.get_export_settings()
-        output_path = export_settings["output_path"]
-        if not output_path:
+        if not export_settings["output_path"]:
             self.status_label.setText("Export failed: No output path specified.")
+            return None, False
+
+        self.last_export_path = export_settings["output_path"]
+        return export_settings, dialog.add_to_queue
+
+    def _enqueue_export(self, timeline, export_settings, show_queue=True):
+        name = os.path.basename(export_settings["output_path"])
+        job = self.export_queue.enqueue(name, timeline, self._get_project_settings(), export_settings)
+        if show_queue:
+            self.export_queue_dock.show()
+        return job
+
+    def export_video(self):
+        if not self.timeline.clips:
+            self.status_label.setText("Timeline is empty.")
             return
 
-        self.last_export_path = output_path
+        export_settings, add_to_queue = self._run_export_dialog()
+        if export_settings is None:
+            return
 
-        project_settings = {
-            'width': self.project_width,
-            'height': self.project_height,
-            'fps': self.project_fps
-        }
+        if add_to_queue or self.foreground_export_id is not None:
+            job = self._enqueue_export(self.timeline, export_settings)
+            self.status_label.setText(f"Added {job.name} to the export queue.")
+            return
 
+        job = self._enqueue_export(self.timeline, export_settings, show_queue=False)
+        self.foreground_export_id = job.id
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
-        self.status_label.setText("Exporting...")
+        if job.export_settings["output_path"] != export_settings["output_path"]:
+            self.status_label.setText(f"Output is already being exported; exporting to {job.name} instead...")
+        elif job.status == JOB_QUEUED:
+            self.status_label.setText("Waiting for queued exports to finish...")
+        else:
+            self.status_label.setText("Exporting...")
+
+    def queue_region_exports(self):
+        regions = [r for r in self.timeline_widget.selection_regions if r[1] > r[0]]
+        if not regions:
+            self.status_label.setText("No selection regions to export.")
+            return
 
-        self.encoder.start_export(self.timeline, project_settings, export_settings)
+        export_settings, _ = self._run_export_dialog()
+        if export_settings is None:
+            return
+
+        base_path, ext = os.path.splitext(export_settings["output_path"])
+        snapshot = TimelineSnapshot(self.timeline)
+        for i, (start_ms, end_ms) in enumerate(sorted(regions)):
+            region_settings = dict(export_settings, output_path=f"{base_path}_region{i + 1}{ext}")
+            self._enqueue_export(snapshot.cropped(start_ms, end_ms), region_settings)
+        self.status_label.setText(f"Queued {len(regions)} region exports.")
+
+    def on_export_queue_changed(self):
+        if self.foreground_export_id is not None and self.export_queue.job(self.foreground_export_id) is None:
+            self.foreground_export_id = None
+            self.on_export_finished(False, "Export removed from the queue.")
+
+    def on_queued_export_updated(self, job_id):
+        if job_id != self.foreground_export_id:
+            return
+        job = self.export_queue.job(job_id)
+        if job:
+            self.progress_bar.setValue(job.progress)
+            if job.info:
+                self.on_export_progress_info(job.info)
+
+    def on_queued_export_finished(self, job_id, success, message):
+        if job_id == self.foreground_export_id:
+            self.foreground_export_id = None
+            self.on_export_finished(success, message)
+            return
+        job = self.export_queue.job(job_id)
+        name = job.name if job else "Export"
+        self.status_label.setText(f"{name}: {message}")
+
+    def on_export_progress_info(self, info):
+        parts = [f"Exporting... {info['percentage']}%"]
+        if info.get('speed'): parts.append(f"{info['speed']:.2f}x")
+        if info.get('fps'): parts.append(f"{info['fps']:.0f} fps")
+        if info.get('bitrate'): parts.append(info['bitrate'])
+        if info.get('eta_sec') is not None:
+            minutes, seconds = divmod(int(info['eta_sec']), 60)
+            parts.append(f"ETA {minutes}:{seconds:02d}")
+        self.status_label.setText(" | ".join(parts))
 
     def on_export_finished(self, success, message):
         self.status_label.setText(message)
         self.progress_bar.setVisible(False)
+
+    def prerender_complex_ranges(self):
+        if self.render_cache_manager.is_running():
+            self.status_label.setText("Complex ranges are already being rendered.")
+            return
+        count = self.render_cache_manager.render_ranges(self.timeline, self._get_project_settings())
+        if count == 0:
+            self.status_label.setText("No complex ranges need rendering.")
+            return
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.status_label.setText(f"Rendering {count} complex range(s)...")
+
+    def on_render_cache_finished(self, success, message):
+        self.status_label.setText(message)
+        self.progress_bar.setVisible(False)
+        if success:
+            self.playback_manager.seek_to_frame(self.timeline_widget.playhead_pos_ms)
+
+    def clear_render_cache(self):
+        if self.render_cache_manager.is_running():
+            self.status_label.setText("Cannot clear the render cache while ranges are rendering.")
+            return
+        self.render_cache_manager.cache.clear()
+        self.playback_manager.seek_to_frame(self.timeline_widget.playhead_pos_ms)
+        self.status_label.setText("Render cache cleared.")
     
     def add_dock_widget(self, plugin_instance, widget, title, area=Qt.DockWidgetArea.RightDockWidgetArea, show_on_creation=True):
         widget_key = f"plugin_{plugin_instance.name}_{title}".replace(' ', '_').lower()
@@ -3380,18 +3717,116 @@ class MainWindow(QMainWindow):
 
         self.is_shutting_down = True
         self.playback_manager.stop()
+        self.reindex_manager.cancel_all(wait=True)
+        self.export_queue.cancel_all(wait=True)
+        self.render_cache_manager.cancel(wait=True)
+        self.capability_refresher.cancel(wait=True)
         self._save_settings()
         event.accept()
 
+HEADLESS_EXTENSION_PRESETS = {'mkv': 'matroska', 'ogg': 'oga'}
+
+def render_project_headless(project_path, output_path, preset=None, parallel=False, workers=None, smart_render=False, resumable=False):
+    # Same graph building and runners as the export queue, driven synchronously with no widgets or plugins.
+    try:
+        with open(project_path, "r") as f: project_data = json.load(f)
+        timeline, project_settings = load_project_timeline(project_data)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Error opening project: {e}")
+        return 1
+
+    missing = sorted({c.source_path for c in timeline.clips if not os.path.exists(c.source_path)})
+    if missing:
+        print(f"Error: Missing media file {missing[0]}")
+        return 1
+    if not timeline.clips:
+        print("Timeline is empty.")
+        return 1
+    # Decode from re-indexed copies the editor already built for broken sources.
+    reindex_cache = ReindexCache()
+    timeline.source_resolver = lambda path: reindex_cache.lookup(path) or path
+
+    ext = os.path.splitext(output_path)[1].lower().lstrip('.')
+    container = preset or HEADLESS_EXTENSION_PRESETS.get(ext, ext)
+    preset_settings = CONTAINER_PRESETS.get(container)
+    if preset_settings is None:
+        print(f"Unknown preset '{container}'. Choose one of: {', '.join(CONTAINER_PRESETS)}")
+        return 2
+
+    export_settings = {
+        "output_path": output_path,
+        "container": container,
+        "vcodec": preset_settings['vcodec'],
+        "v_bitrate": preset_settings['v_bitrate'],
+        "acodec": preset_settings['acodec'],
+        "a_bitrate": preset_settings['a_bitrate'],
+        "parallel": parallel,
+        "workers": workers or get_default_parallel_workers(),
+        "smart_render": smart_render,
+        "resumable": resumable,
+    }
+
+    try:
+        runner = create_export_runner(timeline, project_settings, export_settings, KeyframeIndex() if smart_render else None)
+    except Exception as e:
+        print(f"Error building FFmpeg command: {e}")
+        return 1
+
+    result = {}
+    last_percentage = [-1]
+    progress_lock = threading.Lock()
+    def on_progress_info(info):
+        with progress_lock:
+            if info['percentage'] == last_percentage[0]: return
+            last_percentage[0] = info['percentage']
+            eta = f" ETA {int(info['eta_sec'])}s" if info.get('eta_sec') is not None else ""
+            speed = f" {info['speed']:.2f}x" if info.get('speed') else ""
+            print(f"Rendering {os.path.basename(output_path)}: {info['percentage']}%{speed}{eta}", flush=True)
+
+    # Segmented runners report from their pool threads and there is no event loop here to
+    # deliver queued signals, so the handlers are called directly on whichever thread emits.
+    runner.progress_info.connect(on_progress_info, Qt.ConnectionType.DirectConnection)
+    runner.finished.connect(lambda success, message: result.update(success=success, message=message), Qt.ConnectionType.DirectConnection)
+    print(f"Rendering {project_path} -> {output_path} ({container})")
+    runner.run()
+    print(result.get('message', "Export did not report a result."))
+    return 0 if result.get('success') else 1
+
+def parse_command_line(argv):
+    parser = argparse.ArgumentParser(description="Inline AI Video Editor")
+    parser.add_argument('project', nargs='?', help="Project JSON to open in the editor.")
+    parser.add_argument('--render', metavar='PROJECT', help="Render a project JSON without starting the GUI.")
+    parser.add_argument('--out', metavar='FILE', help="Output file for --render.")
+    parser.add_argument('--preset', choices=list(CONTAINER_PRESETS.keys()), help="Export preset for --render (default: from the output extension).")
+    parser.add_argument('--parallel', action='store_true', help="Use parallel segmented encoding for --render.")
+    parser.add_argument('--workers', type=int, default=None, help="Parallel workers for --render.")
+    parser.add_argument('--smart-render', action='store_true', help="Stream-copy unchanged clips for --render.")
+    parser.add_argument('--resume', action='store_true', help="Checkpoint segments for --render and reuse them from an interrupted run.")
+    parser.add_argument('--startup-profile', action='store_true', help="Print the time spent in each start-up phase.")
+    # Qt consumes its own arguments, so unknown ones are ignored rather than rejected.
+    args, _ = parser.parse_known_args(argv)
+    if args.render and not args.out:
+        parser.error("--render requires --out")
+    return args
+
 if __name__ == '__main__':
+    STARTUP_PROFILE.mark("imports")
+    args = parse_command_line(sys.argv[1:])
+    STARTUP_PROFILE.enabled = args.startup_profile
     download_ffmpeg()
+    STARTUP_PROFILE.mark("ffmpeg check")
+    if args.render:
+        sys.exit(render_project_headless(args.render, args.out, args.preset, args.parallel, args.workers, args.smart_render, args.resume))
+
     app = QApplication(sys.argv)
+    STARTUP_PROFILE.mark("qt application")
     project_to_load_on_startup = None
-    if len(sys.argv) > 1:
-        path = sys.argv[1]
+    if args.project:
+        path = args.project
         if os.path.exists(path) and path.lower().endswith('.json'):
             project_to_load_on_startup = path
             print(f"Loading project: {path}")
     window = MainWindow(project_to_load=project_to_load_on_startup)
     window.show()
+    STARTUP_PROFILE.mark("main window show")
     sys.exit(app.exec())
\ No newline at end of file